@@ -0,0 +1,33 @@
+"""add the resumes user_id, created_at index
+
+Revision ID: 4c1f2a7b9d3e
+Revises: 9e5f69e6079b
+Create Date: 2026-10-18 09:12:40.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4c1f2a7b9d3e'
+down_revision: Union[str, Sequence[str], None] = '9e5f69e6079b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Serves the keyset-paginated listing: WHERE user_id = ? ORDER BY created_at, id
+    # (InnoDB appends the primary key to secondary indexes)
+    op.create_index('ix_resumes_user_id_created_at', 'resumes', ['user_id', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # MySQL may have dropped the implicit foreign key index on user_id in
+    # favour of the composite one; keep the foreign key covered
+    op.create_index('ix_resumes_user_id', 'resumes', ['user_id'], unique=False)
+    op.drop_index('ix_resumes_user_id_created_at', table_name='resumes')
@@ -0,0 +1,88 @@
+"""compress the resume sections
+
+Revision ID: 7b3d91c2e4a8
+Revises: 4c1f2a7b9d3e
+Create Date: 2026-10-18 10:02:11.540377
+
+"""
+import json
+import zlib
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7b3d91c2e4a8'
+down_revision: Union[str, Sequence[str], None] = '4c1f2a7b9d3e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SECTIONS = ('skills', 'experience', 'education', 'certifications', 'projects', 'languages')
+BATCH_SIZE = 500
+
+
+# Same storage format as db.scheme.CompressedJSON at the time of writing,
+# kept here so the migration does not change if the model does
+def _encode(value):
+    if value is None:
+        return None
+    if isinstance(value, (str, bytes)):
+        value = json.loads(value)
+    raw = json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode()
+    if len(raw) < 256:
+        return b"j" + raw
+    return b"z" + zlib.compress(raw, 6)
+
+
+def _decode(value):
+    if value is None:
+        return None
+    marker, body = value[:1], value[1:]
+    if marker == b"z":
+        body = zlib.decompress(body)
+    return body.decode()
+
+
+def _copy(source_suffix: str, target_suffix: str, convert) -> None:
+    """Copy every section from `<name><source_suffix>` to `<name><target_suffix>` in id order"""
+    bind = op.get_bind()
+    columns = ", ".join(f"{name}{source_suffix}" for name in SECTIONS)
+    assignments = ", ".join(f"{name}{target_suffix} = :{name}" for name in SECTIONS)
+    select_batch = sa.text(f"SELECT id, {columns} FROM resumes WHERE id > :last ORDER BY id LIMIT :size")
+    update_row = sa.text(f"UPDATE resumes SET {assignments} WHERE id = :id")
+
+    last = 0
+    while True:
+        rows = bind.execute(select_batch, {"last": last, "size": BATCH_SIZE}).fetchall()
+        if not rows:
+            break
+        bind.execute(update_row, [
+            {"id": row[0], **{name: convert(value) for name, value in zip(SECTIONS, row[1:])}}
+            for row in rows
+        ])
+        last = rows[-1][0]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for name in SECTIONS:
+        op.add_column('resumes', sa.Column(f'{name}_z', mysql.MEDIUMBLOB(), nullable=True))
+    _copy('', '_z', _encode)
+    for name in SECTIONS:
+        op.drop_column('resumes', name)
+        op.alter_column('resumes', f'{name}_z', new_column_name=name,
+                        existing_type=mysql.MEDIUMBLOB(), existing_nullable=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name in SECTIONS:
+        op.add_column('resumes', sa.Column(f'{name}_json', mysql.JSON(), nullable=True))
+    _copy('', '_json', _decode)
+    for name in SECTIONS:
+        op.drop_column('resumes', name)
+        op.alter_column('resumes', f'{name}_json', new_column_name=name,
+                        existing_type=mysql.JSON(), existing_nullable=True)
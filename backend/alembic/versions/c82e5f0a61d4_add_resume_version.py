@@ -0,0 +1,28 @@
+"""add the resume version
+
+Revision ID: c82e5f0a61d4
+Revises: 7b3d91c2e4a8
+Create Date: 2026-10-18 11:20:47.902516
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c82e5f0a61d4'
+down_revision: Union[str, Sequence[str], None] = '7b3d91c2e4a8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('resumes', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('resumes', 'version')
@@ -0,0 +1,87 @@
+"""CRUD latency while LLM generations are in flight.
+
+Start the mock provider and the API against it:
+    python benchmarks/mock_openai.py --delay 5 &
+    OPENAI_BASE_URL=http://localhost:9000/v1 uvicorn main:app --port 8000 &
+then:
+    python benchmarks/crud_latency.py --token <access token>
+
+The script measures GET latency on a CRUD endpoint twice, once idle and
+once while --llm-concurrency generation requests are outstanding. With the
+async client both runs should report a similar p99; with a blocking client
+the loaded p99 tracks the provider delay.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import httpx
+
+SKILLS_PAYLOAD = {"experience": [{"title": "Software Engineer", "company": "Google", "duration": "2019-2023"}]}
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def report(label, samples):
+    print(
+        f"{label:<10} n={len(samples):<5} "
+        f"p50={percentile(samples, 50):7.1f}ms "
+        f"p95={percentile(samples, 95):7.1f}ms "
+        f"p99={percentile(samples, 99):7.1f}ms "
+        f"mean={statistics.mean(samples):7.1f}ms"
+    )
+
+
+async def measure_crud(client, path, headers, requests, interval):
+    samples = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        await client.get(path, headers=headers)
+        samples.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(interval)
+    return samples
+
+
+async def llm_load(client, concurrency, stop: asyncio.Event):
+    async def worker():
+        while not stop.is_set():
+            try:
+                await client.post("/api/cv-gen/skills", json=SKILLS_PAYLOAD, timeout=120)
+            except httpx.HTTPError:
+                pass
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+
+async def main(args):
+    headers = {"Authorization": f"Bearer {args.token}"} if args.token else {}
+    path = args.path if args.token else "/"
+    limits = httpx.Limits(max_connections=args.llm_concurrency + 10)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=30) as client:
+        idle = await measure_crud(client, path, headers, args.requests, args.interval)
+
+        stop = asyncio.Event()
+        load = asyncio.create_task(llm_load(client, args.llm_concurrency, stop))
+        await asyncio.sleep(1.0)
+        loaded = await measure_crud(client, path, headers, args.requests, args.interval)
+        stop.set()
+        await load
+
+    print(f"CRUD endpoint: {path}")
+    report("idle", idle)
+    report("llm-load", loaded)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--token", default=None, help="access token for /api/resume-op endpoints")
+    parser.add_argument("--path", default="/api/resume-op/all")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--interval", type=float, default=0.02)
+    parser.add_argument("--llm-concurrency", type=int, default=20)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,120 @@
+"""Throughput of GET /api/resume-op/{id} with NullPool vs the pooled engine.
+
+Needs the MySQL database from DB_URL with migrations applied:
+    python benchmarks/db_pool.py [--concurrency 32] [--duration 15]
+
+The app runs in-process and Redis is not initialised, so every request
+reaches the database. The script inserts a throwaway user and resume,
+then for each setup overrides get_db with a session bound to that setup's
+engine and keeps --concurrency clients requesting the resume for
+--duration seconds:
+
+- null:  NullPool, the old configuration (a new connection per request),
+- queue: the configured AsyncAdaptedQueuePool (DB_POOL_SIZE, DB_MAX_OVERFLOW, ...).
+
+Prints requests/s, p50/p99 latency and errors per setup, plus the pool's
+checkout, connect and wait counters. Both setups run with echo off so the
+comparison isolates connection handling.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("API_KEY", "benchmark")
+
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+from db.db import ASYNC_DATABASE_URL, PoolMetrics, get_db, make_engine
+from db.scheme import Resume, User
+from utils.jwtgen import create_access_token
+from main import app
+
+
+async def seed(engine):
+    async with AsyncSession(engine) as session:
+        user = User(email=f"pool-bench-{time.time_ns()}@example.com", full_name="Pool Bench")
+        session.add(user)
+        await session.flush()
+        resume = Resume(user_id=user.id, name="Pool Bench", job_title="Engineer", skills=["SQL"])
+        session.add(resume)
+        await session.commit()
+        return user.id, resume.id
+
+
+async def cleanup(engine, user_id):
+    async with AsyncSession(engine) as session:
+        await session.execute(delete(User).where(User.id == user_id))
+        await session.commit()
+
+
+async def run(label, engine, metrics, path, headers, concurrency, duration):
+    factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def override_db():
+        async with factory() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = override_db
+    latencies, errors = [], 0
+    deadline = time.perf_counter() + duration
+
+    async def client_loop(client):
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            response = await client.get(path, headers=headers)
+            latencies.append((time.perf_counter() - start) * 1000)
+            errors += response.status_code != 200
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=30) as client:
+        await client.get(path, headers=headers)  # warm up
+        start = time.perf_counter()
+        await asyncio.gather(*(client_loop(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    app.dependency_overrides.pop(get_db, None)
+
+    latencies.sort()
+    stats = metrics.snapshot(engine)
+    print(
+        f"{label:<6}{len(latencies) / elapsed:>10.1f}{statistics.median(latencies):>10.1f}"
+        f"{latencies[int(len(latencies) * 0.99)]:>10.1f}{errors:>8}"
+        f"{stats['connects']:>10}{stats['wait_ms']['p99'] or 0:>12}"
+    )
+
+
+async def main(args):
+    engines = {}
+    for label in ("null", "queue"):
+        metrics = PoolMetrics()
+        engines[label] = (make_engine(ASYNC_DATABASE_URL, pool=label, metrics=metrics), metrics)
+
+    setup_engine = engines["queue"][0]
+    user_id, resume_id = await seed(setup_engine)
+    token = create_access_token(user_id, "pool-bench@example.com")
+    headers = {"Authorization": f"Bearer {token}"}
+    path = f"/api/resume-op/{resume_id}"
+
+    print(f"GET {path}, {args.concurrency} clients, {args.duration}s per setup")
+    print(f"{'pool':<6}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'errors':>8}{'connects':>10}{'wait p99 ms':>12}")
+    try:
+        for label, (engine, metrics) in engines.items():
+            await run(label, engine, metrics, path, headers, args.concurrency, args.duration)
+    finally:
+        await cleanup(setup_engine, user_id)
+        for engine, _ in engines.values():
+            await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=15)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,150 @@
+"""CPU cost and recall of the near-duplicate filter on generated lists.
+
+    python benchmarks/dedupe_cost.py [--responses 2000] [--seed 1]
+
+Builds responses shaped like real ones (20 bullets or 15 skills) in which
+a share of the items are paraphrases of earlier ones: reordered clauses,
+swapped articles, changed numbers, a reworded verb. Reports for
+utils.dedupe (exact Jaccard over word shingles) and, for comparison, a
+64-permutation MinHash over the same shingles:
+
+- microseconds per response (drop_truncated + dedupe),
+- planted duplicates caught and distinct items wrongly dropped.
+"""
+import argparse
+import os
+import random
+import re
+import statistics
+import sys
+import time
+import zlib
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("API_KEY", "benchmark")
+
+from utils.dedupe import DEDUPE_SIMILARITY, dedupe, drop_truncated, shingles
+
+VERBS = ["Led", "Built", "Designed", "Delivered", "Automated", "Reduced", "Improved", "Launched", "Migrated", "Mentored"]
+OBJECTS = [
+    "payment service", "data pipeline", "release process", "onboarding flow", "search ranking",
+    "billing platform", "monitoring stack", "mobile checkout", "reporting suite", "fraud model",
+    "API gateway", "customer portal", "test framework", "recommendation engine", "inventory system",
+    "audit logging", "partner integrations", "pricing experiments", "support tooling", "warehouse routing",
+    "identity service", "email campaigns", "feature flags", "design system", "cost dashboards",
+]
+OUTCOMES = [
+    "cutting latency by {n}%", "saving ${n}K per year", "raising conversion {n}%",
+    "for {n} enterprise clients", "reducing incidents by {n}%", "ahead of a {n}-week deadline",
+]
+SYNONYMS = {"Led": "Headed", "Built": "Developed", "Reduced": "Cut", "Improved": "Enhanced", "Launched": "Shipped"}
+SKILLS = [
+    "Python", "System Design", "Kubernetes", "Stakeholder Management", "SQL", "Data Modeling",
+    "Go", "Incident Response", "Terraform", "Team Leadership", "GraphQL", "Performance Tuning",
+    "Technical Writing", "Machine Learning", "Product Discovery", "Redis", "CI/CD", "Mentoring",
+]
+
+
+def bullet(rng, used=()):
+    subject = rng.choice([o for o in OBJECTS if o not in used])
+    return f"{rng.choice(VERBS)} the {subject}, {rng.choice(OUTCOMES).format(n=rng.randint(5, 90))}"
+
+
+def paraphrase(text, rng):
+    words = text.split()
+    choice = rng.random()
+    if choice < 0.3:
+        words[0] = SYNONYMS.get(words[0], words[0])
+    elif choice < 0.6:
+        words = [re.sub(r"\d+", str(rng.randint(5, 90)), w) for w in words]
+    else:
+        words = [w for w in words if w not in ("the", "a")]
+        words.insert(1, "a")
+    return " ".join(words)
+
+
+def response(rng, size, duplicate_rate, make_item, pool):
+    """`size` items about distinct subjects from `pool`, some followed later by a paraphrase"""
+    items, planted, used = [], set(), set()
+    while len(items) < size:
+        if items and rng.random() < duplicate_rate:
+            copy = paraphrase(rng.choice(items), rng) if make_item is bullet else rng.choice(items).lower()
+            planted.add(len(items))
+            items.append(copy)
+        else:
+            item = make_item(rng, used)
+            used.update(subject for subject in pool if subject in item)
+            items.append(item)
+    return items, planted
+
+
+def skill(rng, used=()):
+    return rng.choice([s for s in SKILLS if s not in used])
+
+
+class MinHash:
+    """Signature-based estimate of the same Jaccard similarity"""
+
+    def __init__(self, permutations=64, seed=1):
+        rng = random.Random(seed)
+        self.params = [(rng.randrange(1, 2**31 - 1), rng.randrange(0, 2**31 - 1)) for _ in range(permutations)]
+
+    def signature(self, text):
+        hashes = [zlib.crc32(s.encode()) for s in shingles(text)] or [0]
+        return [min((a * h + b) % 2147483647 for h in hashes) for a, b in self.params]
+
+    def dedupe(self, items, threshold):
+        kept, signatures = [], []
+        for item in items:
+            signature = self.signature(item)
+            if all(sum(x == y for x, y in zip(signature, other)) / len(signature) < threshold for other in signatures):
+                kept.append(item)
+                signatures.append(signature)
+        return kept
+
+
+def kept_indexes(items, kept):
+    """Positions of the kept items; both lists are in order and the first copy is the one kept"""
+    positions, k = set(), 0
+    for i, item in enumerate(items):
+        if k < len(kept) and kept[k] == item:
+            positions.add(i)
+            k += 1
+    return positions
+
+
+def measure(name, responses, run, min_words):
+    timings, caught, planted_total, wrongly_dropped = [], 0, 0, 0
+    for items, planted in responses:
+        start = time.perf_counter()
+        kept = run(drop_truncated(items, min_words))
+        timings.append((time.perf_counter() - start) * 1e6)
+        kept_positions = kept_indexes(items, kept)
+        planted_total += len(planted)
+        caught += len(planted - kept_positions)
+        wrongly_dropped += len(set(range(len(items))) - planted - kept_positions)
+    timings.sort()
+    print(f"{name:<22}{statistics.mean(timings):>10.1f}{timings[int(len(timings) * 0.99)]:>10.1f}"
+          f"{caught / max(planted_total, 1):>10.1%}{wrongly_dropped:>10}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--responses", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--duplicate-rate", type=float, default=0.2)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    minhash = MinHash()
+    shapes = {
+        "bullets x20": ([response(rng, 20, args.duplicate_rate, bullet, OBJECTS) for _ in range(args.responses)], 5),
+        "skills x15": ([response(rng, 15, args.duplicate_rate, skill, SKILLS) for _ in range(args.responses)], 1),
+    }
+
+    print(f"{'shape / method':<22}{'mean us':>10}{'p99 us':>10}{'caught':>10}{'false':>10}")
+    for shape, (responses, min_words) in shapes.items():
+        print(shape)
+        measure("  jaccard (shipped)", responses, lambda items: dedupe(items), min_words)
+        measure("  minhash-64", responses, lambda items: minhash.dedupe(items, DEDUPE_SIMILARITY), min_words)
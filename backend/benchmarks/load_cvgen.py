@@ -0,0 +1,237 @@
+"""Open-loop load test of the /api/cv-gen endpoints against the mock provider.
+
+Start the stub, then run the app in-process (no uvicorn needed):
+    python benchmarks/mock_openai.py --latency lognormal:1.5:0.4 &
+    OPENAI_BASE_URL=http://localhost:9000/v1 python benchmarks/load_cvgen.py --rps 20 --duration 30
+
+Requests are fired on a fixed schedule of --rps regardless of how fast the
+app answers, so queueing shows up as latency instead of silently lowering
+the offered load. Each request comes from one of --users synthetic clients
+(X-Forwarded-For, trusted in-process via TRUSTED_PROXY_HOPS=1; a server
+behind --base-url needs the same setting) so the fair scheduler and rate
+limiter see realistic traffic, and --unique controls how many distinct payloads exist, i.e. how
+much the generation cache and single-flight can absorb.
+
+While the app runs in this process a monitor task measures event-loop lag:
+how late a 10ms sleep wakes up. Anything blocking the loop (sync I/O, heavy
+parsing) shows up there. Use --base-url to target a running server instead;
+loop lag is then not reported.
+
+Prints throughput, p50/p95/p99 latency and status codes per endpoint, and
+exits non-zero when --max-p99-ms or --max-error-rate are exceeded so it can
+gate CI.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+# The synthetic users are told apart by X-Forwarded-For
+os.environ.setdefault("TRUSTED_PROXY_HOPS", "1")
+
+ENDPOINTS = {
+    "work-experience": "/api/cv-gen/work-experience",
+    "skills": "/api/cv-gen/skills",
+    "summary": "/api/cv-gen/summary",
+    "work-experience-stream": "/api/cv-gen/work-experience/stream",
+    "draft": "/api/cv-gen/draft",
+}
+
+TITLES = ["Software Engineer", "Data Analyst", "Product Manager", "DevOps Engineer", "Designer"]
+COMPANIES = ["Google", "Acme", "Initech", "Globex", "Umbrella", "Stark Industries"]
+
+
+def make_payload(kind: str, variant: int):
+    title = TITLES[variant % len(TITLES)]
+    company = f"{COMPANIES[variant % len(COMPANIES)]} {variant}"
+    experience = [{"title": title, "company": company, "duration": "2019-2023"}]
+    if kind in ("work-experience", "work-experience-stream"):
+        return {
+            "job_title": title,
+            "company": company,
+            "location": "Remote",
+            "role": "Building and operating backend services",
+            "start_date": "2019",
+            "end_date": "2023",
+        }
+    if kind == "skills":
+        return {"experience": experience}
+    if kind == "summary":
+        return {"name": f"Candidate {variant}", "skills": ["Python", "SQL"], "experience": experience}
+    return {
+        "name": f"Candidate {variant}",
+        "email": f"candidate{variant}@example.com",
+        "job_title": title,
+        "experience": experience,
+    }
+
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def monitor_loop_lag(samples, stop: asyncio.Event, interval: float = 0.01):
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        start = loop.time()
+        await asyncio.sleep(interval)
+        samples.append((loop.time() - start - interval) * 1000)
+
+
+async def send(client, kind, payload, user, timeout):
+    headers = {"X-Forwarded-For": user}
+    path = ENDPOINTS[kind]
+    start = time.perf_counter()
+    try:
+        if kind.endswith("-stream"):
+            async with client.stream("POST", path, json=payload, headers=headers, timeout=timeout) as response:
+                async for _ in response.aiter_raw():
+                    pass
+                status = response.status_code
+        else:
+            response = await client.post(path, json=payload, headers=headers, timeout=timeout)
+            status = response.status_code
+    except httpx.TimeoutException:
+        status = "timeout"
+    except httpx.HTTPError as e:
+        status = type(e).__name__
+    return kind, status, (time.perf_counter() - start) * 1000
+
+
+async def run_load(client, args):
+    mix = [kind for kind in args.mix.split(",") if kind]
+    for kind in mix:
+        if kind not in ENDPOINTS:
+            raise SystemExit(f"Unknown endpoint '{kind}', choose from {', '.join(ENDPOINTS)}")
+
+    total = int(args.rps * args.duration)
+    tasks = []
+    begin = time.perf_counter()
+    for i in range(total):
+        # Fixed arrival schedule: sleep until the i-th slot, never wait on responses
+        delay = begin + i / args.rps - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        kind = random.choice(mix)
+        payload = make_payload(kind, random.randrange(args.unique))
+        client_id = random.randrange(args.users)
+        user = f"10.0.{client_id // 250}.{client_id % 250}"
+        tasks.append(asyncio.create_task(send(client, kind, payload, user, args.timeout)))
+
+    results = await asyncio.gather(*tasks)
+    return results, time.perf_counter() - begin
+
+
+def summarize(results, elapsed, lag):
+    by_kind = defaultdict(list)
+    statuses = defaultdict(Counter)
+    for kind, status, latency in results:
+        by_kind[kind].append(latency)
+        statuses[kind][status] += 1
+
+    report = {"elapsed_s": round(elapsed, 2), "requests": len(results), "endpoints": {}}
+    ok_total = 0
+    for kind, samples in sorted(by_kind.items()):
+        ok = statuses[kind].get(200, 0)
+        ok_total += ok
+        report["endpoints"][kind] = {
+            "n": len(samples),
+            "ok": ok,
+            "p50_ms": round(percentile(samples, 50), 1),
+            "p95_ms": round(percentile(samples, 95), 1),
+            "p99_ms": round(percentile(samples, 99), 1),
+            "statuses": {str(k): v for k, v in statuses[kind].items()},
+        }
+
+    all_latencies = [latency for _, _, latency in results]
+    report["throughput_rps"] = round(ok_total / elapsed, 2) if elapsed else 0.0
+    report["error_rate"] = round(1 - ok_total / len(results), 4) if results else 0.0
+    report["p50_ms"] = round(percentile(all_latencies, 50), 1)
+    report["p95_ms"] = round(percentile(all_latencies, 95), 1)
+    report["p99_ms"] = round(percentile(all_latencies, 99), 1)
+    if lag is not None:
+        report["loop_lag_ms"] = {
+            "mean": round(statistics.mean(lag), 2) if lag else 0.0,
+            "p99": round(percentile(lag, 99), 2),
+            "max": round(max(lag), 2) if lag else 0.0,
+        }
+    return report
+
+
+def print_report(report):
+    print(f"{'endpoint':<24}{'n':>6}{'ok':>6}{'p50':>10}{'p95':>10}{'p99':>10}  statuses")
+    for kind, row in report["endpoints"].items():
+        print(
+            f"{kind:<24}{row['n']:>6}{row['ok']:>6}"
+            f"{row['p50_ms']:>8.1f}ms{row['p95_ms']:>8.1f}ms{row['p99_ms']:>8.1f}ms  {row['statuses']}"
+        )
+    print(
+        f"\nthroughput={report['throughput_rps']} req/s  error_rate={report['error_rate']:.2%}  "
+        f"p50={report['p50_ms']}ms p95={report['p95_ms']}ms p99={report['p99_ms']}ms"
+    )
+    if "loop_lag_ms" in report:
+        lag = report["loop_lag_ms"]
+        print(f"event loop lag: mean={lag['mean']}ms p99={lag['p99']}ms max={lag['max']}ms")
+
+
+async def main(args):
+    random.seed(args.seed)
+    limits = httpx.Limits(max_connections=None)
+
+    if args.base_url:
+        async with httpx.AsyncClient(base_url=args.base_url, limits=limits) as client:
+            results, elapsed = await run_load(client, args)
+        return summarize(results, elapsed, None)
+
+    from main import app
+
+    lag = []
+    stop = asyncio.Event()
+    monitor = asyncio.create_task(monitor_loop_lag(lag, stop))
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://cvbuilder", limits=limits) as client:
+            results, elapsed = await run_load(client, args)
+    finally:
+        stop.set()
+        await monitor
+    return summarize(results, elapsed, lag)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rps", type=float, default=10.0, help="target arrival rate")
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds of load")
+    parser.add_argument("--mix", default="work-experience,skills,summary", help=f"comma list of {', '.join(ENDPOINTS)}")
+    parser.add_argument("--users", type=int, default=50, help="number of synthetic client IPs")
+    parser.add_argument("--unique", type=int, default=1000, help="number of distinct payloads per endpoint")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--base-url", default=None, help="target a running server instead of the in-process app")
+    parser.add_argument("--json", default=None, help="also write the report to this file")
+    parser.add_argument("--max-p99-ms", type=float, default=None, help="fail if overall p99 is above this")
+    parser.add_argument("--max-error-rate", type=float, default=None, help="fail if the non-200 fraction is above this")
+    args = parser.parse_args()
+
+    report = asyncio.run(main(args))
+    print_report(report)
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, indent=2))
+
+    failed = (
+        (args.max_p99_ms is not None and report["p99_ms"] > args.max_p99_ms)
+        or (args.max_error_rate is not None and report["error_rate"] > args.max_error_rate)
+    )
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,228 @@
+"""OpenAI-compatible chat completions stub for offline load tests.
+
+Run with:  python benchmarks/mock_openai.py --port 9000 --latency lognormal:1.5:0.4
+and point the backend at it with OPENAI_BASE_URL=http://localhost:9000/v1
+
+Latency is a distribution spec:
+    fixed:S                 always S seconds
+    uniform:LO:HI           uniformly between LO and HI seconds
+    normal:MEAN:STD         normal, clamped at 0
+    lognormal:MEDIAN:SIGMA  long-tailed, the usual shape of LLM latency
+    exponential:MEAN
+
+Streaming requests (stream=true) get SSE chunks, with the sampled latency
+spent as time-to-first-token and --token-interval between chunks.
+Responses are canned JSON arrays picked from the prompt (bullets, skills or
+summaries). Faults can be injected at startup (--slow-rate/--slow-delay,
+--error-rate/--error-status) or at runtime with
+POST /_control {"latency": "fixed:0.5", "error_rate": 1.0}.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+import uvicorn
+
+app = FastAPI()
+settings = {
+    "latency": "fixed:3",
+    "token_interval": 0.02,
+    "slow_rate": 0.0,
+    "slow_delay": 20.0,
+    "error_rate": 0.0,
+    "error_status": 500,
+}
+counters = {"requests": 0, "streams": 0, "errors": 0, "in_flight": 0}
+
+CANNED = {
+    "bullets": [
+        "Led migration of legacy services to Kubernetes, cutting deployment time by 40%",
+        "Built internal analytics dashboards used by 200+ employees across 5 departments",
+        "Mentored four junior engineers through structured code reviews and pairing",
+        "Reduced API p99 latency by 35% by introducing request coalescing and caching",
+        "Automated release pipeline, raising deployment frequency from weekly to daily",
+        "Partnered with product managers to ship three customer-facing features per quarter",
+        "Cut cloud infrastructure spend by $120K annually through rightsizing workloads",
+        "Designed event-driven ingestion pipeline processing 2M records per day",
+    ],
+    "skills": [
+        "Python", "FastAPI", "PostgreSQL", "Kubernetes", "Distributed Systems",
+        "System Design", "CI/CD", "AWS", "Team Leadership", "Code Review",
+        "Performance Tuning", "Redis", "Technical Writing", "Stakeholder Management",
+        "Agile Delivery",
+    ],
+    "summary": [
+        "Results-driven software engineer with over six years of experience building "
+        "scalable backend systems and leading cross-functional teams. Known for improving "
+        "reliability and performance of high-traffic services, mentoring engineers and "
+        "translating business goals into pragmatic technical roadmaps. Brings deep "
+        "expertise in Python, cloud infrastructure and distributed systems to deliver "
+        "measurable impact.",
+    ],
+}
+
+
+def sample_latency(spec: str) -> float:
+    kind, *params = spec.split(":")
+    values = [float(p) for p in params]
+    if kind == "fixed":
+        return values[0]
+    if kind == "uniform":
+        return random.uniform(values[0], values[1])
+    if kind == "normal":
+        return max(0.0, random.gauss(values[0], values[1]))
+    if kind == "lognormal":
+        return values[0] * random.lognormvariate(0, values[1])
+    if kind == "exponential":
+        return random.expovariate(1 / values[0])
+    raise ValueError(f"Unknown latency distribution: {spec}")
+
+
+def canned_content(messages) -> str:
+    prompt = " ".join(m.get("content", "") for m in messages).lower()
+    if "summary" in prompt or "summaries" in prompt:
+        items = CANNED["summary"]
+    elif "skills" in prompt:
+        items = random.sample(CANNED["skills"], k=12)
+    else:
+        items = random.sample(CANNED["bullets"], k=6)
+    return json.dumps(items)
+
+
+def completion_id() -> str:
+    return f"chatcmpl-{uuid.uuid4().hex}"
+
+
+def usage(messages, content: str):
+    prompt_tokens = sum(len(m.get("content", "")) for m in messages) // 4
+    completion_tokens = len(content) // 4
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens,
+    }
+
+
+async def stream_chunks(model: str, content: str, messages):
+    chunk_id = completion_id()
+    created = int(time.time())
+
+    def chunk(delta, finish_reason=None, **extra):
+        body = {
+            "id": chunk_id,
+            "object": "chat.completion.chunk",
+            "created": created,
+            "model": model,
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+            **extra,
+        }
+        return f"data: {json.dumps(body)}\n\n"
+
+    try:
+        yield chunk({"role": "assistant", "content": ""})
+        # Roughly token-sized pieces
+        for start in range(0, len(content), 8):
+            await asyncio.sleep(settings["token_interval"])
+            yield chunk({"content": content[start:start + 8]})
+        yield chunk({}, finish_reason="stop", usage=usage(messages, content))
+        yield "data: [DONE]\n\n"
+    finally:
+        counters["in_flight"] -= 1
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    messages = body.get("messages", [])
+    model = body.get("model", "gpt-4o-mini")
+    counters["requests"] += 1
+    counters["in_flight"] += 1
+
+    delay = sample_latency(settings["latency"])
+    if random.random() < settings["slow_rate"]:
+        delay = settings["slow_delay"]
+
+    try:
+        await asyncio.sleep(delay)
+    except BaseException:
+        counters["in_flight"] -= 1
+        raise
+
+    if random.random() < settings["error_rate"]:
+        counters["errors"] += 1
+        counters["in_flight"] -= 1
+        return JSONResponse(
+            status_code=int(settings["error_status"]),
+            content={"error": {"message": "Injected failure", "type": "server_error"}},
+        )
+
+    content = canned_content(messages)
+
+    if body.get("stream"):
+        counters["streams"] += 1
+        return StreamingResponse(stream_chunks(model, content, messages), media_type="text/event-stream")
+
+    counters["in_flight"] -= 1
+    return {
+        "id": completion_id(),
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": content},
+            "finish_reason": "stop",
+        }],
+        "usage": usage(messages, content),
+    }
+
+
+@app.post("/_control")
+async def control(request: Request):
+    """Change latency and fault injection settings of the running stub"""
+    updates = await request.json()
+    for key, value in updates.items():
+        if key == "latency":
+            sample_latency(value)
+            settings[key] = value
+        elif key in settings:
+            settings[key] = float(value)
+    return settings
+
+
+@app.get("/_stats")
+async def stats():
+    return {**counters, **settings}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--latency", default=None, help="latency distribution, e.g. lognormal:1.5:0.4")
+    parser.add_argument("--delay", type=float, default=3.0, help="shorthand for --latency fixed:DELAY")
+    parser.add_argument("--jitter", type=float, default=0.0, help="with --delay, adds uniform 0..JITTER seconds")
+    parser.add_argument("--token-interval", type=float, default=0.02, help="seconds between streamed chunks")
+    parser.add_argument("--slow-rate", type=float, default=0.0, help="fraction of calls that stall")
+    parser.add_argument("--slow-delay", type=float, default=20.0, help="seconds a stalled call takes")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of calls answered with an error")
+    parser.add_argument("--error-status", type=int, default=500, help="HTTP status of injected errors (500, 429, 503)")
+    args = parser.parse_args()
+
+    latency = args.latency
+    if latency is None:
+        latency = f"uniform:{args.delay}:{args.delay + args.jitter}" if args.jitter else f"fixed:{args.delay}"
+    sample_latency(latency)
+
+    settings.update(
+        latency=latency,
+        token_interval=args.token_interval,
+        slow_rate=args.slow_rate,
+        slow_delay=args.slow_delay,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+    )
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")
@@ -0,0 +1,190 @@
+"""Accuracy, fuzzing and speed of the LLM output parser.
+
+    python benchmarks/parse_outputs.py [--fuzz 5000] [--seed 1]
+
+1. Corpus: every case in benchmarks/data/parse_corpus.jsonl (real failure
+   shapes: fences, preambles, trailing commas, truncation, list markers,
+   wrong field names) is parsed by the previous regex-based parser and by
+   utils.structured_output.parse_items and compared with the expected items.
+2. Fuzz: random item lists are rendered and then mangled (fences, prose,
+   truncation, bullets, stray brackets). parse_items must only ever raise
+   StructuredOutputError, and whatever it returns must be items of the
+   original list, in order.
+3. Speed: microseconds per parse for clean, fenced, truncated and line
+   outputs.
+
+Exits non-zero on a fuzz invariant violation or if the new parser gets a
+corpus case wrong.
+"""
+import argparse
+import json
+import os
+import random
+import re
+import string
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("API_KEY", "benchmark")
+
+from models.cv_models import WorkExperienceOutput
+from utils.structured_output import StructuredOutputError, parse_items
+
+CORPUS = Path(__file__).resolve().parent / "data" / "parse_corpus.jsonl"
+
+
+def legacy_parse(content: str):
+    """The json.loads / greedy regex / line-split chain this module replaced"""
+    content = content.strip()
+    try:
+        return json.loads(content)
+    except json.JSONDecodeError:
+        json_match = re.search(r'\[.*\]', content, re.DOTALL)
+        if json_match:
+            return json.loads(json_match.group())
+
+        lines = [line.strip().strip('"-').strip()
+                for line in content.split('\n')
+                if line.strip() and not line.strip().startswith('#')]
+        return [p for p in lines if p and len(p) > 10]
+
+
+def new_parse(content: str):
+    try:
+        return parse_items(content, WorkExperienceOutput)
+    except StructuredOutputError:
+        return []
+
+
+def run_corpus():
+    cases = [json.loads(line) for line in CORPUS.read_text().splitlines() if line.strip()]
+    legacy_ok = new_ok = 0
+    failures = []
+    print(f"{'case':<24}{'legacy':>8}{'new':>8}")
+    for case in cases:
+        try:
+            legacy = legacy_parse(case["content"])
+        except Exception:
+            legacy = None
+        new = new_parse(case["content"])
+        legacy_hit = legacy == case["expected"]
+        new_hit = new == case["expected"]
+        legacy_ok += legacy_hit
+        new_ok += new_hit
+        if not new_hit:
+            failures.append(case["name"])
+        print(f"{case['name']:<24}{'ok' if legacy_hit else 'FAIL':>8}{'ok' if new_hit else 'FAIL':>8}")
+    print(f"\ncorpus: legacy {legacy_ok}/{len(cases)}, new {new_ok}/{len(cases)}")
+    return failures
+
+
+def random_item(rng: random.Random) -> str:
+    words = ["".join(rng.choices(string.ascii_letters, k=rng.randint(2, 9))) for _ in range(rng.randint(4, 14))]
+    item = " ".join(words)
+    if rng.random() < 0.2:
+        item += ' with "quoted" ' + rng.choice(["[x]", "{y}", "50%", "€3M", "a\\b"])
+    return item
+
+
+def mangle(items, rng: random.Random) -> str:
+    shape = rng.choice(["array", "object", "lines"])
+    if shape == "lines":
+        marker = rng.choice(["- ", "* ", "• ", "1. ", ""])
+        text = "\n".join(marker + item for item in items)
+    else:
+        text = json.dumps({"points": items} if shape == "object" else items, indent=rng.choice([None, 2]), ensure_ascii=rng.random() < 0.5)
+        if rng.random() < 0.3:
+            text = text.rstrip("]}").rstrip() + ",]" + ("}" if shape == "object" else "")
+        if rng.random() < 0.3:
+            text = f"```json\n{text}\n```"
+        if rng.random() < 0.3:
+            text = "Here are the results:\n" + text
+        if rng.random() < 0.2:
+            text += "\nHope this helps [1]."
+    if rng.random() < 0.25:
+        text = text[:rng.randint(0, len(text))]
+    return text
+
+
+def is_ordered_subset(found, items) -> bool:
+    position = 0
+    for value in found:
+        while position < len(items) and items[position] != value:
+            position += 1
+        if position == len(items):
+            return False
+        position += 1
+    return True
+
+
+def run_fuzz(iterations: int, seed: int):
+    rng = random.Random(seed)
+    violations = 0
+    recovered_new = recovered_legacy = 0
+    for _ in range(iterations):
+        items = [random_item(rng) for _ in range(rng.randint(1, 12))]
+        text = mangle(items, rng)
+        try:
+            found = parse_items(text, WorkExperienceOutput)
+        except StructuredOutputError:
+            found = []
+        except Exception as e:
+            violations += 1
+            print(f"unexpected {type(e).__name__}: {e!r} for {text[:80]!r}")
+            continue
+
+        # Line output of a truncated list can end in a partial item, JSON never may
+        clean = [item for item in found if item in items]
+        if "[" in text and not is_ordered_subset(found, items):
+            violations += 1
+            print(f"invented items {found[:3]!r} for {text[:80]!r}")
+        recovered_new += len(clean)
+
+        try:
+            legacy = legacy_parse(text)
+            recovered_legacy += len([item for item in legacy if item in items]) if isinstance(legacy, list) else 0
+        except Exception:
+            pass
+
+    print(f"fuzz: {iterations} outputs, {violations} invariant violations, "
+          f"items recovered legacy={recovered_legacy} new={recovered_new}")
+    return violations
+
+
+def run_speed():
+    items = [f"Delivered project number {i} ahead of schedule with measurable impact" for i in range(20)]
+    samples = {
+        "clean_json": json.dumps({"points": items}),
+        "fenced": "```json\n" + json.dumps(items, indent=2) + "\n```",
+        "truncated": json.dumps(items)[:-30],
+        "lines": "\n".join(f"- {item}" for item in items),
+    }
+    print(f"\n{'shape':<14}{'legacy us':>12}{'new us':>12}")
+    for name, text in samples.items():
+        number = 2000
+        legacy = timeit.timeit(lambda: _safe(legacy_parse, text), number=number) / number * 1e6
+        new = timeit.timeit(lambda: new_parse(text), number=number) / number * 1e6
+        print(f"{name:<14}{legacy:>12.1f}{new:>12.1f}")
+
+
+def _safe(fn, text):
+    try:
+        return fn(text)
+    except Exception:
+        return None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--fuzz", type=int, default=5000, help="number of fuzzed outputs")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    failures = run_corpus()
+    violations = run_fuzz(args.fuzz, args.seed)
+    run_speed()
+    if failures:
+        print(f"\nparse_items got corpus cases wrong: {', '.join(failures)}")
+    sys.exit(1 if failures or violations else 0)
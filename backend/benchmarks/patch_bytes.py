@@ -0,0 +1,114 @@
+"""Request bytes and row bytes written per autosave: PUT vs PATCH.
+
+    python benchmarks/patch_bytes.py [--jobs 8] [--edits 200] [--seed 1]
+
+Builds a large resume (--jobs positions with bullets, skills, education,
+projects) and replays --edits typical autosave edits: retyping one bullet,
+adding or removing a skill, changing the job title. For each edit it
+compares:
+
+- PUT: the client resends every section and the server rewrites every
+  column it was sent,
+- PATCH: a JSON Patch with just the edited path, and the server writes
+  only the columns whose value changed.
+
+Bytes written are the stored sizes (CompressedJSON for sections, UTF-8
+for text). No database is needed.
+"""
+import argparse
+import copy
+import json
+import os
+import random
+import statistics
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("API_KEY", "benchmark")
+
+from db.scheme import CompressedJSON
+from models.cv_models import ResumeUpdate
+from utils.json_patch import json_patch, touched_fields, JSON_PATCH_MEDIA_TYPE
+
+SECTIONS = ("skills", "experience", "education", "certifications", "projects", "languages")
+WORDS = ("led", "built", "migrated", "reduced", "latency", "billing", "platform", "team", "customers",
+         "pipeline", "quarterly", "revenue", "automation", "dashboards", "reliability", "onboarding")
+COMPRESSED = CompressedJSON()
+
+
+def sentence(rng, words=14):
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize()
+
+
+def make_resume(rng, jobs):
+    return {
+        "name": "Alex Example",
+        "job_title": "Senior Software Engineer",
+        "summary": " ".join(sentence(rng) for _ in range(4)),
+        "skills": {"technical": [f"Skill {i}" for i in range(20)], "soft": [f"Trait {i}" for i in range(8)]},
+        "experience": {"items": [
+            {"title": f"Engineer {j}", "company": f"Company {j}", "points": [sentence(rng) for _ in range(8)]}
+            for j in range(jobs)
+        ]},
+        "education": {"items": [{"school": "State University", "degree": "BSc Computer Science", "notes": sentence(rng)}]},
+        "certifications": {"items": [{"name": f"Certification {i}"} for i in range(4)]},
+        "projects": {"items": [{"name": f"Project {i}", "description": sentence(rng, 30)} for i in range(5)]},
+        "languages": {"items": ["English", "Spanish"]},
+        "template_id": 1,
+        "theme_color": "blue",
+    }
+
+
+def random_edit(rng, resume):
+    kind = rng.random()
+    if kind < 0.7:
+        job = rng.randrange(len(resume["experience"]["items"]))
+        point = rng.randrange(8)
+        return [{"op": "replace", "path": f"/experience/items/{job}/points/{point}", "value": sentence(rng)}]
+    if kind < 0.85:
+        return [{"op": "add", "path": "/skills/technical/-", "value": f"Skill {rng.randint(100, 999)}"}]
+    if kind < 0.95:
+        return [{"op": "remove", "path": "/skills/technical/0"}]
+    return [{"op": "replace", "path": "/job_title", "value": rng.choice(["Staff Engineer", "Tech Lead"])}]
+
+
+def stored_size(field, value):
+    if value is None:
+        return 0
+    if field in SECTIONS:
+        return len(COMPRESSED.process_bind_param(value, None))
+    return len(str(value).encode())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--jobs", type=int, default=8)
+    parser.add_argument("--edits", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    resume = make_resume(rng, args.jobs)
+    put_request, put_written, patch_request, patch_written = [], [], [], []
+
+    for _ in range(args.edits):
+        operations = random_edit(rng, resume)
+        fields = touched_fields(operations, JSON_PATCH_MEDIA_TYPE)
+        current = {field: resume[field] for field in fields}
+        patched = json_patch(current, operations)
+        changed = {field: patched[field] for field in fields if patched[field] != current[field]}
+        resume = {**copy.deepcopy(resume), **changed}
+
+        full = ResumeUpdate(**resume).dict(exclude_unset=True)
+        put_request.append(len(json.dumps(full).encode()))
+        put_written.append(sum(stored_size(field, value) for field, value in full.items()))
+        patch_request.append(len(json.dumps(operations).encode()))
+        patch_written.append(sum(stored_size(field, value) for field, value in changed.items()))
+
+    print(f"resume with {args.jobs} jobs, {args.edits} autosave edits")
+    print(f"{'':<8}{'request B (mean)':>18}{'written B (mean)':>18}")
+    print(f"{'PUT':<8}{statistics.mean(put_request):>18.0f}{statistics.mean(put_written):>18.0f}")
+    print(f"{'PATCH':<8}{statistics.mean(patch_request):>18.0f}{statistics.mean(patch_written):>18.0f}")
+    print(f"{'ratio':<8}{statistics.mean(put_request) / statistics.mean(patch_request):>17.1f}x"
+          f"{statistics.mean(put_written) / statistics.mean(patch_written):>17.1f}x")
@@ -0,0 +1,72 @@
+"""Exercise the LLM resilience layer against the local stub.
+
+    python benchmarks/mock_openai.py --port 9000 --delay 0.3 --jitter 0.1 &
+    API_KEY=test OPENAI_BASE_URL=http://localhost:9000/v1 LLM_HEDGE=true \
+        LLM_MAX_RETRIES=0 python benchmarks/resilience.py
+
+Runs three phases against the same LLMClient: a healthy warm-up that
+trains the adaptive timeout, a phase where some calls stall (hedging
+should cap the tail), and an outage (the breaker should open and fail
+fast instead of waiting out timeouts).
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+import httpx
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from utils.llm_client import llm_client  # noqa: E402
+
+MESSAGES = [{"role": "user", "content": "Return a JSON array of three skills."}]
+
+
+async def run_phase(label, calls, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, outcomes = [], {}
+
+    async def one():
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                await llm_client.complete(MESSAGES, max_tokens=50)
+                outcome = "ok"
+            except Exception as e:
+                outcome = type(e).__name__
+            latencies.append((time.perf_counter() - start) * 1000)
+            outcomes[outcome] = outcomes.get(outcome, 0) + 1
+
+    await asyncio.gather(*(one() for _ in range(calls)))
+    latencies.sort()
+    p = lambda q: latencies[min(len(latencies) - 1, int(q * len(latencies)))]
+    print(f"{label:<10} p50={p(0.5):7.0f}ms p99={p(0.99):7.0f}ms max={latencies[-1]:7.0f}ms {outcomes}")
+    stats = llm_client.get_stats()
+    print(f"{'':<10} breaker={stats['breaker_state']} hedges={stats['hedges']} "
+          f"adaptive_timeout={stats['adaptive_timeout_s']}s")
+
+
+async def main(args):
+    async with httpx.AsyncClient(base_url=args.mock_url) as control:
+        await control.post("/_control", json={"slow_rate": 0, "error_rate": 0})
+        await run_phase("healthy", args.calls, args.concurrency)
+
+        await control.post("/_control", json={"slow_rate": args.slow_rate, "slow_delay": args.slow_delay})
+        await run_phase("stalls", args.calls, args.concurrency)
+
+        await control.post("/_control", json={"slow_rate": 0, "error_rate": 1})
+        await run_phase("outage", args.calls, args.concurrency)
+
+        await control.post("/_control", json={"error_rate": 0})
+    await llm_client.aclose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--mock-url", default="http://localhost:9000")
+    parser.add_argument("--calls", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--slow-rate", type=float, default=0.05)
+    parser.add_argument("--slow-delay", type=float, default=10.0)
+    asyncio.run(main(parser.parse_args()))
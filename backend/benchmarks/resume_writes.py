@@ -0,0 +1,144 @@
+"""Latency and statements per resume write: the old ORM flow vs ResumeController.
+
+Needs the MySQL database from DB_URL with migrations applied:
+    python benchmarks/resume_writes.py [--iterations 200]
+
+For each of create, update and delete the script runs the write
+--iterations times two ways against a throwaway user:
+
+- before: the previous flow (existence or ownership SELECT, the write,
+  commit, then a refresh SELECT), re-implemented here with the ORM,
+- after:  the controller's writes: one INSERT or DELETE, and for update one
+  UPDATE plus a read of the columns it did not set.
+
+It counts the statements each operation sends (every statement and the
+COMMIT is a network round trip) and prints p50/p95 latency. The gap widens
+with the latency between the app and the database.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("API_KEY", "benchmark")
+
+from sqlalchemy import delete, event, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import undefer_group
+from controller.resume import ResumeController
+from db.db import engine
+from db.scheme import Resume, User
+from models.cv_models import ResumeCreate, ResumeResponse, ResumeUpdate
+
+COLUMNS = [attr.key for attr in inspect(Resume).column_attrs]
+PAYLOAD = ResumeCreate(
+    name="Write Bench",
+    job_title="Engineer",
+    summary="Engineer focused on reliable services. " * 5,
+    skills={"technical": ["Python", "SQL", "Redis", "Kubernetes"]},
+    experience={"items": [{"title": "Engineer", "company": "Acme", "points": ["Built the billing platform"] * 5}] * 3},
+    template_id=1,
+)
+UPDATE = ResumeUpdate(job_title="Senior Engineer", skills={"technical": ["Python", "SQL", "Go"]})
+
+
+class StatementCounter:
+    def __init__(self):
+        self.count = 0
+        event.listen(engine.sync_engine, "before_cursor_execute", self.on_execute)
+        event.listen(engine.sync_engine, "commit", self.on_commit)
+
+    def on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+    def on_commit(self, conn):
+        self.count += 1
+
+
+# The previous implementations
+
+async def create_before(db, user_id):
+    if not (await db.execute(select(User).where(User.id == user_id))).scalar_one_or_none():
+        raise LookupError("User not found")
+    resume = Resume(user_id=user_id, **PAYLOAD.dict())
+    db.add(resume)
+    await db.commit()
+    await db.refresh(resume, attribute_names=COLUMNS)
+    return ResumeResponse.from_orm(resume)
+
+
+async def _owned(db, resume_id, user_id):
+    query = select(Resume).where(Resume.id == resume_id, Resume.user_id == user_id).options(undefer_group("sections"))
+    return (await db.execute(query)).scalar_one()
+
+
+async def update_before(db, resume_id, user_id):
+    resume = await _owned(db, resume_id, user_id)
+    for field, value in UPDATE.dict(exclude_unset=True).items():
+        setattr(resume, field, value)
+    await db.commit()
+    await db.refresh(resume, attribute_names=COLUMNS)
+    return ResumeResponse.from_orm(resume)
+
+
+async def delete_before(db, resume_id, user_id):
+    resume = await _owned(db, resume_id, user_id)
+    await db.delete(resume)
+    await db.commit()
+
+
+VARIANTS = {
+    "before": (create_before, update_before, delete_before),
+    "after": (
+        lambda db, user_id: ResumeController.create_resume(PAYLOAD, user_id, db),
+        lambda db, resume_id, user_id: ResumeController.update_resume(resume_id, UPDATE, user_id, db),
+        lambda db, resume_id, user_id: ResumeController.delete_resume(resume_id, user_id, db),
+    ),
+}
+
+
+async def timed(counter, samples, statements, operation):
+    async with AsyncSession(engine, expire_on_commit=False) as db:
+        before = counter.count
+        start = time.perf_counter()
+        result = await operation(db)
+        samples.append((time.perf_counter() - start) * 1000)
+        statements.append(counter.count - before)
+        return result
+
+
+async def main(args):
+    async with AsyncSession(engine) as db:
+        user = User(email=f"write-bench-{time.time_ns()}@example.com", full_name="Write Bench")
+        db.add(user)
+        await db.commit()
+        user_id = user.id
+
+    counter = StatementCounter()
+    print(f"{'variant':<8}{'operation':<10}{'p50 ms':>10}{'p95 ms':>10}{'statements':>12}")
+    try:
+        for variant, (create, update, remove) in VARIANTS.items():
+            results = {name: ([], []) for name in ("create", "update", "delete")}
+            for _ in range(args.iterations):
+                created = await timed(counter, *results["create"], lambda db: create(db, user_id))
+                await timed(counter, *results["update"], lambda db: update(db, created.id, user_id))
+                await timed(counter, *results["delete"], lambda db: remove(db, created.id, user_id))
+            for name, (samples, statements) in results.items():
+                samples.sort()
+                print(f"{variant:<8}{name:<10}{statistics.median(samples):>10.2f}"
+                      f"{samples[int(len(samples) * 0.95)]:>10.2f}{statistics.mean(statements):>12.1f}")
+    finally:
+        async with AsyncSession(engine) as db:
+            await db.execute(delete(User).where(User.id == user_id))
+            await db.commit()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=200)
+    asyncio.run(main(parser.parse_args()))
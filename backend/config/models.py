@@ -0,0 +1,29 @@
+import json
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Candidate models per generation task, in order of preference. Each route
+# sets its own max_tokens and the p95 latency (ms) above which the router
+# treats the model as slow and tries the next candidate first.
+# Override the whole table with LLM_MODEL_ROUTES='{"skills": [...], ...}'.
+DEFAULT_MODEL_ROUTES = {
+    "work_experience": [
+        {"model": "gpt-4o-mini", "max_tokens": 400, "slow_ms": 8000},
+        {"model": "gpt-4.1-mini", "max_tokens": 400, "slow_ms": 10000},
+    ],
+    "skills": [
+        {"model": "gpt-4o-mini", "max_tokens": 300, "slow_ms": 6000},
+        {"model": "gpt-4.1-nano", "max_tokens": 300, "slow_ms": 6000},
+    ],
+    "summary": [
+        {"model": "gpt-4o-mini", "max_tokens": 300, "slow_ms": 6000},
+        {"model": "gpt-4.1-mini", "max_tokens": 300, "slow_ms": 8000},
+    ],
+}
+
+MODEL_ROUTES = json.loads(os.getenv("LLM_MODEL_ROUTES")) if os.getenv("LLM_MODEL_ROUTES") else DEFAULT_MODEL_ROUTES
+
+# A model whose recent error rate reaches this is demoted behind healthy ones
+MODEL_MAX_ERROR_RATE = float(os.getenv("LLM_MODEL_MAX_ERROR_RATE", "0.3"))
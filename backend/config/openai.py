@@ -1,4 +1,5 @@
-from openai import OpenAI
+from openai import AsyncOpenAI
+import httpx
 import os
 from dotenv import load_dotenv
 
@@ -9,10 +10,48 @@ apis = os.getenv("API_KEY")
 if not apis:
     raise ValueError("API_KEY environment variable is not set.")
 
-client = OpenAI(
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL") or None
+
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "30"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "16"))
+LLM_FANOUT_LIMIT = int(os.getenv("LLM_FANOUT_LIMIT", "8"))
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "32"))
+LLM_MAX_KEEPALIVE = int(os.getenv("LLM_MAX_KEEPALIVE", "16"))
+# Ask for schema-constrained JSON (response_format=json_schema); disable for providers without it
+LLM_STRUCTURED_OUTPUT = os.getenv("LLM_STRUCTURED_OUTPUT", "true").lower() == "true"
+
+# Resilience: circuit breaker, hedged requests and latency-derived timeouts
+LLM_BREAKER_FAILURES = int(os.getenv("LLM_BREAKER_FAILURES", "5"))
+LLM_BREAKER_RESET = float(os.getenv("LLM_BREAKER_RESET", "30"))
+LLM_HEDGE = os.getenv("LLM_HEDGE", "false").lower() == "true"
+LLM_HEDGE_MAX_RATIO = float(os.getenv("LLM_HEDGE_MAX_RATIO", "0.1"))
+LLM_TIMEOUT_MULTIPLIER = float(os.getenv("LLM_TIMEOUT_MULTIPLIER", "2.5"))
+LLM_MIN_TIMEOUT = float(os.getenv("LLM_MIN_TIMEOUT", "5"))
+
+# Latency SLO of the synchronous /cv-gen endpoints: LLM work stops this many
+# seconds after the request arrived, minus a margin kept for the template
+# fallback; 0 disables the deadline and the fallback answers only provider failures
+GENERATION_DEADLINE = float(os.getenv("GENERATION_DEADLINE", "8"))
+GENERATION_FALLBACK_MARGIN = float(os.getenv("GENERATION_FALLBACK_MARGIN", "0.2"))
+GENERATION_FALLBACK = os.getenv("GENERATION_FALLBACK", "true").lower() == "true"
+
+# One pooled transport per worker so completions reuse TLS connections
+http_client = httpx.AsyncClient(
+    limits=httpx.Limits(
+        max_connections=LLM_MAX_CONNECTIONS,
+        max_keepalive_connections=LLM_MAX_KEEPALIVE,
+        keepalive_expiry=60.0,
+    ),
+    timeout=httpx.Timeout(LLM_TIMEOUT, connect=5.0),
+)
+
+client = AsyncOpenAI(
     api_key=apis,
-    timeout=30.0,  # 30 second timeout
-    max_retries=2   # Retry failed requests twice
+    base_url=OPENAI_BASE_URL,
+    http_client=http_client,
+    timeout=LLM_TIMEOUT,
+    max_retries=LLM_MAX_RETRIES
 )
 
-DEFAULT_MODEL = "gpt-4o-mini"
\ No newline at end of file
+DEFAULT_MODEL = "gpt-4o-mini"
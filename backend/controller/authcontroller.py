@@ -4,7 +4,7 @@ from sqlalchemy.orm import Session
 from sqlalchemy import select, or_
 from db.scheme import User
 from utils.jwtgen import create_access_token, create_refresh_token, decode_refresh_token
-from db.db import get_db
+from db.db import get_db, read_router
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
@@ -55,6 +55,7 @@ class AuthController:
                 db.add(user)
                 await db.commit()
                 await db.refresh(user)
+                await read_router.mark_write(user.id)
                 
                 tokens = AuthController._generate_tokens(user.id, user.email)
                 
@@ -104,6 +105,7 @@ class AuthController:
                     if not user.google_id:
                         user.google_id = google_id
                         await db.commit()
+                        await read_router.mark_write(user.id)
                 else:
                     user = User(
                         email=email,
@@ -113,6 +115,7 @@ class AuthController:
                     db.add(user)
                     await db.commit()
                     await db.refresh(user)
+                    await read_router.mark_write(user.id)
                 
                 tokens = AuthController._generate_tokens(user.id, user.email)
                 
@@ -1,154 +1,531 @@
 import json
 import re
-from config.openai import client, DEFAULT_MODEL
-# from utils.context_manager import context_manager
-from models.cv_models import CVData, DirectSummaryRequest, SkillsRequest, WorkExperience
+import time
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from config.openai import GENERATION_FALLBACK, LLM_FANOUT_LIMIT
+from utils.model_router import model_router
+from utils.llm_client import LLMTimeoutError, PROVIDER_ERRORS, set_request_deadline
+from utils.resilience import CircuitOpenError
+from utils.template_fallback import template_fallback
+from utils.json_stream import JSONArrayStreamParser
+from utils.generation_cache import generation_cache
+from utils.singleflight import SingleFlightError, single_flight
+from utils.fanout import bounded_gather
+from utils.llm_metrics import llm_metrics, tag_llm_calls, tag_prompt
+from utils.prompt_registry import canonical_hash, prompt_registry
+from utils.speculative import Role, speculative_cache
+from utils.structured_output import parse_items, parse_result, response_format
+from utils.dedupe import NearDuplicateFilter, dedupe, drop_truncated, missing_count
+from utils.context_manager import context_manager
+from utils.bullet_index import (
+    BULLET_INDEX_FAST_MIN,
+    BULLET_INDEX_FAST_MIN_SCORE,
+    BULLET_INDEX_FAST_SIMILARITY,
+    BULLET_INDEX_MIN_LLM_POINTS,
+    BULLET_INDEX_MODE,
+    bullet_index,
+)
+from models.cv_models import (
+    CVData,
+    DirectSummaryRequest,
+    SkillsRequest,
+    WorkExperience,
+    WorkExperienceRequest,
+    WorkExperienceOutput,
+    SkillsOutput,
+    SummaryOutput,
+)
+
+# Output type each task's completion is constrained to and validated against
+RESPONSE_MODELS = {
+    "work_experience": WorkExperienceOutput,
+    "skills": SkillsOutput,
+    "summary": SummaryOutput,
+}
+
+WORK_EXPERIENCE_POINTS = 20
+
+# Items each task asks for, and the fewest words an item needs not to be a fragment
+TASK_TARGETS = {"work_experience": WORK_EXPERIENCE_POINTS, "skills": 15, "summary": 1}
+MIN_ITEM_WORDS = {"work_experience": 5, "skills": 1, "summary": 20}
+
+# Failures answered from templates (marked degraded) instead of an error;
+# SingleFlightError is a leader in another worker failing on our behalf
+DEGRADE_ERRORS = (LLMTimeoutError, CircuitOpenError, SingleFlightError) + PROVIDER_ERRORS
 
 class CVGenerator:
-    
+
+    @staticmethod
+    def _degrade(error: Exception) -> bool:
+        return GENERATION_FALLBACK and isinstance(error, DEGRADE_ERRORS)
+
     @staticmethod
-    def _parse_json_response(content: str):
+    def _prompt(task: str, values: Dict, owner: str = "") -> Tuple[List[Dict[str, str]], str]:
+        """Messages from the prompt version serving this user, and the cache key of the result"""
+        prompt = prompt_registry.select(task, owner)
+        tag_prompt(prompt.key)
+        cache_key = generation_cache.make_key(prompt.key, {"inputs": prompt.input_hash(values)}, model_router.primary(task)["model"], 0.6)
+        return prompt.render(values), cache_key
+
+    @staticmethod
+    async def _complete_once(task: str, messages: List[Dict[str, str]], seen: List[str] = ()) -> List[str]:
+        """One schema-constrained completion, without fragments or near-duplicates"""
+        model = RESPONSE_MODELS[task]
+        response = await model_router.complete(task, messages, temperature=0.6, response_format=response_format(model))
+        choice = response.choices[0]
+        parsed, path = parse_result(choice.message.content or "", model)
+
+        items = drop_truncated(parsed, MIN_ITEM_WORDS[task], cut_off=path == "lines" and choice.finish_reason == "length")
+        llm_metrics.record_postprocess("fragments_dropped", len(parsed) - len(items))
+        unique = dedupe(items, seen=seen)
+        llm_metrics.record_postprocess("duplicates_dropped", len(items) - len(unique))
+        return unique
+
+    @staticmethod
+    def _top_up_messages(messages: List[Dict[str, str]], items: List[str], missing: int) -> List[Dict[str, str]]:
+        return messages + [
+            {"role": "assistant", "content": json.dumps(items)},
+            {"role": "user", "content": f"Generate {missing} more, different from the ones above. Return as JSON array of strings."},
+        ]
+
+    @staticmethod
+    async def _top_up(task: str, messages: List[Dict[str, str]], items: List[str], count: Optional[int]) -> List[str]:
+        """Items to add to a short answer, from one follow-up call asking only for the missing count"""
+        missing = missing_count(items, count or TASK_TARGETS[task])
+        if not missing:
+            return []
+
+        llm_metrics.record_postprocess("top_ups")
         try:
-            return json.loads(content)
-        except json.JSONDecodeError:
-            json_match = re.search(r'\[.*\]', content, re.DOTALL)
-            if json_match:
-                return json.loads(json_match.group())
-            
-            lines = [line.strip().strip('"-').strip() 
-                    for line in content.split('\n') 
-                    if line.strip() and not line.strip().startswith('#')]
-            return [p for p in lines if p and len(p) > 10]
-    
-    @staticmethod
-    async def generate_work_experience(job_title: str, company: str, location: str, role: str, start_date: str, end_date: str):
-        
-        prompt = f"""Generate 20 specific work experience bullet points for:
-
-        Job Title: {job_title}
-        Company: {company}
-        Location: {location}
-        Role/Department: {role}
-        Duration: {start_date} to {end_date}
-
-        Make bullet points specifically relevant to "{job_title}" at "{company}".
-
-        Requirements:
-        - 10-20 words each
-        - According to the job title and experience level
-        - Specific achievements with metrics
-        - Role-specific responsibilities
-        - Industry context consideration
-        - Use action verbs
-
-        Return as JSON array of strings."""
-        
+            extra = await CVGenerator._complete_once(task, CVGenerator._top_up_messages(messages, items, missing), seen=items)
+        except Exception:
+            # A failed top-up still returns the items already generated
+            extra = []
+        llm_metrics.record_postprocess("top_up_items", len(extra[:missing]))
+        return extra[:missing]
+
+    @staticmethod
+    async def _complete_items(task: str, messages: List[Dict[str, str]], count: Optional[int] = None) -> List[str]:
+        """The task's list of items, topped up once when the model returned fewer than asked for"""
+        items = await CVGenerator._complete_once(task, messages)
+        return items + await CVGenerator._top_up(task, messages, items, count)
+
+    @staticmethod
+    def _indexed_points(job_title: str, role: str) -> Tuple[List[str], bool]:
+        """Bullets retrieved for this title and role, and whether they are close and proven enough to skip the LLM"""
+        if BULLET_INDEX_MODE == "off":
+            return [], False
+        hits = bullet_index.lookup(job_title, role, WORK_EXPERIENCE_POINTS)
+        close = [
+            text for text, similarity, score in hits
+            if similarity >= BULLET_INDEX_FAST_SIMILARITY and score >= BULLET_INDEX_FAST_MIN_SCORE
+        ]
+        if len(close) >= BULLET_INDEX_FAST_MIN:
+            return close, True
+        return ([text for text, _, _ in hits] if BULLET_INDEX_MODE == "blend" else []), False
+
+    @staticmethod
+    def _llm_point_count(indexed: List[str]) -> int:
+        return max(BULLET_INDEX_MIN_LLM_POINTS, WORK_EXPERIENCE_POINTS - len(indexed))
+
+    @staticmethod
+    def _merge_points(generated: List[str], indexed: List[str]) -> List[str]:
+        """Generated bullets first, then indexed ones that are not near-duplicates, up to the usual count"""
+        return (generated + dedupe(indexed, seen=generated))[:WORK_EXPERIENCE_POINTS]
+
+    @staticmethod
+    def _experience_line(exp: WorkExperience) -> str:
+        line = f"{exp.title} at {exp.company} ({exp.duration})"
+        return f"{line}: {exp.description[:200]}" if exp.description else line
+
+    @staticmethod
+    async def _career_context(experience: Optional[List[WorkExperience]], document_id: Optional[int], owner: str) -> str:
+        """Compact career facts for a prompt, merged with the document's stored context"""
+        lines = [CVGenerator._experience_line(exp) for exp in experience or []]
+        if document_id is None:
+            return "\n".join(f"- {line}" for line in lines)
+
+        for line in lines:
+            await context_manager.add_message(document_id, "user", line, owner)
+        return await context_manager.get_context_summary(document_id, owner)
+
+    @staticmethod
+    def _summary_values(cv_data: DirectSummaryRequest, career: str) -> Dict[str, str]:
+        return {"skills": ", ".join(cv_data.skills[:8]) if cv_data.skills else "", "career": career}
+
+    @staticmethod
+    async def generate_work_experience(
+        job_title: str,
+        company: str,
+        location: str,
+        role: str,
+        start_date: str,
+        end_date: str,
+        document_id: Optional[int] = None,
+        owner: str = "",
+    ):
+        indexed = []
         try:
-            messages = [
-                {"role": "system", "content": "You are a professional CV expert. Generate specific work experience bullet points."},
-                {"role": "user", "content": prompt}
-            ]
-            
-            response = client.chat.completions.create(
-                model=DEFAULT_MODEL,
-                messages=messages,
-                temperature=0.6,
-                max_tokens=400,
-            )
-            
-            content = response.choices[0].message.content.strip()
-            points = CVGenerator._parse_json_response(content)
-            
+            indexed, fast = CVGenerator._indexed_points(job_title, role)
+            if fast:
+                return {"success": True, "points": indexed}
+
+            count = CVGenerator._llm_point_count(indexed)
+            messages, cache_key = CVGenerator._prompt("work_experience", {
+                "job_title": job_title,
+                "company": company,
+                "location": location,
+                "role": role,
+                "start_date": start_date,
+                "end_date": end_date,
+                "count": count,
+            }, owner)
+            cached = await generation_cache.get(cache_key)
+            if cached is not None:
+                return {"success": True, "points": cached}
+
+            async def run():
+                generated = await CVGenerator._complete_items("work_experience", messages, count)
+                await bullet_index.record(job_title, role, company, generated)
+                return CVGenerator._merge_points(generated, indexed)
+
+            points = await single_flight.do(cache_key, run)
+            if points:
+                await generation_cache.add(cache_key, points)
+                if document_id is not None:
+                    await CVGenerator._remember_experience(document_id, owner, job_title, company, start_date, end_date, points)
+
             return {"success": True, "points": points}
-            
+
         except Exception as e:
-            return {"success": False, "error": str(e)}
-    
+            if not CVGenerator._degrade(e):
+                return {"success": False, "error": str(e)}
+            points = indexed + template_fallback.work_experience(job_title, role)
+            return {"success": True, "points": dedupe(points)[:WORK_EXPERIENCE_POINTS], "degraded": True}
+
+    @staticmethod
+    async def _remember_experience(document_id: int, owner: str, job_title: str, company: str, start_date: str, end_date: str, points: List[str]):
+        await context_manager.add_message(document_id, "user", f"{job_title} at {company} ({start_date} - {end_date})", owner)
+        await context_manager.add_message(document_id, "assistant", f"Highlights at {company}: " + "; ".join(points[:2]), owner)
+
     @staticmethod
-    async def generate_skills(work_experience: SkillsRequest):
+    async def generate_skills(work_experience: SkillsRequest, owner: str = ""):
+        career = ""
         try:
-            
-            prompt = f"""Based on our previous conversation about work experience, generate 15-20 highly relevant professional skills.
-            Analyze the job titles, companies, and responsibilities mentioned and generate skills that are:
-            - DIRECTLY relevant to those specific roles and industries
-            - Both technical and soft skills matching the experience level
-            - Specific to the career path discussed, not generic
-            - Appropriate for the industry and seniority level
-            - Work Experience: ${work_experience}
-            Return as JSON array of strings."""
-            
-            messages = [
-                {"role": "system", "content": "You are a professional CV expert. Based on the work experience context, generate highly relevant and specific skills."}
-            ] + [{"role": "user", "content": prompt}]
-            
-            response = client.chat.completions.create(
-                model=DEFAULT_MODEL,
-                messages=messages,
-                temperature=0.6,
-                max_tokens=300,
-            )
-            
-            content = response.choices[0].message.content.strip()
-            
-            try:
-                skills = json.loads(content)
-            except json.JSONDecodeError:
-                json_match = re.search(r'\[.*\]', content, re.DOTALL)
-                if json_match:
-                    skills = json.loads(json_match.group())
-                else:
-                    skills = []
-                    for line in content.split('\n'):
-                        line = line.strip()
-                        if line and not line.startswith('[') and not line.startswith(']'):
-                            skill = line.strip('",\'').strip()
-                            if skill:
-                                skills.append(skill)
-            
+            career = await CVGenerator._career_context(work_experience.experience, work_experience.document_id, owner)
+            if not career:
+                return {"success": False, "error": "No work experience given or stored for this document"}
+
+            messages, cache_key = CVGenerator._prompt("skills", {"career": career}, owner)
+            cached = await generation_cache.get(cache_key)
+            if cached is not None:
+                return {"success": True, "skills": cached}
+
+            async def run():
+                return await CVGenerator._complete_items("skills", messages)
+
+            skills = await single_flight.do(cache_key, run)
+            if skills:
+                await generation_cache.add(cache_key, skills)
+                if work_experience.document_id is not None:
+                    await context_manager.add_message(work_experience.document_id, "assistant", "Skills: " + ", ".join(skills[:15]), owner)
+
             return {"success": True, "skills": skills}
-            
+
         except Exception as e:
-            return {"success": False, "error": str(e)}
-    
+            if not CVGenerator._degrade(e):
+                return {"success": False, "error": str(e)}
+            return {"success": True, "skills": template_fallback.skills(career), "degraded": True}
+
     @staticmethod
-    async def generate_summary(cv_data: DirectSummaryRequest):
+    async def generate_summary(cv_data: DirectSummaryRequest, owner: str = ""):
+        career = ""
         try:
-            skills_text = ", ".join(cv_data.skills[:8]) if cv_data.skills else ""
-            
-            work_exp = "".join([
-                f"{exp.title} at {exp.company} ({exp.duration}). "
-                for exp in cv_data.experience
-            ]) if cv_data.experience else ""
-            
-            prompt = f"""Create 1 professional summary (50-80 words) for this person based on their CV data:
-            
-            Key Skills: {skills_text}
-            Work Experience: {work_exp}
-
-            Requirements:
-            - Exactly 50-80 words
-            - Professional tone
-            - Highlight key strengths and achievements
-            - Focus on value proposition
-            - Write in third person
-
-            Return as a JSON array of strings (each string = one full summary)."""
-            
-            messages = [
-                {"role": "system", "content": "You are a professional CV expert. Generate professional summaries."},
-                {"role": "user", "content": prompt}
-            ]
-            
-            response = client.chat.completions.create(
-                model=DEFAULT_MODEL,
-                messages=messages,
-                temperature=0.6,
-                max_tokens=600,
-            )
-            
-            content = response.choices[0].message.content.strip()
-            
-            return {"success": True, "summary": content}
-            
+            career = await CVGenerator._career_context(cv_data.experience, cv_data.document_id, owner)
+            messages, flight_key = CVGenerator._prompt("summary", CVGenerator._summary_values(cv_data, career), owner)
+
+            async def run():
+                return await CVGenerator._complete_items("summary", messages)
+
+            suggestions = await single_flight.do(flight_key, run)
+
+            return {"success": True, "suggestions": suggestions}
+
         except Exception as e:
-            return {"success": False, "error": str(e)}
\ No newline at end of file
+            if not CVGenerator._degrade(e):
+                return {"success": False, "error": str(e)}
+            title = cv_data.experience[0].title if cv_data.experience else ""
+            suggestions = template_fallback.summary(cv_data.name, cv_data.skills, career, title)
+            return {"success": True, "suggestions": suggestions, "degraded": True}
+
+    @staticmethod
+    async def generate_work_experience_batch(experiences: List[WorkExperienceRequest], owner: str = ""):
+        """Generate bullets for many experiences concurrently, one call per distinct entry"""
+        unique: Dict[str, WorkExperienceRequest] = {}
+        item_keys = []
+        for exp in experiences:
+            key = canonical_hash(exp.dict(exclude={"document_id"}))
+            unique.setdefault(key, exp)
+            item_keys.append(key)
+
+        async def timed(exp: WorkExperienceRequest):
+            start = time.perf_counter()
+            result = await CVGenerator.generate_work_experience(**exp.dict(), owner=owner)
+            result["latency_ms"] = (time.perf_counter() - start) * 1000
+            return result
+
+        start = time.perf_counter()
+        results = await bounded_gather([timed(exp) for exp in unique.values()], LLM_FANOUT_LIMIT)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        by_key = {
+            key: r if not isinstance(r, Exception) else {"success": False, "error": str(r), "latency_ms": 0.0}
+            for key, r in zip(unique.keys(), results)
+        }
+
+        items = []
+        for index, (exp, key) in enumerate(zip(experiences, item_keys)):
+            result = by_key[key]
+            items.append({
+                "index": index,
+                "job_title": exp.job_title,
+                "company": exp.company,
+                "points": result.get("points", []),
+                "error": result.get("error"),
+                "degraded": result.get("degraded", False),
+                "latency_ms": round(result["latency_ms"], 2),
+            })
+
+        return {
+            "items": items,
+            "unique_items": len(unique),
+            "elapsed_ms": round(elapsed_ms, 2),
+            "sum_latency_ms": round(sum(r["latency_ms"] for r in by_key.values()), 2),
+        }
+
+    @staticmethod
+    def roles_of(experience: Optional[List[WorkExperience]]) -> List[Role]:
+        return [(exp.title, exp.company, exp.duration) for exp in experience or []]
+
+    @staticmethod
+    def roles_of_resume(experience: Optional[Dict]) -> List[Role]:
+        """Roles of a saved resume, whose experience is {"exp_0": {"title": ..., "company": ...}, ...}"""
+        roles = []
+        for entry in (experience or {}).values():
+            if not isinstance(entry, dict) or not entry.get("title") or not entry.get("company"):
+                continue
+            end = "Present" if entry.get("is_current") else entry.get("end_date") or ""
+            roles.append((entry["title"], entry["company"], f"{entry.get('start_date') or ''} - {end}"))
+        return roles
+
+    @staticmethod
+    async def speculate(owner: str, role: Optional[Role] = None, roles: Optional[List[Role]] = None):
+        """Pre-generate skills and a summary for the user's work history in the background.
+
+        `role` adds one job to the history built up from /work-experience
+        calls; `roles` replaces it with a saved resume's jobs.
+        """
+        history = await speculative_cache.add_role(owner, role) if role else await speculative_cache.set_roles(owner, roles or [])
+        if not history:
+            return
+
+        async def run():
+            # Its own accounting label, and none of the triggering request's deadline
+            tag_llm_calls("speculative", owner)
+            set_request_deadline(0)
+            if await llm_metrics.over_quota(owner):
+                return
+
+            experience = [WorkExperience(title=title, company=company, duration=duration) for title, company, duration in history]
+            skills_result = await CVGenerator.generate_skills(SkillsRequest(experience=experience), owner)
+            if not skills_result["success"] or skills_result.get("degraded"):
+                return
+            skills = skills_result["skills"]
+            await speculative_cache.put(owner, "skills", history, {"skills": skills})
+
+            summary_result = await CVGenerator.generate_summary(
+                DirectSummaryRequest(name="", skills=skills, experience=experience), owner
+            )
+            if summary_result["success"] and not summary_result.get("degraded"):
+                await speculative_cache.put(owner, "summary", history, {
+                    "skills": skills,
+                    "suggestions": summary_result["suggestions"],
+                })
+
+        speculative_cache.schedule(owner, run)
+
+    @staticmethod
+    async def speculative_skills(request: SkillsRequest, owner: str) -> Optional[List[str]]:
+        if request.document_id is not None:
+            return None
+        hit = await speculative_cache.get(owner, "skills", CVGenerator.roles_of(request.experience))
+        return hit["skills"] if hit else None
+
+    @staticmethod
+    async def speculative_summary(request: DirectSummaryRequest, owner: str) -> Optional[List[str]]:
+        """A pre-generated summary for the same jobs, if it was written from a superset of the requested skills"""
+        if request.document_id is not None:
+            return None
+        hit = await speculative_cache.get(owner, "summary", CVGenerator.roles_of(request.experience))
+        if not hit:
+            return None
+        known = {skill.lower() for skill in hit["skills"]}
+        if any(skill.lower() not in known for skill in request.skills or []):
+            return None
+        return hit["suggestions"]
+
+    @staticmethod
+    def _split_duration(duration: str) -> Tuple[str, str]:
+        parts = re.split(r"\s+(?:-|–|to)\s+", duration or "", maxsplit=1)
+        return (parts[0], parts[1]) if len(parts) == 2 else (duration or "", "")
+
+    @staticmethod
+    async def generate_draft(cv_data: CVData):
+        """Bullets for every experience, skills and summary in one parallel fan-out"""
+        experiences = cv_data.experience or []
+        location = ", ".join(part for part in (cv_data.city, cv_data.country) if part)
+
+        calls = []
+        for exp in experiences:
+            start_date, end_date = CVGenerator._split_duration(exp.duration)
+            calls.append(CVGenerator.generate_work_experience(
+                job_title=exp.title,
+                company=exp.company,
+                location=location,
+                role=cv_data.job_title or exp.title,
+                start_date=start_date,
+                end_date=end_date,
+            ))
+        if experiences:
+            calls.append(CVGenerator.generate_skills(SkillsRequest(experience=experiences)))
+        calls.append(CVGenerator.generate_summary(DirectSummaryRequest(
+            name=cv_data.name,
+            skills=cv_data.skills,
+            experience=experiences,
+        )))
+
+        results = await bounded_gather(calls, LLM_FANOUT_LIMIT)
+        results = [
+            r if not isinstance(r, Exception) else {"success": False, "error": str(r)}
+            for r in results
+        ]
+
+        draft = {
+            "experience": [],
+            "skills": cv_data.skills or [],
+            "summary": [],
+            "errors": {},
+            "degraded": any(r.get("degraded") for r in results),
+        }
+        for exp, result in zip(experiences, results):
+            draft["experience"].append({
+                "title": exp.title,
+                "company": exp.company,
+                "points": result.get("points", []),
+                "error": result.get("error"),
+            })
+
+        if experiences:
+            skills_result = results[len(experiences)]
+            if skills_result["success"]:
+                draft["skills"] = skills_result["skills"]
+            else:
+                draft["errors"]["skills"] = skills_result["error"]
+
+        summary_result = results[-1]
+        if summary_result["success"]:
+            draft["summary"] = summary_result["suggestions"]
+        else:
+            draft["errors"]["summary"] = summary_result["error"]
+
+        return draft
+
+    @staticmethod
+    async def _stream_items(task: str, messages: List[Dict[str, str]], count: Optional[int] = None) -> AsyncIterator[str]:
+        """Yield array items as soon as each string literal closes, skipping near-duplicates"""
+        model = RESPONSE_MODELS[task]
+        parser = JSONArrayStreamParser()
+        keep = NearDuplicateFilter()
+        content = []
+        items = []
+        parsed = 0
+
+        stream = model_router.stream(task, messages, temperature=0.6, response_format=response_format(model))
+        async for delta in stream:
+            content.append(delta)
+            for item in parser.feed(delta):
+                parsed += 1
+                if len(item.split()) >= MIN_ITEM_WORDS[task] and keep.add(item):
+                    items.append(item)
+                    yield item
+
+        if parsed:
+            llm_metrics.record_parse("stream")
+        else:
+            # The model ignored the JSON instruction, fall back to the full parse
+            for item in drop_truncated(parse_items("".join(content), model), MIN_ITEM_WORDS[task]):
+                parsed += 1
+                if keep.add(item):
+                    items.append(item)
+                    yield item
+        llm_metrics.record_postprocess("duplicates_dropped", keep.dropped)
+        llm_metrics.record_postprocess("fragments_dropped", parsed - len(items) - keep.dropped)
+
+        for item in await CVGenerator._top_up(task, messages, items, count):
+            yield item
+
+    @staticmethod
+    async def stream_work_experience(
+        job_title: str,
+        company: str,
+        location: str,
+        role: str,
+        start_date: str,
+        end_date: str,
+        document_id: Optional[int] = None,
+        owner: str = "",
+    ) -> AsyncIterator[str]:
+        indexed, fast = CVGenerator._indexed_points(job_title, role)
+        if fast:
+            for item in indexed:
+                yield item
+            return
+
+        count = CVGenerator._llm_point_count(indexed)
+        messages, _ = CVGenerator._prompt("work_experience", {
+            "job_title": job_title,
+            "company": company,
+            "location": location,
+            "role": role,
+            "start_date": start_date,
+            "end_date": end_date,
+            "count": count,
+        }, owner)
+        generated = []
+        async for item in CVGenerator._stream_items("work_experience", messages, count):
+            generated.append(item)
+            yield item
+        await bullet_index.record(job_title, role, company, generated)
+
+        points = CVGenerator._merge_points(generated, indexed)
+        for item in points:
+            if item not in generated:
+                yield item
+        if points and document_id is not None:
+            await CVGenerator._remember_experience(document_id, owner, job_title, company, start_date, end_date, points)
+
+    @staticmethod
+    async def stream_skills(work_experience: SkillsRequest, owner: str = "") -> AsyncIterator[str]:
+        career = await CVGenerator._career_context(work_experience.experience, work_experience.document_id, owner)
+        if not career:
+            raise ValueError("No work experience given or stored for this document")
+        messages, _ = CVGenerator._prompt("skills", {"career": career}, owner)
+        async for item in CVGenerator._stream_items("skills", messages):
+            yield item
+
+    @staticmethod
+    async def stream_summary(cv_data: DirectSummaryRequest, owner: str = "") -> AsyncIterator[str]:
+        career = await CVGenerator._career_context(cv_data.experience, cv_data.document_id, owner)
+        messages, _ = CVGenerator._prompt("summary", CVGenerator._summary_values(cv_data, career), owner)
+        async for item in CVGenerator._stream_items("summary", messages):
+            yield item
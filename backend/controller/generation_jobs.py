@@ -0,0 +1,50 @@
+from typing import Any, Dict, Type
+from pydantic import BaseModel
+from controller.cv_generator import CVGenerator
+from models.cv_models import (
+    WorkExperienceRequest,
+    SkillsRequest,
+    DirectSummaryRequest,
+    CVData,
+    WorkExperienceResponse,
+    SkillsResponse,
+    SummaryResponse,
+    DraftResponse,
+)
+
+# Request model accepted for each job kind
+JOB_MODELS: Dict[str, Type[BaseModel]] = {
+    "work-experience": WorkExperienceRequest,
+    "skills": SkillsRequest,
+    "summary": DirectSummaryRequest,
+    "draft": CVData,
+}
+
+
+class GenerationJobs:
+
+    @staticmethod
+    async def run(kind: str, payload: Dict[str, Any], owner: str = "") -> Dict[str, Any]:
+        """Run one queued generation; returns the same body the sync endpoint would"""
+        request = JOB_MODELS[kind](**payload)
+
+        if kind == "work-experience":
+            result = await CVGenerator.generate_work_experience(**request.dict(), owner=owner)
+            if result["success"]:
+                return {"success": True, "result": WorkExperienceResponse(points=result["points"], degraded=result.get("degraded", False)).dict()}
+
+        elif kind == "skills":
+            result = await CVGenerator.generate_skills(request, owner=owner)
+            if result["success"]:
+                return {"success": True, "result": SkillsResponse(skills=result["skills"], degraded=result.get("degraded", False)).dict()}
+
+        elif kind == "summary":
+            result = await CVGenerator.generate_summary(request, owner=owner)
+            if result["success"]:
+                return {"success": True, "result": SummaryResponse(suggestions=result["suggestions"], degraded=result.get("degraded", False)).dict()}
+
+        else:
+            draft = await CVGenerator.generate_draft(request)
+            return {"success": True, "result": DraftResponse(**draft).dict()}
+
+        return {"success": False, "error": result["error"]}
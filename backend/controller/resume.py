@@ -1,67 +1,94 @@
+import base64
+from datetime import datetime
 from fastapi import HTTPException, status
+from pydantic import ValidationError
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from db.scheme import Resume, User
-from models.cv_models import ResumeCreate, ResumeUpdate, ResumeResponse
-from typing import List, Dict
+from sqlalchemy import and_, delete, insert, or_, select, update
+from sqlalchemy.orm import undefer_group
+from db.scheme import Resume, utc_now
+from models.cv_models import ResumeCreate, ResumeUpdate, ResumeResponse, ResumePage, ResumePatchResponse, ResumeSummary
+from utils.json_patch import JSON_PATCH_MEDIA_TYPE, MERGE_PATCH_MEDIA_TYPE, JSONPatchError, json_patch, merge_patch, touched_fields
+from typing import Any, List, Dict, Optional, Tuple
+
+# Columns the resume list shows; the JSON sections and summary stay in the table
+SUMMARY_COLUMNS = (
+    Resume.id,
+    Resume.name,
+    Resume.job_title,
+    Resume.template_id,
+    Resume.theme_color,
+    Resume.created_at,
+    Resume.updated_at,
+)
+# Fields a PATCH may change; the same set PUT accepts
+PATCHABLE_FIELDS = set(ResumeUpdate.model_fields)
+# Patchable fields ResumeResponse cannot return as null
+REQUIRED_FIELDS = {name for name, field in ResumeResponse.model_fields.items() if field.is_required()} & PATCHABLE_FIELDS
+# Columns an update reads back for its response; updated_at is set by the update itself
+RESPONSE_FIELDS = [name for name in ResumeResponse.model_fields if name != "updated_at"]
+# MySQL error for an INSERT whose foreign key has no parent row
+MYSQL_NO_REFERENCED_ROW = 1452
 
 
 class ResumeController:
     
     @staticmethod
-    async def _get_resume_by_id_and_user(resume_id: int, user_id: int, db: AsyncSession) -> Resume:
+    async def _get_resume_by_id_and_user(resume_id: int, user_id: int, db: AsyncSession, sections: bool = True) -> Resume:
         query = select(Resume).where(Resume.id == resume_id, Resume.user_id == user_id)
+        if sections:
+            query = query.options(undefer_group("sections"))
         result = await db.execute(query)
         resume = result.scalar_one_or_none()
         
         if not resume:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Resume not found or you don't have permission to access it"
-            )
+            raise ResumeController._not_found()
         return resume
     
     @staticmethod
-    async def _check_user_exists(user_id: int, db: AsyncSession) -> None:
-        result = await db.execute(select(User).where(User.id == user_id))
-        if not result.scalar_one_or_none():
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="User not found"
-            )
-    
-    @staticmethod
-    def _create_resume_from_data(resume_data: ResumeCreate, user_id: int) -> Resume:
-        return Resume(
-            user_id=user_id,
-            **resume_data.dict()
+    def _not_found() -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Resume not found or you don't have permission to access it"
         )
-    
+
     @staticmethod
     async def create_resume(resume_data: ResumeCreate, user_id: int, db: AsyncSession) -> ResumeResponse:
+        """One INSERT; the users foreign key stands in for an existence check"""
+        now = utc_now()
+        values = {**resume_data.dict(), "user_id": user_id, "created_at": now, "updated_at": now}
         try:
-            await ResumeController._check_user_exists(user_id, db)
-            
-            new_resume = ResumeController._create_resume_from_data(resume_data, user_id)
-            db.add(new_resume)
+            result = await db.execute(insert(Resume).values(**values))
             await db.commit()
-            await db.refresh(new_resume)
-            
-            return ResumeResponse.from_orm(new_resume)
-            
-        except HTTPException:
-            raise
+        except IntegrityError as e:
+            await db.rollback()
+            if getattr(e.orig, "args", (None,))[0] == MYSQL_NO_REFERENCED_ROW:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="User not found"
+                )
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to create resume: {str(e)}"
+            )
         except Exception as e:
             await db.rollback()
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Failed to create resume: {str(e)}"
             )
+
+        return ResumeResponse(id=result.inserted_primary_key[0], **values)
     
     @staticmethod
     async def get_user_resumes(user_id: int, db: AsyncSession) -> List[ResumeResponse]:
         try:
-            query = select(Resume).where(Resume.user_id == user_id).order_by(Resume.created_at.desc())
+            query = (
+                select(Resume)
+                .where(Resume.user_id == user_id)
+                .options(undefer_group("sections"))
+                .order_by(Resume.created_at.desc())
+            )
             result = await db.execute(query)
             resumes = result.scalars().all()
             
@@ -73,6 +100,53 @@ class ResumeController:
                 detail=f"Failed to fetch resumes: {str(e)}"
             )
     
+    @staticmethod
+    def _encode_cursor(created_at: datetime, resume_id: int) -> str:
+        return base64.urlsafe_b64encode(f"{created_at.isoformat()}|{resume_id}".encode()).decode().rstrip("=")
+
+    @staticmethod
+    def _decode_cursor(cursor: str) -> Tuple[datetime, int]:
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+            created_at, resume_id = raw.rsplit("|", 1)
+            return datetime.fromisoformat(created_at), int(resume_id)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor"
+            )
+
+    @staticmethod
+    async def list_user_resumes(user_id: int, db: AsyncSession, limit: int = 20, cursor: Optional[str] = None) -> ResumePage:
+        """One page of the user's resumes, newest first, with summary columns only.
+
+        Pages are keyed on (created_at, id) rather than offsets, so each page
+        is an index range scan on (user_id, created_at) whatever its depth.
+        """
+        query = select(*SUMMARY_COLUMNS).where(Resume.user_id == user_id)
+        if cursor:
+            created_at, resume_id = ResumeController._decode_cursor(cursor)
+            query = query.where(or_(
+                Resume.created_at < created_at,
+                and_(Resume.created_at == created_at, Resume.id < resume_id),
+            ))
+        query = query.order_by(Resume.created_at.desc(), Resume.id.desc()).limit(limit + 1)
+
+        try:
+            rows = (await db.execute(query)).all()
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to fetch resumes: {str(e)}"
+            )
+
+        items = [ResumeSummary(**row._mapping) for row in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit:
+            last = items[-1]
+            next_cursor = ResumeController._encode_cursor(last.created_at, last.id)
+        return ResumePage(items=items, next_cursor=next_cursor)
+
     @staticmethod
     async def get_resume_by_id(resume_id: int, user_id: int, db: AsyncSession) -> ResumeResponse:
         try:
@@ -89,19 +163,38 @@ class ResumeController:
     
     @staticmethod
     async def update_resume(resume_id: int, resume_data: ResumeUpdate, user_id: int, db: AsyncSession) -> ResumeResponse:
+        """UPDATE scoped to the owner, then a read of only the columns it did not write.
+
+        PUT returns the whole resume but may set only some fields, and MySQL
+        has no UPDATE ... RETURNING, so the columns this write did not set
+        (version and created_at among them) have to be read back. The
+        written values and updated_at come from the request instead, which
+        keeps large sections the client just sent off the wire.
+        """
+        update_data = resume_data.dict(exclude_unset=True)
+        if not update_data:
+            return await ResumeController.get_resume_by_id(resume_id, user_id, db)
+        now = utc_now()
         try:
-            resume = await ResumeController._get_resume_by_id_and_user(resume_id, user_id, db)
-            
-            update_data = resume_data.dict(exclude_unset=True)
-            for field, value in update_data.items():
-                setattr(resume, field, value)
-            
+            result = await db.execute(
+                update(Resume)
+                .where(Resume.id == resume_id, Resume.user_id == user_id)
+                .values(**update_data, version=Resume.version + 1, updated_at=now)
+                .execution_options(synchronize_session=False)
+            )
+            # rowcount counts matched rows: the MySQL dialect connects with CLIENT.FOUND_ROWS
+            if result.rowcount == 0:
+                raise ResumeController._not_found()
+            unwritten = [getattr(Resume, field) for field in RESPONSE_FIELDS if field not in update_data]
+            row = (await db.execute(
+                select(*unwritten).where(Resume.id == resume_id, Resume.user_id == user_id)
+            )).one()
             await db.commit()
-            await db.refresh(resume)
-            
-            return ResumeResponse.from_orm(resume)
+
+            return ResumeResponse(**row._mapping, **update_data, updated_at=now)
             
         except HTTPException:
+            await db.rollback()
             raise
         except Exception as e:
             await db.rollback()
@@ -110,21 +203,143 @@ class ResumeController:
                 detail=f"Failed to update resume: {str(e)}"
             )
     
+    @staticmethod
+    def _expected_version(if_match: Optional[str]) -> Optional[int]:
+        """Version named by an If-Match header ('"3"', 'W/"3"' or '3'); None for '*'"""
+        if not if_match:
+            raise HTTPException(
+                status_code=status.HTTP_428_PRECONDITION_REQUIRED,
+                detail="If-Match with the resume version is required"
+            )
+        tag = if_match.strip()
+        if tag == "*":
+            return None
+        try:
+            return int(tag.removeprefix("W/").strip('"'))
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="If-Match must be the resume version"
+            )
+
+    @staticmethod
+    def _stale(version: Optional[int] = None) -> HTTPException:
+        if version is None:
+            return HTTPException(
+                status_code=status.HTTP_412_PRECONDITION_FAILED,
+                detail="Resume was changed by another write; reload it and retry"
+            )
+        return HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail=f"Resume was changed by another write; current version is {version}",
+            headers={"ETag": f'"{version}"'},
+        )
+
+    @staticmethod
+    async def patch_resume(
+        resume_id: int,
+        media_type: str,
+        patch: Any,
+        if_match: Optional[str],
+        user_id: int,
+        db: AsyncSession,
+    ) -> ResumePatchResponse:
+        """Apply a JSON Patch or merge patch to the fields it names and write only what changed.
+
+        Only the touched columns are read. The UPDATE is conditional on the
+        version read, so a write that lands in between fails with 412
+        instead of being overwritten.
+        """
+        if media_type not in (JSON_PATCH_MEDIA_TYPE, MERGE_PATCH_MEDIA_TYPE):
+            raise HTTPException(
+                status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                detail=f"Use {JSON_PATCH_MEDIA_TYPE} or {MERGE_PATCH_MEDIA_TYPE}"
+            )
+        expected = ResumeController._expected_version(if_match)
+        try:
+            fields = touched_fields(patch, media_type)
+        except JSONPatchError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        unknown = [field for field in fields if field not in PATCHABLE_FIELDS]
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Fields cannot be patched: {', '.join(unknown)}"
+            )
+
+        try:
+            query = select(Resume.version, Resume.updated_at, *[getattr(Resume, field) for field in fields])
+            row = (await db.execute(query.where(Resume.id == resume_id, Resume.user_id == user_id))).one_or_none()
+            if row is None:
+                raise ResumeController._not_found()
+            version = row.version
+            if expected is not None and expected != version:
+                raise ResumeController._stale(version)
+
+            current = {field: row._mapping[field] for field in fields}
+            try:
+                if media_type == MERGE_PATCH_MEDIA_TYPE:
+                    patched = merge_patch(current, patch)
+                else:
+                    patched = json_patch(current, patch)
+                values = ResumeUpdate(**{field: patched.get(field) for field in fields}).dict(include=set(fields))
+            except (JSONPatchError, ValidationError) as e:
+                raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+            missing = [field for field in REQUIRED_FIELDS & set(fields) if values[field] is None]
+            if missing:
+                raise HTTPException(
+                    status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                    detail=f"Fields cannot be removed: {', '.join(missing)}"
+                )
+
+            changed = {field: value for field, value in values.items() if value != current[field]}
+            if not changed:
+                return ResumePatchResponse(id=resume_id, version=version, updated_at=row.updated_at, changed=[])
+
+            now = utc_now()
+            result = await db.execute(
+                update(Resume)
+                .where(Resume.id == resume_id, Resume.user_id == user_id, Resume.version == version)
+                .values(**changed, version=version + 1, updated_at=now)
+                .execution_options(synchronize_session=False)
+            )
+            if result.rowcount == 0:
+                raise ResumeController._stale()
+            await db.commit()
+
+            return ResumePatchResponse(id=resume_id, version=version + 1, updated_at=now, changed=sorted(changed))
+
+        except HTTPException:
+            await db.rollback()
+            raise
+        except Exception as e:
+            await db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to patch resume: {str(e)}"
+            )
+
     @staticmethod
     async def delete_resume(resume_id: int, user_id: int, db: AsyncSession) -> Dict[str, str]:
+        """One DELETE scoped to the owner; no matching row means not found or not theirs"""
         try:
-            resume = await ResumeController._get_resume_by_id_and_user(resume_id, user_id, db)
-            
-            await db.delete(resume)
+            result = await db.execute(
+                delete(Resume)
+                .where(Resume.id == resume_id, Resume.user_id == user_id)
+                .execution_options(synchronize_session=False)
+            )
+            if result.rowcount == 0:
+                raise ResumeController._not_found()
             await db.commit()
             
             return {"message": "Resume deleted successfully"}
             
         except HTTPException:
+            await db.rollback()
             raise
         except Exception as e:
             await db.rollback()
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Failed to delete resume: {str(e)}"
-            )
\ No newline at end of file
+            )
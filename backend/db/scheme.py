@@ -1,10 +1,59 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, JSON, ForeignKey
+import json
+import os
+import zlib
+from datetime import datetime, timezone
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, JSON, ForeignKey, Index, LargeBinary
+from sqlalchemy.dialects import mysql
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import deferred, relationship
+from sqlalchemy.types import TypeDecorator
 
 Base = declarative_base()
 
+# JSON smaller than this is stored as-is; zlib only pays off on larger sections
+SECTION_COMPRESS_MIN_BYTES = int(os.getenv("SECTION_COMPRESS_MIN_BYTES", "256"))
+SECTION_COMPRESS_LEVEL = int(os.getenv("SECTION_COMPRESS_LEVEL", "6"))
+
+
+def utc_now() -> datetime:
+    """Resume timestamps: app clock, naive UTC, whole seconds like MySQL DATETIME"""
+    return datetime.now(timezone.utc).replace(tzinfo=None, microsecond=0)
+
+
+class CompressedJSON(TypeDecorator):
+    """JSON kept in a BLOB, zlib-compressed once it is large enough.
+
+    The first byte says how the rest is stored: b"z" for zlib, b"j" for
+    plain JSON. Values are encoded and decoded transparently on bind and
+    load.
+    """
+
+    impl = LargeBinary
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "mysql":
+            return dialect.type_descriptor(mysql.MEDIUMBLOB())
+        return dialect.type_descriptor(LargeBinary())
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        raw = json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode()
+        if len(raw) < SECTION_COMPRESS_MIN_BYTES:
+            return b"j" + raw
+        return b"z" + zlib.compress(raw, SECTION_COMPRESS_LEVEL)
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        marker, body = value[:1], value[1:]
+        if marker == b"z":
+            body = zlib.decompress(body)
+        return json.loads(body)
+
+
 class User(Base):
     __tablename__ = "users"
     
@@ -29,6 +78,9 @@ class User(Base):
 
 class Resume(Base):
     __tablename__ = "resumes"
+    __table_args__ = (
+        Index("ix_resumes_user_id_created_at", "user_id", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
 
@@ -47,12 +99,13 @@ class Resume(Base):
     # Resume Details
     job_title = Column(String(200))
     summary = Column(Text)
-    skills = Column(JSON)
-    experience = Column(JSON)
-    education = Column(JSON)
-    certifications = Column(JSON)
-    projects = Column(JSON)
-    languages = Column(JSON)
+    # Sections: compressed, and only loaded with undefer_group("sections")
+    skills = deferred(Column(CompressedJSON), group="sections")
+    experience = deferred(Column(CompressedJSON), group="sections")
+    education = deferred(Column(CompressedJSON), group="sections")
+    certifications = deferred(Column(CompressedJSON), group="sections")
+    projects = deferred(Column(CompressedJSON), group="sections")
+    languages = deferred(Column(CompressedJSON), group="sections")
 
     # Social Links
     linkedin_url = Column(String(500))
@@ -63,9 +116,13 @@ class Resume(Base):
     template_id = Column(Integer, nullable=False)
     theme_color = Column(String(20), default="blue")
 
-    # Timestamps
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    # Timestamps; every write path stamps them with utc_now so the values
+    # the API returns are the ones stored (server_default covers raw SQL)
+    created_at = Column(DateTime(timezone=True), default=utc_now, server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), default=utc_now, server_default=func.now(), onupdate=utc_now)
+
+    # Bumped by every write; the ETag that PATCH checks If-Match against
+    version = Column(Integer, nullable=False, default=1, server_default="1")
 
     user = relationship("User", back_populates="resumes")
 
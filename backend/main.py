@@ -1,13 +1,18 @@
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 from dotenv import load_dotenv
 from routes import mainrouter
+from routes.cv_gen import _require_admin
 from middleware.auth import JWTAuthMiddleware 
 from middleware.retelimter import RateLimitMiddleware
 from config.redis import init_redis
+from config.log import setup_logging
+from utils.llm_client import llm_client
+from db.db import dispose_engines, get_pool_stats
 
 load_dotenv()
+setup_logging()
 
 app = FastAPI(
     docs_url="/docs",
@@ -30,10 +35,20 @@ app.include_router(mainrouter, prefix="/api")
 async def startup_event():
     await init_redis()
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    await llm_client.aclose()
+    await dispose_engines()
+
 @app.get("/")
 async def root():
     return {"message": "Welcome to the AI CV Builder API!"} 
 
+@app.get("/db/stats", dependencies=[Depends(_require_admin)])
+async def db_stats():
+    """Connection pool size, checkouts, wait time and overflow per engine, and read routing"""
+    return get_pool_stats()
+
 @app.get("/private")
 async def private():
     return {"message": "This is a private endpoint."}
@@ -1,17 +1,18 @@
 from fastapi import Request, status
 from fastapi.responses import JSONResponse
 from starlette.middleware.base import BaseHTTPMiddleware
-import jwt
-import os
-
-JWT_SECRET = os.getenv("JWT_SECRET", "top-secret")
-JWT_ALGORITHM = "HS256"
+from utils.jwtgen import decode_access_token
 
 
 class JWTAuthMiddleware(BaseHTTPMiddleware):
     def __init__(self, app):
         super().__init__(app)
-        self.protected_prefixes = ["/resume-op"]
+        self.protected_prefixes = [
+            "/api/resume-op",
+            "/api/auth/profile",
+            # Accepted bullets can be served to other users, so they need an owner
+            "/api/cv-gen/work-experience/accept",
+        ]
 
     async def dispatch(self, request: Request, call_next):
         if request.method == "OPTIONS":
@@ -29,20 +30,18 @@ class JWTAuthMiddleware(BaseHTTPMiddleware):
 
         token = auth_header.split(" ")[1]
 
+        payload = decode_access_token(token)
         try:
-            payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
-            request.state.user_id = payload.get("user_id")
-            request.state.user_email = payload.get("email")
-
-        except jwt.ExpiredSignatureError:
-            return JSONResponse(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                content={"detail": "Token expired"}
-            )
-        except jwt.InvalidTokenError:
+            user_id = int(payload["sub"]) if payload else None
+        except (KeyError, TypeError, ValueError):
+            user_id = None
+        if user_id is None:
             return JSONResponse(
                 status_code=status.HTTP_401_UNAUTHORIZED,
-                content={"detail": "Invalid token"}
+                content={"detail": "Invalid or expired token"}
             )
 
+        request.state.user_id = user_id
+        request.state.user_email = payload.get("email")
+
         return await call_next(request)
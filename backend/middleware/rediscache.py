@@ -2,7 +2,8 @@ import json
 import hashlib
 from functools import wraps
 from fastapi import Request
-from config.redis import redis_client
+from fastapi.encoders import jsonable_encoder
+from config import redis as redis_config
 
 class RedisCache:
     def __init__(self, expire_minutes: int = 20):
@@ -11,7 +12,8 @@ class RedisCache:
     def cache_key(self, request: Request) -> str:
         """Generate cache key from request"""
         key_data = f"{request.method}:{request.url.path}:{request.url.query}"
-        return f"cache:{hashlib.md5(key_data.encode()).hexdigest()}"
+        user_id = getattr(request.state, "user_id", None)
+        return f"cache:user_{user_id}:{hashlib.md5(key_data.encode()).hexdigest()}"
     
     def cache_get(self, expire_minutes: int = 20):
         """Cache GET requests"""
@@ -19,8 +21,9 @@ class RedisCache:
             @wraps(func)
             async def wrapper(*args, **kwargs):
                 request = kwargs.get('request') or (args[0] if args and hasattr(args[0], 'method') else None)
+                redis_client = redis_config.redis_client
                 
-                if request and request.method == "GET":
+                if redis_client and request and request.method == "GET":
                     cache_key = self.cache_key(request)
                     cached = await redis_client.get(cache_key)
                     
@@ -29,12 +32,12 @@ class RedisCache:
                 
                 result = await func(*args, **kwargs)
                 
-                if request and request.method == "GET":
+                if redis_client and request and request.method == "GET":
                     cache_key = self.cache_key(request)
                     await redis_client.setex(
                         cache_key, 
                         expire_minutes * 60, 
-                        json.dumps(result, default=str)
+                        json.dumps(jsonable_encoder(result), default=str)
                     )
                 
                 return result
@@ -43,12 +46,18 @@ class RedisCache:
     
     async def purge_pattern(self, pattern: str):
         """Purge cache keys matching pattern"""
+        redis_client = redis_config.redis_client
+        if not redis_client:
+            return
         keys = await redis_client.keys(f"cache:*{pattern}*")
         if keys:
             await redis_client.delete(*keys)
     
     async def purge_all(self):
         """Purge all cache"""
+        redis_client = redis_config.redis_client
+        if not redis_client:
+            return
         keys = await redis_client.keys("cache:*")
         if keys:
             await redis_client.delete(*keys)
@@ -58,8 +58,20 @@ class WorkExperienceRequest(BaseModel):
     role: str
     start_date: str
     end_date: str
+    document_id: Optional[int] = None
+
+class BulletAcceptRequest(BaseModel):
+    job_title: str
+    role: str = ""
+    company: str = ""
+    points: List[str]
+
+class BatchWorkExperienceRequest(BaseModel):
+    experiences: List[WorkExperienceRequest]
+
 class SkillsRequest(BaseModel):
-    experience: List[WorkExperience]
+    experience: List[WorkExperience] = []
+    document_id: Optional[int] = None
 class SummaryRequest(BaseModel):
     document_id: int  
     cv_data: CVData
@@ -68,16 +80,68 @@ class DirectSummaryRequest(BaseModel):
     name: str
     skills: Optional[List[str]] = None
     experience: Optional[List[WorkExperience]] = None
+    document_id: Optional[int] = None
 
-class WorkExperienceResponse(BaseModel):
+# What the LLM is asked to return: the list field alone, so the strict
+# json_schema response_format has nothing else the model could fill in
+class WorkExperienceOutput(BaseModel):
     points: List[str]
 
-class SkillsResponse(BaseModel):
+class SkillsOutput(BaseModel):
     skills: List[str]
 
-class SummaryResponse(BaseModel):
+class SummaryOutput(BaseModel):
     suggestions: List[str]
 
+class WorkExperienceResponse(WorkExperienceOutput):
+    # True when the LLM missed the deadline and the answer came from templates
+    degraded: bool = False
+
+class BatchWorkExperienceItem(BaseModel):
+    index: int
+    job_title: str
+    company: str
+    points: List[str] = []
+    error: Optional[str] = None
+    degraded: bool = False
+    latency_ms: float
+
+class BatchWorkExperienceResponse(BaseModel):
+    items: List[BatchWorkExperienceItem]
+    unique_items: int
+    elapsed_ms: float
+    sum_latency_ms: float
+
+class JobSubmitResponse(BaseModel):
+    job_id: str
+    status: str
+
+class JobStatusResponse(BaseModel):
+    job_id: str
+    kind: Optional[str] = None
+    status: str
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+class SkillsResponse(SkillsOutput):
+    degraded: bool = False
+
+class SummaryResponse(SummaryOutput):
+    degraded: bool = False
+
+class DraftExperience(BaseModel):
+    title: str
+    company: str
+    points: List[str] = []
+    error: Optional[str] = None
+
+class DraftResponse(BaseModel):
+    experience: List[DraftExperience]
+    skills: List[str] = []
+    summary: List[str] = []
+    errors: Dict[str, str] = {}
+    degraded: bool = False
+
 
 # Resume CRUD Models
 class ResumeCreate(BaseModel):
@@ -124,6 +188,21 @@ class ResumeUpdate(BaseModel):
     theme_color: Optional[str] = None
 
 
+class ResumeSummary(BaseModel):
+    id: int
+    name: str
+    job_title: Optional[str] = None
+    template_id: int
+    theme_color: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+
+
+class ResumePage(BaseModel):
+    items: List[ResumeSummary]
+    next_cursor: Optional[str] = None
+
+
 class ResumeResponse(BaseModel):
     id: int
     user_id: int
@@ -148,6 +227,14 @@ class ResumeResponse(BaseModel):
     theme_color: str
     created_at: datetime
     updated_at: datetime
+    version: int = 1
 
     class Config:
         from_attributes = True
+
+
+class ResumePatchResponse(BaseModel):
+    id: int
+    version: int
+    updated_at: Optional[datetime] = None
+    changed: List[str]
@@ -1,6 +1,6 @@
 from fastapi import APIRouter, HTTPException, Depends, status, Request
 from sqlalchemy.orm import Session
-from db.db import get_db
+from db.db import get_read_db
 from controller.authcontroller import AuthController
 from models.auth_models import SignupRequest, SigninRequest, GoogleAuthRequest,RefreshTokenRequest,AuthResponse,RefreshTokenResponse 
 
@@ -70,7 +70,7 @@ async def refresh_token(request: RefreshTokenRequest):
     )
 
 @router.get("/profile")
-async def get_profile(request: Request, db: Session = Depends(get_db)):
+async def get_profile(request: Request, db: Session = Depends(get_read_db)):
     """Get current user profile"""
     user_id = request.state.user_id
     result = await AuthController.get_user_profile(user_id, db)
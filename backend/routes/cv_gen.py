@@ -1,51 +1,356 @@
-from fastapi import APIRouter, HTTPException
+import asyncio
+import json
+import os
+import secrets
+import time
+import weakref
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, status
+from pydantic import ValidationError
+from fastapi.responses import StreamingResponse
 from controller.cv_generator import CVGenerator
+from controller.generation_jobs import JOB_MODELS
+from utils.job_queue import job_queue
+from utils.generation_cache import generation_cache
+from utils.singleflight import single_flight
+from utils.context_manager import context_manager
+from utils.bullet_index import bullet_index
+from utils.llm_scheduler import llm_scheduler, QueueFullError
+from utils.request_user import get_request_user_key
+from utils.llm_client import llm_client, request_time_left, set_request_deadline
+from utils.template_fallback import template_fallback
+from utils.speculative import speculative_cache
+from config.openai import GENERATION_DEADLINE, GENERATION_FALLBACK_MARGIN
+from utils.model_router import model_router
+from utils.llm_metrics import llm_metrics, tag_llm_calls, usage_day
+from utils.prompt_registry import prompt_registry
 from models.cv_models import (
     WorkExperienceRequest, 
+    BatchWorkExperienceRequest,
+    BatchWorkExperienceResponse,
+    BulletAcceptRequest,
     SkillsRequest, 
     DirectSummaryRequest,
     WorkExperienceResponse,
     WorkExperience,
     SkillsResponse,
     SummaryResponse,
+    DraftResponse,
+    JobSubmitResponse,
+    JobStatusResponse,
     CVData
 )
 
 router = APIRouter()
 
+MAX_BATCH_EXPERIENCES = 20
+MAX_ACCEPTED_POINTS = 30
+MAX_JOB_WAIT_SECONDS = 25
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+
+def _require_admin(x_admin_token: Optional[str] = Header(None)):
+    if not ADMIN_TOKEN or not x_admin_token or not secrets.compare_digest(x_admin_token, ADMIN_TOKEN):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin token required")
+
+async def _acquire_llm_slot(http_request: Request) -> str:
+    """Wait for a fair-share generation slot, or fail fast with 429; returns the user key"""
+    user_key = get_request_user_key(http_request)
+    tag_llm_calls(http_request.url.path, user_key)
+
+    if await llm_metrics.over_quota(user_key):
+        raise HTTPException(status_code=429, detail="Daily generation quota used up, please try again tomorrow")
+
+    try:
+        await llm_scheduler.acquire(user_key)
+    except QueueFullError as e:
+        raise HTTPException(
+            status_code=429,
+            detail="Too many generation requests queued, please retry shortly",
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    return user_key
+
+def _require_experience(request: SkillsRequest):
+    if not request.experience and request.document_id is None:
+        raise HTTPException(status_code=400, detail="Send work experience or a document_id with stored context")
+
+@asynccontextmanager
+async def _llm_slot(http_request: Request):
+    """Hold a generation slot within the request's deadline.
+
+    LLM calls made inside stop GENERATION_FALLBACK_MARGIN seconds before
+    GENERATION_DEADLINE. If no slot frees up in time, the body still runs
+    without one: its LLM calls fail fast and the generator answers from
+    cache, the bullet index or templates.
+    """
+    if GENERATION_DEADLINE > 0:
+        set_request_deadline(max(GENERATION_DEADLINE - GENERATION_FALLBACK_MARGIN, 0.01))
+
+    acquired = False
+    try:
+        async with asyncio.timeout(request_time_left()):
+            user_key = await _acquire_llm_slot(http_request)
+            acquired = True
+    except TimeoutError:
+        user_key = get_request_user_key(http_request)
+
+    start = time.monotonic()
+    try:
+        yield user_key
+    finally:
+        if acquired:
+            llm_scheduler.release(time.monotonic() - start)
+
+def _sse_event(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def _sse_response(items: AsyncIterator[str]) -> StreamingResponse:
+    """Forward generated items as server-sent events, holding an acquired LLM slot"""
+    start = time.monotonic()
+    released = False
+
+    def release_slot():
+        nonlocal released
+        if not released:
+            released = True
+            llm_scheduler.release(time.monotonic() - start)
+
+    async def event_stream():
+        count = 0
+        try:
+            async for item in items:
+                count += 1
+                yield _sse_event("item", item)
+            yield _sse_event("done", {"count": count})
+        except Exception as e:
+            yield _sse_event("error", {"detail": str(e)})
+        finally:
+            release_slot()
+
+    stream = event_stream()
+    # A client that disconnects before the first chunk never runs the finally
+    weakref.finalize(stream, release_slot)
+
+    return StreamingResponse(
+        stream,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 @router.post("/work-experience", response_model=WorkExperienceResponse)
-async def generate_work_experience(request: WorkExperienceRequest):
+async def generate_work_experience(request: WorkExperienceRequest, http_request: Request):
     """Generate work experience bullet points"""
-    result = await CVGenerator.generate_work_experience(
-        job_title=request.job_title,
-        company=request.company,
-        location=request.location,
-        role=request.role,
-        start_date=request.start_date,
-        end_date=request.end_date,
-    )
+    async with _llm_slot(http_request) as user_key:
+        result = await CVGenerator.generate_work_experience(
+            job_title=request.job_title,
+            company=request.company,
+            location=request.location,
+            role=request.role,
+            start_date=request.start_date,
+            end_date=request.end_date,
+            document_id=request.document_id,
+            owner=user_key,
+        )
     
     if not result["success"]:
         raise HTTPException(status_code=500, detail=result["error"])
+
+    # The skills and summary screens come next; start on them now
+    end_date = request.end_date or "Present"
+    await CVGenerator.speculate(user_key, role=(request.job_title, request.company, f"{request.start_date} - {end_date}"))
     
-    return WorkExperienceResponse(points=result["points"])
+    return WorkExperienceResponse(points=result["points"], degraded=result.get("degraded", False))
+
+@router.post("/work-experience/accept")
+async def accept_work_experience(request: BulletAcceptRequest, http_request: Request):
+    """Record bullets the signed-in user kept, so they rank higher for similar roles"""
+    if not request.points or len(request.points) > MAX_ACCEPTED_POINTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Send between 1 and {MAX_ACCEPTED_POINTS} points",
+        )
+    accepted = await bullet_index.record(
+        request.job_title, request.role, request.company, request.points,
+        source="accepted", user=str(http_request.state.user_id),
+    )
+    return {"accepted": accepted}
+
+@router.post("/work-experience/batch", response_model=BatchWorkExperienceResponse)
+async def generate_work_experience_batch(request: BatchWorkExperienceRequest, http_request: Request):
+    """Generate bullet points for several experiences concurrently"""
+    if not request.experiences or len(request.experiences) > MAX_BATCH_EXPERIENCES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Send between 1 and {MAX_BATCH_EXPERIENCES} experiences per batch"
+        )
+
+    async with _llm_slot(http_request) as user_key:
+        result = await CVGenerator.generate_work_experience_batch(request.experiences, owner=user_key)
+    return BatchWorkExperienceResponse(**result)
 
 @router.post("/skills", response_model=SkillsResponse)
-async def generate_skills(request: SkillsRequest):
+async def generate_skills(request: SkillsRequest, http_request: Request):
     """Generate relevant skills based on CV data and context"""
-    result = await CVGenerator.generate_skills(request)
+    _require_experience(request)
+    skills = await CVGenerator.speculative_skills(request, get_request_user_key(http_request))
+    if skills is not None:
+        return SkillsResponse(skills=skills)
+
+    async with _llm_slot(http_request) as user_key:
+        result = await CVGenerator.generate_skills(request, owner=user_key)
     
     if not result["success"]:
         raise HTTPException(status_code=500, detail=result["error"])
     
-    return SkillsResponse(skills=result["skills"])
+    return SkillsResponse(skills=result["skills"], degraded=result.get("degraded", False))
 
 @router.post("/summary", response_model=SummaryResponse)
-async def generate_summary(request: DirectSummaryRequest):
+async def generate_summary(request: DirectSummaryRequest, http_request: Request):
     """Generate professional summary from CV data"""
-    result = await CVGenerator.generate_summary(request)
+    suggestions = await CVGenerator.speculative_summary(request, get_request_user_key(http_request))
+    if suggestions is not None:
+        return SummaryResponse(suggestions=suggestions)
+
+    async with _llm_slot(http_request) as user_key:
+        result = await CVGenerator.generate_summary(request, owner=user_key)
     
     if not result["success"]:
         raise HTTPException(status_code=500, detail=result["error"])
     
-    return SummaryResponse(suggestions=[result["summary"]])
+    return SummaryResponse(suggestions=result["suggestions"], degraded=result.get("degraded", False))
+
+@router.post("/draft", response_model=DraftResponse)
+async def generate_draft(request: CVData, http_request: Request):
+    """Generate bullets for every experience, skills and a summary in one round-trip"""
+    async with _llm_slot(http_request):
+        result = await CVGenerator.generate_draft(request)
+
+    # Partial drafts are returned with per-section errors, fail only if nothing came back
+    if "summary" in result["errors"] and all(exp["error"] for exp in result["experience"]):
+        raise HTTPException(status_code=500, detail=result["errors"]["summary"])
+
+    return DraftResponse(**result)
+
+@router.post("/work-experience/stream")
+async def stream_work_experience(request: WorkExperienceRequest, http_request: Request):
+    """Stream work experience bullet points as server-sent events"""
+    user_key = await _acquire_llm_slot(http_request)
+    return _sse_response(CVGenerator.stream_work_experience(
+        job_title=request.job_title,
+        company=request.company,
+        location=request.location,
+        role=request.role,
+        start_date=request.start_date,
+        end_date=request.end_date,
+        document_id=request.document_id,
+        owner=user_key,
+    ))
+
+@router.post("/skills/stream")
+async def stream_skills(request: SkillsRequest, http_request: Request):
+    """Stream relevant skills as server-sent events"""
+    _require_experience(request)
+    user_key = await _acquire_llm_slot(http_request)
+    return _sse_response(CVGenerator.stream_skills(request, owner=user_key))
+
+@router.post("/summary/stream")
+async def stream_summary(request: DirectSummaryRequest, http_request: Request):
+    """Stream professional summaries as server-sent events"""
+    user_key = await _acquire_llm_slot(http_request)
+    return _sse_response(CVGenerator.stream_summary(request, owner=user_key))
+
+@router.post("/jobs/{kind}", response_model=JobSubmitResponse, status_code=status.HTTP_202_ACCEPTED)
+async def submit_job(kind: str, payload: Dict[str, Any], http_request: Request):
+    """Queue a generation for the worker processes and return its job id"""
+    model = JOB_MODELS.get(kind)
+    if model is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Unknown job kind. Use one of: {', '.join(JOB_MODELS)}"
+        )
+
+    try:
+        job_request = model(**payload)
+    except ValidationError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=e.errors())
+
+    try:
+        job_id = await job_queue.submit(kind, job_request.dict(), get_request_user_key(http_request))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=f"Job queue unavailable: {str(e)}")
+
+    return JobSubmitResponse(job_id=job_id, status="queued")
+
+@router.get("/jobs/{job_id}", response_model=JobStatusResponse)
+async def get_job(job_id: str, http_request: Request, wait: float = 0):
+    """Poll a generation job; `wait` long-polls up to 25 seconds for it to finish.
+
+    Only the user (or anonymous client) that submitted the job can read it.
+    """
+    owner = get_request_user_key(http_request)
+    try:
+        if wait > 0:
+            job = await job_queue.wait(job_id, min(wait, MAX_JOB_WAIT_SECONDS), owner)
+        else:
+            job = await job_queue.get(job_id, owner)
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=f"Job queue unavailable: {str(e)}")
+
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found or expired")
+
+    return JobStatusResponse(**job)
+
+@router.get("/cache/stats", dependencies=[Depends(_require_admin)])
+async def cache_stats():
+    """Hit/miss counters of the generation cache, request coalescing, document context, bullet index and speculative results for this worker"""
+    return {
+        **generation_cache.get_stats(),
+        "single_flight": dict(single_flight.stats),
+        "context": context_manager.get_stats(),
+        "bullet_index": bullet_index.get_stats(),
+        "speculative": speculative_cache.get_stats(),
+    }
+
+@router.get("/scheduler/stats", dependencies=[Depends(_require_admin)])
+async def scheduler_stats():
+    """Queue depth, wait time percentiles and rejections of the LLM scheduler"""
+    return llm_scheduler.get_stats()
+
+@router.get("/llm/stats", dependencies=[Depends(_require_admin)])
+async def llm_stats():
+    """Circuit breaker state, hedging, latency percentiles, per-model health and template fallbacks"""
+    return {
+        **llm_client.get_stats(),
+        "models": model_router.get_stats(),
+        "template_fallbacks": template_fallback.get_stats(),
+    }
+
+@router.get("/llm/metrics", dependencies=[Depends(_require_admin)])
+async def llm_metrics_stats():
+    """Token and latency histograms per endpoint and model, and parse fallback counts"""
+    return llm_metrics.get_stats()
+
+@router.get("/llm/prompts", dependencies=[Depends(_require_admin)])
+async def llm_prompts():
+    """Registered prompt versions, the active one and any A/B split per task"""
+    return prompt_registry.list()
+
+@router.get("/llm/usage", dependencies=[Depends(_require_admin)])
+async def llm_usage(user: Optional[str] = None, day: Optional[str] = None, limit: int = 20):
+    """Daily token usage of one user (e.g. `user:42`), or the top users of the day"""
+    day = day or usage_day()
+    try:
+        if user:
+            data = await llm_metrics.get_user_usage(user, day)
+        else:
+            data = await llm_metrics.get_top_users(day, min(limit, 100))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=f"Usage store unavailable: {str(e)}")
+
+    if data is None:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Usage store requires Redis")
+
+    result = {"user": user, "usage": data} if user else {"users": data}
+    return {"day": day, **result, "daily_token_quota": llm_metrics.daily_quota}
@@ -1,11 +1,13 @@
-from fastapi import APIRouter, Depends, Request, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import List, Optional
 
-from db.db import get_db
+from db.db import get_db, get_read_db, read_router
 from controller.resume import ResumeController
-from models.cv_models import ResumeCreate, ResumeUpdate, ResumeResponse
+from controller.cv_generator import CVGenerator
+from models.cv_models import ResumeCreate, ResumeUpdate, ResumeResponse, ResumePage, ResumePatchResponse
 from middleware.rediscache import redis_cache
+from utils.request_user import get_request_user_key
 
 app = APIRouter()
 
@@ -18,25 +20,39 @@ async def save_resume(
     """Save a new resume for the authenticated user"""
     user_id = request.state.user_id
     result = await ResumeController.create_resume(resume_data, user_id, db)
+    await read_router.mark_write(user_id)
     await redis_cache.purge_pattern(f"user_{user_id}")
+    await CVGenerator.speculate(get_request_user_key(request), roles=CVGenerator.roles_of_resume(resume_data.experience))
     return result
 
 @app.get("/all", response_model=List[ResumeResponse])
 @redis_cache.cache_get(expire_minutes=20)
 async def get_all_resumes(
     request: Request,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get all resumes for the authenticated user"""
     user_id = request.state.user_id
     return await ResumeController.get_user_resumes(user_id, db)
 
+@app.get("/list", response_model=ResumePage)
+@redis_cache.cache_get(expire_minutes=20)
+async def list_resumes(
+    request: Request,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """List the user's resumes newest first, summary fields only; pass next_cursor for the next page"""
+    user_id = request.state.user_id
+    return await ResumeController.list_user_resumes(user_id, db, limit, cursor)
+
 @app.get("/{resume_id}", response_model=ResumeResponse)
 @redis_cache.cache_get(expire_minutes=20)
 async def get_resume(
     resume_id: int,
     request: Request,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get a specific resume by ID for the authenticated user"""
     user_id = request.state.user_id
@@ -52,9 +68,33 @@ async def update_resume(
     """Update a specific resume for the authenticated user"""
     user_id = request.state.user_id
     result = await ResumeController.update_resume(resume_id, resume_data, user_id, db)
+    await read_router.mark_write(user_id)
     await redis_cache.purge_pattern(f"user_{user_id}")
     return result
 
+@app.patch("/{resume_id}", response_model=ResumePatchResponse)
+async def patch_resume(
+    resume_id: int,
+    request: Request,
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_db)
+):
+    """Change part of a resume with a JSON Patch (application/json-patch+json) or merge
+    patch (application/merge-patch+json); If-Match must carry the version being edited"""
+    user_id = request.state.user_id
+    media_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    try:
+        patch = await request.json()
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Body must be JSON")
+    result = await ResumeController.patch_resume(resume_id, media_type, patch, if_match, user_id, db)
+    if result.changed:
+        await read_router.mark_write(user_id)
+        await redis_cache.purge_pattern(f"user_{user_id}")
+    response.headers["ETag"] = f'"{result.version}"'
+    return result
+
 @app.delete("/{resume_id}")
 async def delete_resume(
     resume_id: int,
@@ -64,5 +104,6 @@ async def delete_resume(
     """Delete a specific resume for the authenticated user"""
     user_id = request.state.user_id
     result = await ResumeController.delete_resume(resume_id, user_id, db)
+    await read_router.mark_write(user_id)
     await redis_cache.purge_pattern(f"user_{user_id}")
     return result
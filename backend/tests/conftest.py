@@ -0,0 +1,198 @@
+import asyncio
+import itertools
+import os
+import time
+from collections import defaultdict
+import pytest
+
+# config.openai refuses to import without a key; no test calls the provider
+os.environ.setdefault("API_KEY", "test")
+# Long enough for HS256, so PyJWT does not warn about the key length
+os.environ.setdefault("JWT_SECRET", "test-secret-" + "x" * 32)
+
+from config import redis as redis_config  # noqa: E402
+
+
+class FakeRedis:
+    """In-memory stand-in for the redis.asyncio commands the app uses (decode_responses=True)"""
+
+    def __init__(self):
+        self.data = {}
+        self.streams = defaultdict(dict)
+        self.groups = {}
+        self.channels = defaultdict(list)
+        self._ids = itertools.count(1)
+
+    # Strings
+
+    async def set(self, key, value, nx=False, px=None, ex=None):
+        if nx and key in self.data:
+            return False
+        self.data[key] = value
+        return True
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def incr(self, key):
+        self.data[key] = str(int(self.data.get(key, 0)) + 1)
+        return int(self.data[key])
+
+    async def exists(self, key):
+        return int(key in self.data)
+
+    async def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+    async def expire(self, key, seconds):
+        return key in self.data
+
+    async def eval(self, script, numkeys, key, token):
+        # Only the compare-and-delete lock release is used
+        if self.data.get(key) == token:
+            del self.data[key]
+            return 1
+        return 0
+
+    # Hashes
+
+    async def hset(self, key, mapping):
+        self.data.setdefault(key, {}).update({k: str(v) for k, v in mapping.items()})
+
+    async def hgetall(self, key):
+        return dict(self.data.get(key, {}))
+
+    async def hincrby(self, key, field, amount=1):
+        values = self.data.setdefault(key, {})
+        values[field] = str(int(values.get(field, 0)) + amount)
+        return int(values[field])
+
+    # Sorted sets
+
+    async def zincrby(self, key, amount, member):
+        scores = self.data.setdefault(key, {})
+        scores[member] = scores.get(member, 0.0) + amount
+        return scores[member]
+
+    async def zrevrange(self, key, start, end, withscores=False):
+        ranked = sorted(self.data.get(key, {}).items(), key=lambda item: -item[1])
+        ranked = ranked[start:len(ranked) if end == -1 else end + 1]
+        return ranked if withscores else [member for member, _ in ranked]
+
+    # Lists
+
+    async def rpush(self, key, *values):
+        self.data.setdefault(key, []).extend(values)
+        return len(self.data[key])
+
+    async def ltrim(self, key, start, end):
+        items = self.data.get(key, [])
+        self.data[key] = items[start:len(items) if end == -1 else end + 1]
+
+    async def lrange(self, key, start, end):
+        items = self.data.get(key, [])
+        return list(items[start:len(items) if end == -1 else end + 1])
+
+    # Streams with one consumer group
+
+    async def xgroup_create(self, stream, group, id="0", mkstream=False):
+        if (stream, group) in self.groups:
+            raise Exception("BUSYGROUP Consumer Group name already exists")
+        self.groups[(stream, group)] = {"delivered": set(), "pending": {}}
+
+    async def xadd(self, stream, fields, maxlen=None, approximate=False):
+        entry_id = f"{next(self._ids)}-0"
+        self.streams[stream][entry_id] = {k: str(v) for k, v in fields.items()}
+        return entry_id
+
+    async def xreadgroup(self, group, consumer, streams, count=None, block=None):
+        [stream] = streams
+        state = self.groups[(stream, group)]
+        fresh = [entry_id for entry_id in self.streams[stream] if entry_id not in state["delivered"]][:count]
+        for entry_id in fresh:
+            state["delivered"].add(entry_id)
+            state["pending"][entry_id] = (consumer, time.monotonic())
+        if not fresh:
+            await asyncio.sleep(0)
+            return []
+        return [[stream, [(entry_id, self.streams[stream][entry_id]) for entry_id in fresh]]]
+
+    async def xautoclaim(self, stream, group, consumer, min_idle_time, start_id="0-0", count=None):
+        pending = self.groups[(stream, group)]["pending"]
+        now = time.monotonic()
+        claimed = [
+            entry_id for entry_id, (_, since) in pending.items()
+            if (now - since) * 1000 >= min_idle_time
+        ][:count]
+        for entry_id in claimed:
+            pending[entry_id] = (consumer, now)
+        return ["0-0", [(entry_id, self.streams[stream].get(entry_id)) for entry_id in claimed], []]
+
+    async def xack(self, stream, group, entry_id):
+        return int(self.groups[(stream, group)]["pending"].pop(entry_id, None) is not None)
+
+    async def xdel(self, stream, entry_id):
+        return int(self.streams[stream].pop(entry_id, None) is not None)
+
+    # Pub/sub
+
+    async def publish(self, channel, message):
+        for queue in self.channels[channel]:
+            queue.put_nowait({"type": "message", "channel": channel, "data": message})
+
+    def pubsub(self):
+        return _FakePubSub(self)
+
+    def pipeline(self):
+        return _FakePipeline(self)
+
+
+class _FakePubSub:
+    def __init__(self, redis):
+        self.redis = redis
+        self.queue = asyncio.Queue()
+        self.channels = []
+
+    async def subscribe(self, channel):
+        self.redis.channels[channel].append(self.queue)
+        self.channels.append(channel)
+
+    async def get_message(self, ignore_subscribe_messages=False, timeout=0.0):
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def unsubscribe(self):
+        for channel in self.channels:
+            self.redis.channels[channel].remove(self.queue)
+        self.channels = []
+
+    async def aclose(self):
+        pass
+
+
+class _FakePipeline:
+    """Queues commands and runs them in order on execute()"""
+
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.commands.append((getattr(self.redis, name), args, kwargs))
+            return self
+        return queue
+
+    async def execute(self):
+        return [await command(*args, **kwargs) for command, args, kwargs in self.commands]
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    """A FakeRedis installed as config.redis.redis_client"""
+    fake = FakeRedis()
+    monkeypatch.setattr(redis_config, "redis_client", fake)
+    return fake
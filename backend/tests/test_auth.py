@@ -0,0 +1,78 @@
+import asyncio
+from datetime import datetime, timedelta
+import httpx
+import jwt
+import pytest
+from fastapi import FastAPI, Request
+from starlette.requests import Request as StarletteRequest
+from middleware.auth import JWTAuthMiddleware
+from utils import request_user
+from utils.jwtgen import ALGORITHM, SECRET_KEY, create_access_token, create_refresh_token
+
+app = FastAPI()
+app.add_middleware(JWTAuthMiddleware)
+
+
+@app.get("/api/resume-op/whoami")
+async def whoami(request: Request):
+    return {"user_id": request.state.user_id, "email": request.state.user_email}
+
+
+@app.get("/api/cv-gen/open")
+async def open_route():
+    return {"ok": True}
+
+
+def get(path, token=None):
+    async def run():
+        headers = {"Authorization": f"Bearer {token}"} if token else {}
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            return await client.get(path, headers=headers)
+    return asyncio.run(run())
+
+
+def test_access_token_sets_the_user():
+    response = get("/api/resume-op/whoami", create_access_token(42, "ada@example.com"))
+    assert response.status_code == 200
+    assert response.json() == {"user_id": 42, "email": "ada@example.com"}
+
+
+EXPIRED = jwt.encode(
+    {"sub": "42", "type": "access", "exp": datetime.utcnow() - timedelta(minutes=1)}, SECRET_KEY, algorithm=ALGORITHM
+)
+
+
+@pytest.mark.parametrize(
+    "token",
+    [None, "not-a-jwt", EXPIRED, create_refresh_token(42, "ada@example.com")],
+    ids=["missing", "invalid", "expired", "refresh"],
+)
+def test_protected_paths_refuse_bad_tokens(token):
+    assert get("/api/resume-op/whoami", token).status_code == 401
+
+
+def test_other_paths_need_no_token():
+    assert get("/api/cv-gen/open").status_code == 200
+
+
+def make_request(headers, user_id=None):
+    scope = {
+        "type": "http",
+        "headers": [(name.lower().encode(), value.encode()) for name, value in headers.items()],
+        "client": ("10.0.0.1", 5000),
+        "state": {"user_id": user_id} if user_id else {},
+    }
+    return StarletteRequest(scope)
+
+
+def test_user_key_prefers_the_authenticated_user():
+    assert request_user.get_request_user_key(make_request({}, user_id=7)) == "user:7"
+    token = create_access_token(8, "ada@example.com")
+    assert request_user.get_request_user_key(make_request({"Authorization": f"Bearer {token}"})) == "user:8"
+
+
+@pytest.mark.parametrize("hops, expected", [(0, "ip:10.0.0.1"), (1, "ip:203.0.113.9"), (5, "ip:6.6.6.6")])
+def test_forwarded_for_is_trusted_only_for_configured_hops(monkeypatch, hops, expected):
+    monkeypatch.setattr(request_user, "TRUSTED_PROXY_HOPS", hops)
+    request = make_request({"X-Forwarded-For": "6.6.6.6, 203.0.113.9"})
+    assert request_user.get_request_user_key(request) == expected
@@ -0,0 +1,96 @@
+import asyncio
+import httpx
+import pytest
+from controller import cv_generator
+from routes import cv_gen
+from controller.cv_generator import CVGenerator
+from utils.bullet_index import BulletIndex
+from utils.jwtgen import create_access_token
+from main import app
+
+POINTS = [f"Designed service {i} for the payments platform" for i in range(3)]
+
+
+@pytest.fixture
+def index(tmp_path, monkeypatch):
+    index = BulletIndex(str(tmp_path))
+    monkeypatch.setattr(index, "maybe_rebuild", lambda: None)
+    monkeypatch.setattr(cv_generator, "bullet_index", index)
+    monkeypatch.setattr(cv_gen, "bullet_index", index)
+    monkeypatch.setattr(cv_generator, "BULLET_INDEX_FAST_MIN", len(POINTS))
+    monkeypatch.setattr(cv_generator, "BULLET_INDEX_MODE", "blend")
+    return index
+
+
+def record(index, points=POINTS, **kwargs):
+    asyncio.run(index.record("Backend Engineer", "", "Acme", points, **kwargs))
+
+
+def refresh(index):
+    index.rebuild()
+    index._checked_at = 0
+    index._reload()
+
+
+def test_lookup_returns_similar_roles_with_scores(index):
+    record(index)
+    record(index, POINTS[:1])
+    refresh(index)
+
+    hits = index.lookup("Senior Backend Engineer")
+    assert [text for text, _, _ in hits] == [POINTS[0], POINTS[1], POINTS[2]]
+    assert hits[0][2] == 2.0 and hits[1][2] == 1.0
+    assert all(similarity >= 0.5 for _, similarity, _ in hits)
+    assert index.lookup("Pastry Chef") == []
+
+
+def test_bullets_naming_the_company_are_not_shared(index):
+    record(index, ["Scaled Acme checkout to a million users", POINTS[0]])
+    refresh(index)
+    assert [text for text, _, _ in index.lookup("Backend Engineer")] == [POINTS[0]]
+
+
+def test_generated_once_only_blends(index):
+    record(index)
+    refresh(index)
+    assert CVGenerator._indexed_points("Backend Engineer", "") == (POINTS, False)
+
+
+def test_three_generations_reach_the_fast_path(index):
+    for _ in range(3):
+        record(index)
+    refresh(index)
+    assert CVGenerator._indexed_points("Backend Engineer", "") == (POINTS, True)
+
+
+def test_one_user_accepting_repeatedly_does_not_reach_the_fast_path(index):
+    for _ in range(5):
+        record(index, source="accepted", user="1")
+    refresh(index)
+    assert {score for _, _, score in index.lookup("Backend Engineer")} == {1.5}
+    assert CVGenerator._indexed_points("Backend Engineer", "")[1] is False
+
+
+def test_two_users_accepting_reach_the_fast_path_across_rebuilds(index):
+    record(index, source="accepted", user="1")
+    refresh(index)
+    # The second build starts from the first; user 1 repeating still counts once
+    record(index, source="accepted", user="1")
+    record(index, source="accepted", user="2")
+    refresh(index)
+    assert {score for _, _, score in index.lookup("Backend Engineer")} == {3.0}
+    assert CVGenerator._indexed_points("Backend Engineer", "") == (POINTS, True)
+
+
+def test_accepting_requires_a_signed_in_user(index):
+    body = {"job_title": "Backend Engineer", "company": "Initech", "points": POINTS}
+
+    async def run(headers):
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            return await client.post("/api/cv-gen/work-experience/accept", json=body, headers=headers)
+
+    assert asyncio.run(run({})).status_code == 401
+    token = create_access_token(5, "ada@example.com")
+    response = asyncio.run(run({"Authorization": f"Bearer {token}"}))
+    assert response.status_code == 200 and response.json() == {"accepted": 3}
+    assert '"user": "5"' in open(index.log_path).read()
@@ -0,0 +1,35 @@
+import pytest
+from sqlalchemy.dialects import mysql
+from db.scheme import SECTION_COMPRESS_MIN_BYTES, CompressedJSON
+
+COLUMN = CompressedJSON()
+SMALL = {"technical": ["Python", "SQL"]}
+LARGE = {"items": [{"title": "Engineer", "points": ["Built the billing platform for enterprise customers"] * 20}]}
+
+
+def round_trip(value):
+    stored = COLUMN.process_bind_param(value, None)
+    return stored, COLUMN.process_result_value(stored, None)
+
+
+def test_small_sections_are_stored_as_plain_json():
+    stored, loaded = round_trip(SMALL)
+    assert stored.startswith(b"j")
+    assert len(stored) < SECTION_COMPRESS_MIN_BYTES
+    assert loaded == SMALL
+
+
+def test_large_sections_are_compressed():
+    stored, loaded = round_trip(LARGE)
+    assert stored.startswith(b"z")
+    assert len(stored) < len(str(LARGE)) / 4
+    assert loaded == LARGE
+
+
+@pytest.mark.parametrize("value", [None, [], {"name": "Zoë ✓"}, ["a", 1, 2.5, True, None]])
+def test_round_trips_any_json(value):
+    assert round_trip(value)[1] == value
+
+
+def test_uses_mediumblob_on_mysql():
+    assert isinstance(COLUMN.load_dialect_impl(mysql.dialect()), mysql.MEDIUMBLOB)
@@ -0,0 +1,103 @@
+import asyncio
+import json
+import pytest
+from utils import context_manager as context_module
+from utils.context_manager import ContextManager
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(context_module, "time", fake)
+    return fake
+
+
+def run(call):
+    return asyncio.run(call)
+
+
+async def add(manager, document_id, content, owner="user:1"):
+    await manager.add_message(document_id, "assistant", content, owner)
+    await asyncio.gather(*manager._pending)
+
+
+def test_reads_are_served_locally_until_the_ttl(redis, clock):
+    manager = ContextManager(local_ttl=60)
+    run(add(manager, 1, "Engineer at Acme (2019 - 2023)"))
+
+    assert [m["content"] for m in run(manager.get_context(1, "user:1"))] == ["Engineer at Acme (2019 - 2023)"]
+    assert manager.stats["local_hits"] >= 1
+
+    clock.now += 61
+    assert len(run(manager.get_context(1, "user:1"))) == 1
+    assert manager.stats["redis_hits"] == 1
+
+
+def test_empty_context_is_not_cached(redis, clock):
+    reader = ContextManager()
+    writer = ContextManager()
+
+    assert run(reader.get_context(1, "user:1")) == []
+    run(add(writer, 1, "Skills: Python, SQL"))
+
+    assert [m["content"] for m in run(reader.get_context(1, "user:1"))] == ["Skills: Python, SQL"]
+    assert reader.stats["misses"] == 1 and reader.stats["redis_hits"] == 1
+    assert reader.get_stats()["documents"] == 1
+
+
+def test_owners_do_not_share_context(redis, clock):
+    manager = ContextManager()
+    run(add(manager, 1, "Engineer at Acme", owner="user:1"))
+
+    assert run(manager.get_context(1, "user:2")) == []
+
+
+def test_repeated_and_blank_facts_are_ignored(redis, clock):
+    manager = ContextManager(max_message_chars=10)
+    run(add(manager, 1, "Engineer   at Acme"))
+    run(add(manager, 1, "Engineer at Acme"))
+    run(add(manager, 1, "   "))
+
+    assert [m["content"] for m in run(manager.get_context(1, "user:1"))] == ["Engineer a"]
+    assert manager.stats["writes"] == 1
+    assert len(redis.data["context:user:1:1"]) == 1
+
+
+def test_keeps_the_newest_messages_in_both_tiers(redis, clock):
+    manager = ContextManager(max_context_per_doc=2)
+    for fact in ("first", "second", "third"):
+        run(add(manager, 1, fact))
+
+    assert [m["content"] for m in run(manager.get_context(1, "user:1"))] == ["second", "third"]
+    assert [json.loads(item)["content"] for item in redis.data["context:user:1:1"]] == ["second", "third"]
+
+
+def test_local_tier_evicts_oldest_documents_past_its_byte_budget(clock, monkeypatch):
+    monkeypatch.setattr(context_module.redis_config, "redis_client", None)
+    manager = ContextManager(max_bytes=10)
+    run(add(manager, 1, "123456"))
+    run(add(manager, 2, "abcdef"))
+
+    assert run(manager.get_context(1, "user:1")) == []
+    assert [m["content"] for m in run(manager.get_context(2, "user:1"))] == ["abcdef"]
+    assert manager.get_stats()["cached_bytes"] == 6 and manager.stats["evictions"] == 1
+
+
+def test_clear_removes_both_tiers(redis, clock):
+    manager = ContextManager()
+    run(add(manager, 1, "Engineer at Acme"))
+    run(manager.clear_context(1, "user:1"))
+
+    assert run(manager.get_context(1, "user:1")) == []
+    assert "context:user:1:1" not in redis.data
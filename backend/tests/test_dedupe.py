@@ -0,0 +1,38 @@
+from utils.dedupe import NearDuplicateFilter, dedupe, drop_truncated, missing_count
+
+
+def test_drops_rewordings_and_keeps_distinct_items():
+    items = [
+        "Led the team that rebuilt the billing platform",
+        "Led a team that rebuilt the billing platform",
+        "Cut infrastructure costs by 20%",
+        "Cut infrastructure costs by 25%",
+        "Mentored four junior engineers",
+    ]
+    assert dedupe(items) == [items[0], items[2], items[4]]
+
+
+def test_word_order_matters():
+    assert dedupe(["Project management", "Management project"]) == ["Project management", "Management project"]
+
+
+def test_seen_items_are_not_repeated():
+    assert dedupe(["Python", "SQL"], seen=["python"]) == ["SQL"]
+
+
+def test_filter_counts_what_it_drops():
+    keep = NearDuplicateFilter()
+    assert [keep.add(item) for item in ("Built APIs", "built APIs", "Wrote docs")] == [True, False, True]
+    assert keep.dropped == 1
+
+
+def test_drop_truncated():
+    items = ["Built the billing platform", "Shipped", "Migrated the data warehouse to"]
+    assert drop_truncated(items, min_words=3) == [items[0], items[2]]
+    assert drop_truncated(items, min_words=3, cut_off=True) == [items[0]]
+
+
+def test_missing_count():
+    assert missing_count(["a", "b"], 5) == 3
+    assert missing_count(["a", "b"], 1) == 0
+    assert missing_count(["a"], None) == 0
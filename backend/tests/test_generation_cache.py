@@ -0,0 +1,122 @@
+import asyncio
+import json
+from types import SimpleNamespace
+import pytest
+from utils import generation_cache as cache_module
+from utils.generation_cache import GenerationCache
+
+KEY = GenerationCache.make_key("summary", {"job_title": "Engineer"}, "gpt-4o-mini", 0.6)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(cache_module, "time", fake)
+    return fake
+
+
+def sampler(explore=0.99, pick=0):
+    """random.random() returns `explore`; random.choice() picks index `pick`"""
+    return SimpleNamespace(random=lambda: explore, choice=lambda variants: variants[pick])
+
+
+def run(call):
+    return asyncio.run(call)
+
+
+def test_keys_ignore_case_and_whitespace():
+    assert GenerationCache.make_key("summary", {"job_title": "  engineer "}, "gpt-4o-mini", 0.6) == KEY
+    assert GenerationCache.make_key("summary", {"job_title": "Engineer"}, "gpt-4o", 0.6) != KEY
+
+
+def test_local_hit_then_expiry_is_a_miss(clock, monkeypatch):
+    monkeypatch.setattr(cache_module, "random", sampler())
+    cache = GenerationCache(local_ttl=60, max_variants=1)
+    run(cache.add(KEY, "first"))
+
+    assert run(cache.get(KEY)) == "first"
+    clock.now += 61
+    assert run(cache.get(KEY)) is None
+    assert cache.stats["local_hits"] == 1 and cache.stats["misses"] == 1
+    assert cache.get_stats()["hit_rate"] == 0.5
+
+
+def test_explores_while_the_variant_pool_is_not_full(clock, monkeypatch):
+    cache = GenerationCache(max_variants=2, explore_rate=0.2)
+    run(cache.add(KEY, "first"))
+
+    monkeypatch.setattr(cache_module, "random", sampler(explore=0.1))
+    assert run(cache.get(KEY)) is None
+    assert cache.stats["explores"] == 1
+
+    monkeypatch.setattr(cache_module, "random", sampler(explore=0.5))
+    assert run(cache.get(KEY)) == "first"
+
+
+def test_samples_among_variants_and_keeps_the_newest(clock, monkeypatch):
+    cache = GenerationCache(max_variants=2, explore_rate=1.0)
+    for value in ("first", "second", "second", "third"):
+        run(cache.add(KEY, value))
+    assert cache.stats["stores"] == 3
+
+    # A full pool is never explored
+    monkeypatch.setattr(cache_module, "random", sampler(explore=0.0, pick=0))
+    assert run(cache.get(KEY)) == "second"
+    monkeypatch.setattr(cache_module, "random", sampler(explore=0.0, pick=1))
+    assert run(cache.get(KEY)) == "third"
+
+
+def test_local_tier_evicts_least_recently_used(clock, monkeypatch):
+    monkeypatch.setattr(cache_module, "random", sampler())
+    cache = GenerationCache(max_entries=2, max_variants=1)
+    run(cache.add("a", 1))
+    run(cache.add("b", 2))
+    run(cache.get("a"))
+    run(cache.add("c", 3))
+
+    assert run(cache.get("b")) is None
+    assert run(cache.get("a")) == 1 and run(cache.get("c")) == 3
+
+
+def test_falls_through_to_redis_and_refills_the_local_tier(redis, clock, monkeypatch):
+    monkeypatch.setattr(cache_module, "random", sampler())
+    writer = GenerationCache(max_variants=2)
+    run(writer.add(KEY, {"points": ["Led a team"]}))
+    run(writer.add(KEY, {"points": ["Shipped a product"]}))
+    assert [json.loads(item) for item in redis.data[KEY]] == [
+        {"points": ["Led a team"]}, {"points": ["Shipped a product"]}
+    ]
+
+    reader = GenerationCache(max_variants=2)
+    assert run(reader.get(KEY)) == {"points": ["Led a team"]}
+    assert reader.stats["redis_hits"] == 1
+
+    del redis.data[KEY]
+    assert run(reader.get(KEY)) == {"points": ["Led a team"]}
+    assert reader.stats["local_hits"] == 1
+
+
+def test_redis_keeps_only_the_newest_variants(redis, clock):
+    cache = GenerationCache(max_variants=2)
+    for value in ("first", "second", "third"):
+        run(cache.add(KEY, value))
+
+    assert [json.loads(item) for item in redis.data[KEY]] == ["second", "third"]
+
+
+def test_works_without_redis(clock, monkeypatch):
+    monkeypatch.setattr(cache_module.redis_config, "redis_client", None)
+    monkeypatch.setattr(cache_module, "random", sampler())
+    cache = GenerationCache(max_variants=1)
+
+    assert run(cache.get(KEY)) is None
+    run(cache.add(KEY, "only"))
+    assert run(cache.get(KEY)) == "only"
@@ -0,0 +1,127 @@
+import asyncio
+import httpx
+import pytest
+import worker
+from controller.generation_jobs import GenerationJobs
+from main import app
+from utils.job_queue import job_queue
+from utils.jwtgen import create_access_token
+
+SKILLS_JOB = {"experience": [{"title": "Backend Engineer", "company": "Acme", "duration": "2020 - 2024"}]}
+
+
+@pytest.fixture
+def runs(monkeypatch):
+    """Replaces the generation itself; records (kind, owner) of every run"""
+    calls = []
+
+    async def run(kind, payload, owner=""):
+        calls.append((kind, owner))
+        return {"success": True, "result": {"skills": ["Python", "SQL"], "degraded": False}}
+
+    monkeypatch.setattr(GenerationJobs, "run", staticmethod(run))
+    return calls
+
+
+def client():
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+
+async def submit(http):
+    response = await http.post("/api/cv-gen/jobs/skills", json=SKILLS_JOB)
+    assert response.status_code == 202
+    return response.json()["job_id"]
+
+
+async def work_once(consumer="worker-1"):
+    for entry_id, fields in await job_queue.read(consumer, 10, 0):
+        await worker.process(entry_id, fields, consumer)
+
+
+def test_submit_process_and_poll(redis, runs):
+    async def run():
+        async with client() as http:
+            await job_queue.ensure_group()
+            job_id = await submit(http)
+            queued = (await http.get(f"/api/cv-gen/jobs/{job_id}")).json()
+            await work_once()
+            done = (await http.get(f"/api/cv-gen/jobs/{job_id}")).json()
+            return queued, done
+
+    queued, done = asyncio.run(run())
+    assert queued["status"] == "queued"
+    assert done["status"] == "done"
+    assert done["result"] == {"skills": ["Python", "SQL"], "degraded": False}
+    assert runs == [("skills", "ip:127.0.0.1")]
+    assert redis.streams[job_queue.stream] == {}
+
+
+def test_long_poll_wakes_when_the_job_finishes(redis, runs):
+    async def run():
+        async with client() as http:
+            await job_queue.ensure_group()
+            job_id = await submit(http)
+            poll = asyncio.create_task(http.get(f"/api/cv-gen/jobs/{job_id}", params={"wait": 5}))
+            await asyncio.sleep(0.05)
+            await work_once()
+            return (await poll).json()
+
+    assert asyncio.run(run())["status"] == "done"
+
+
+def test_only_the_submitter_can_read_a_job(redis, runs):
+    token = create_access_token(5, "ada@example.com")
+
+    async def run():
+        async with client() as http:
+            await job_queue.ensure_group()
+            job_id = await submit(http)
+            await work_once()
+            other = await http.get(f"/api/cv-gen/jobs/{job_id}", headers={"Authorization": f"Bearer {token}"})
+            waiting = await http.get(f"/api/cv-gen/jobs/{job_id}", params={"wait": 1},
+                                     headers={"Authorization": f"Bearer {token}"})
+            return other, waiting
+
+    other, waiting = asyncio.run(run())
+    assert other.status_code == 404
+    assert waiting.status_code == 404
+
+
+def test_unacknowledged_jobs_are_redelivered(redis, runs, monkeypatch):
+    monkeypatch.setattr(worker, "WORKER_RECLAIM_IDLE_MS", 50)
+
+    async def run():
+        await job_queue.ensure_group()
+        job_id = await job_queue.submit("skills", SKILLS_JOB, "user:5")
+        # A worker takes the entry and dies before finishing it
+        assert len(await job_queue.read("crashed-worker", 10, 0)) == 1
+        assert await job_queue.read("worker-2", 10, 0) == []
+        await asyncio.sleep(0.06)
+
+        stop = asyncio.Event()
+        consumer = asyncio.create_task(worker.run_worker(stop))
+        job = await job_queue.wait(job_id, 2, owner="user:5")
+        stop.set()
+        await consumer
+        return job
+
+    job = asyncio.run(run())
+    assert job["status"] == "done"
+    assert runs == [("skills", "user:5")]
+    assert redis.groups[(job_queue.stream, job_queue.group)]["pending"] == {}
+
+
+def test_failed_generation_marks_the_job_failed(redis, monkeypatch):
+    async def run(kind, payload, owner=""):
+        raise RuntimeError("provider down")
+
+    monkeypatch.setattr(GenerationJobs, "run", staticmethod(run))
+
+    async def go():
+        await job_queue.ensure_group()
+        job_id = await job_queue.submit("skills", SKILLS_JOB, "user:5")
+        await work_once()
+        return await job_queue.get(job_id, "user:5")
+
+    job = asyncio.run(go())
+    assert job["status"] == "failed" and job["error"] == "provider down"
@@ -0,0 +1,83 @@
+import pytest
+from utils.json_patch import (
+    JSON_PATCH_MEDIA_TYPE,
+    MERGE_PATCH_MEDIA_TYPE,
+    JSONPatchError,
+    json_patch,
+    merge_patch,
+    parse_pointer,
+    touched_fields,
+)
+
+DOCUMENT = {"skills": {"technical": ["Python", "SQL"]}, "job_title": "Engineer", "a/b": {"~c": 1}}
+
+
+def test_parse_pointer_unescapes_tokens():
+    assert parse_pointer("") == []
+    assert parse_pointer("/a~1b/~0c") == ["a/b", "~c"]
+    with pytest.raises(JSONPatchError):
+        parse_pointer("skills")
+
+
+@pytest.mark.parametrize("operation, expected", [
+    ({"op": "add", "path": "/skills/technical/-", "value": "Go"}, ["Python", "SQL", "Go"]),
+    ({"op": "add", "path": "/skills/technical/0", "value": "Go"}, ["Go", "Python", "SQL"]),
+    ({"op": "remove", "path": "/skills/technical/0"}, ["SQL"]),
+    ({"op": "replace", "path": "/skills/technical/1", "value": "Postgres"}, ["Python", "Postgres"]),
+    ({"op": "move", "from": "/skills/technical/0", "path": "/skills/technical/-"}, ["SQL", "Python"]),
+    ({"op": "copy", "from": "/skills/technical/0", "path": "/skills/technical/0"}, ["Python", "Python", "SQL"]),
+])
+def test_operations(operation, expected):
+    assert json_patch(DOCUMENT, [operation])["skills"]["technical"] == expected
+
+
+def test_patch_works_on_a_copy():
+    json_patch(DOCUMENT, [{"op": "remove", "path": "/skills/technical/0"}])
+    assert DOCUMENT["skills"]["technical"] == ["Python", "SQL"]
+
+
+def test_escaped_paths():
+    assert json_patch(DOCUMENT, [{"op": "replace", "path": "/a~1b/~0c", "value": 2}])["a/b"] == {"~c": 2}
+
+
+def test_a_failed_test_rejects_the_whole_patch():
+    patch = [
+        {"op": "replace", "path": "/job_title", "value": "Lead"},
+        {"op": "test", "path": "/job_title", "value": "Engineer"},
+    ]
+    with pytest.raises(JSONPatchError):
+        json_patch(DOCUMENT, patch)
+
+
+@pytest.mark.parametrize("patch", [
+    {"op": "add", "path": "/job_title", "value": "x"},
+    [{"op": "add", "path": "/job_title"}],
+    [{"op": "remove", "path": "/missing"}],
+    [{"op": "replace", "path": "/skills/technical/2", "value": "x"}],
+    [{"op": "add", "path": "/skills/technical/01", "value": "x"}],
+    [{"op": "move", "from": "/skills", "path": "/skills/technical/-"}],
+    [{"op": "frobnicate", "path": "/job_title"}],
+])
+def test_invalid_patches(patch):
+    with pytest.raises(JSONPatchError):
+        json_patch(DOCUMENT, patch)
+
+
+def test_merge_patch():
+    patched = merge_patch(DOCUMENT, {"skills": {"soft": ["Mentoring"]}, "job_title": None})
+    assert patched["skills"] == {"technical": ["Python", "SQL"], "soft": ["Mentoring"]}
+    assert "job_title" not in patched
+    assert merge_patch(DOCUMENT, {"skills": ["Python"]})["skills"] == ["Python"]
+
+
+def test_touched_fields():
+    patch = [
+        {"op": "move", "from": "/projects/items/0", "path": "/experience/items/-"},
+        {"op": "replace", "path": "/experience/items/0/title", "value": "Lead"},
+    ]
+    assert touched_fields(patch, JSON_PATCH_MEDIA_TYPE) == ["experience", "projects"]
+    assert touched_fields({"summary": "x", "skills": None}, MERGE_PATCH_MEDIA_TYPE) == ["summary", "skills"]
+    with pytest.raises(JSONPatchError):
+        touched_fields([{"op": "replace", "path": "", "value": {}}], JSON_PATCH_MEDIA_TYPE)
+    with pytest.raises(JSONPatchError):
+        touched_fields(["x"], JSON_PATCH_MEDIA_TYPE)
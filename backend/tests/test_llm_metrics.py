@@ -0,0 +1,94 @@
+import asyncio
+from types import SimpleNamespace
+from utils.llm_metrics import LLMMetrics, tag_llm_calls, tag_prompt
+
+
+def usage(prompt_tokens, completion_tokens, cached_tokens=0):
+    return SimpleNamespace(
+        prompt_tokens=prompt_tokens,
+        completion_tokens=completion_tokens,
+        prompt_tokens_details=SimpleNamespace(cached_tokens=cached_tokens),
+    )
+
+
+def series(metrics, endpoint, model):
+    [found] = [s for s in metrics.get_stats()["series"] if s["endpoint"] == endpoint and s["model"] == model]
+    return found
+
+
+def test_accounts_calls_per_endpoint_and_model():
+    metrics = LLMMetrics()
+
+    async def scenario():
+        tag_llm_calls("work-experience", "user:1")
+        metrics.record_call("gpt-4o-mini", 0.2, usage(100, 40, cached_tokens=64), retries=1)
+        metrics.record_call("gpt-4o-mini", 1.5, outcome="timeout")
+        metrics.record_call("gpt-4o-mini", 0.1, outcome="error")
+        metrics.record_call("gpt-4o-mini", 0.3, usage(50, 10), stream=True)
+        tag_llm_calls("skills", "user:1")
+        metrics.record_call("gpt-4o-mini", 0.1, usage(20, 5))
+
+    asyncio.run(scenario())
+
+    work = series(metrics, "work-experience", "gpt-4o-mini")
+    assert work["calls"] == 4 and work["streams"] == 1 and work["retries"] == 1
+    assert work["timeouts"] == 1 and work["errors"] == 1
+    assert (work["prompt_tokens"], work["completion_tokens"], work["cached_tokens"]) == (150, 50, 64)
+    assert work["latency_ms"]["count"] == 4
+    # Calls without usage add no completion-token observation
+    assert work["completion_tokens_hist"]["count"] == 2
+    assert series(metrics, "skills", "gpt-4o-mini")["prompt_tokens"] == 20
+
+
+def test_untagged_calls_are_kept_apart():
+    metrics = LLMMetrics()
+    metrics.record_call("gpt-4o-mini", 0.1)
+
+    assert series(metrics, "untagged", "gpt-4o-mini")["calls"] == 1
+
+
+def test_prompt_versions_count_only_successful_calls():
+    metrics = LLMMetrics()
+
+    async def scenario():
+        tag_prompt("skills@v2")
+        metrics.record_call("gpt-4o-mini", 0.2, usage(1000, 50, cached_tokens=768))
+        metrics.record_call("gpt-4o-mini", 0.4, usage(1000, 50))
+        metrics.record_call("gpt-4o-mini", 2.0, outcome="timeout")
+
+    asyncio.run(scenario())
+
+    prompt = metrics.get_stats()["prompts"]["skills@v2"]
+    assert prompt["calls"] == 2 and prompt["cache_hits"] == 1
+    assert prompt["cached_ratio"] == 0.384
+    assert prompt["latency_ms_cached"]["count"] == 1 and prompt["latency_ms_uncached"]["count"] == 1
+
+
+def test_daily_usage_and_quota_in_redis(redis):
+    metrics = LLMMetrics(daily_quota=200)
+
+    async def scenario():
+        tag_llm_calls("summary", "user:1")
+        metrics.record_call("gpt-4o-mini", 0.2, usage(100, 40))
+        metrics.record_call("gpt-4o-mini", 0.2, usage(50, 20))
+        tag_llm_calls("summary", "user:2")
+        metrics.record_call("gpt-4o-mini", 0.2, usage(10, 5))
+        await asyncio.gather(*metrics._pending)
+        return (
+            await metrics.get_user_usage("user:1"),
+            await metrics.get_top_users(),
+            await metrics.over_quota("user:1"),
+            await metrics.over_quota("user:2"),
+        )
+
+    user_usage, top, user1_over, user2_over = asyncio.run(scenario())
+
+    assert user_usage["calls"] == 2 and user_usage["total_tokens"] == 210
+    assert user_usage["tokens:gpt-4o-mini"] == 210
+    assert top == [{"user": "user:1", "total_tokens": 210}, {"user": "user:2", "total_tokens": 15}]
+    assert user1_over and not user2_over
+
+
+def test_quota_blocks_nobody_when_off_or_usage_is_unknown(redis):
+    assert not asyncio.run(LLMMetrics(daily_quota=0).over_quota("user:1"))
+    assert not asyncio.run(LLMMetrics(daily_quota=1).over_quota("user:unknown"))
@@ -0,0 +1,110 @@
+import asyncio
+import math
+import httpx
+import pytest
+from main import app
+from routes import cv_gen
+from utils.llm_scheduler import FairScheduler, QueueFullError
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_grants_round_robin_across_users():
+    async def run():
+        scheduler = FairScheduler(max_concurrency=1, max_queue_depth=10, max_queue_per_user=10)
+        await scheduler.acquire("first")
+        order = []
+
+        async def wait(user, name):
+            await scheduler.acquire(user)
+            order.append(name)
+
+        tasks = [asyncio.create_task(wait(user, name)) for user, name in
+                 [("heavy", "heavy-1"), ("heavy", "heavy-2"), ("heavy", "heavy-3"), ("light", "light-1")]]
+        await settle()
+        assert scheduler.depth == 4
+        for _ in tasks:
+            scheduler.release()
+            await settle()
+        await asyncio.gather(*tasks)
+        return order
+
+    assert asyncio.run(run()) == ["heavy-1", "light-1", "heavy-2", "heavy-3"]
+
+
+def test_per_user_and_global_queue_limits():
+    async def run():
+        scheduler = FairScheduler(max_concurrency=1, max_queue_depth=3, max_queue_per_user=2)
+        await scheduler.acquire("first")
+        waiting = [asyncio.create_task(scheduler.acquire(user)) for user in ("a", "a", "b")]
+        await settle()
+
+        with pytest.raises(QueueFullError):
+            await scheduler.acquire("a")  # a already has two waiting
+        with pytest.raises(QueueFullError) as full:
+            await scheduler.acquire("c")  # three waiting in total
+        for task in waiting:
+            task.cancel()
+        await asyncio.gather(*waiting, return_exceptions=True)
+        return scheduler, full.value
+
+    scheduler, error = asyncio.run(run())
+    assert scheduler.stats["rejected"] == 2
+    assert scheduler.depth == 0
+    # Three waiting plus this one, one slot, 5s per generation
+    assert error.retry_after == math.ceil(4 * 5.0)
+
+
+def test_cancel_after_grant_hands_the_slot_on():
+    async def run():
+        scheduler = FairScheduler(max_concurrency=1)
+        await scheduler.acquire("first")
+        granted_then_cancelled = asyncio.create_task(scheduler.acquire("a"))
+        next_in_line = asyncio.create_task(scheduler.acquire("b"))
+        await settle()
+
+        # The grant and the client disconnect land in the same loop iteration
+        scheduler.release()
+        granted_then_cancelled.cancel()
+        await asyncio.gather(granted_then_cancelled, return_exceptions=True)
+        await settle()
+        assert next_in_line.done()
+        await next_in_line
+        return scheduler
+
+    scheduler = asyncio.run(run())
+    assert scheduler.get_stats()["active"] == 1
+    assert scheduler.depth == 0
+
+
+def test_cancel_while_waiting_leaves_the_queue():
+    async def run():
+        scheduler = FairScheduler(max_concurrency=1)
+        await scheduler.acquire("first")
+        waiter = asyncio.create_task(scheduler.acquire("a"))
+        await settle()
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        scheduler.release()
+        return scheduler
+
+    scheduler = asyncio.run(run())
+    assert scheduler.depth == 0
+    assert scheduler.get_stats()["active"] == 0
+
+
+def test_full_queue_is_a_429_with_retry_after(monkeypatch):
+    monkeypatch.setattr(cv_gen, "llm_scheduler", FairScheduler(max_concurrency=0, max_queue_depth=0))
+    body = {"job_title": "Engineer", "company": "Acme", "location": "Remote", "role": "Backend",
+            "start_date": "2020", "end_date": "2024"}
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            return await client.post("/api/cv-gen/work-experience", json=body)
+
+    response = asyncio.run(run())
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "5"
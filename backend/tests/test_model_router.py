@@ -0,0 +1,110 @@
+import asyncio
+import pytest
+from utils import llm_client as llm_client_module
+from utils import model_router as router_module
+from utils.llm_client import LLMTimeoutError
+from utils.model_router import ModelRouter
+from utils.resilience import CircuitOpenError
+
+ROUTES = {
+    "summary": [
+        {"model": "primary", "max_tokens": 300, "slow_ms": 1000},
+        {"model": "backup", "max_tokens": 200, "slow_ms": 1000},
+    ],
+}
+MESSAGES = [{"role": "user", "content": "Write a summary"}]
+
+
+class FakeLLM:
+    """llm_client.complete() that raises the error set for a model or returns its name"""
+
+    def __init__(self, errors=None):
+        self.errors = errors or {}
+        self.calls = []
+
+    async def complete(self, messages, model, temperature, max_tokens, **kwargs):
+        self.calls.append((model, max_tokens))
+        if model in self.errors:
+            raise self.errors[model]
+        return model
+
+
+@pytest.fixture
+def llm(monkeypatch):
+    def install(**errors):
+        fake = FakeLLM(errors)
+        monkeypatch.setattr(router_module, "llm_client", fake)
+        return fake
+    return install
+
+
+def complete(router, task="summary"):
+    return asyncio.run(router.complete(task, MESSAGES))
+
+
+def test_uses_the_primary_with_its_max_tokens(llm):
+    fake = llm()
+    router = ModelRouter(ROUTES)
+
+    assert complete(router) == "primary"
+    assert fake.calls == [("primary", 300)]
+
+
+def test_falls_back_after_a_timeout(llm):
+    fake = llm(primary=LLMTimeoutError("slow"))
+    router = ModelRouter(ROUTES)
+
+    assert complete(router) == "backup"
+    assert fake.calls == [("primary", 300), ("backup", 200)]
+
+
+def test_raises_the_last_error_when_every_model_fails(llm):
+    llm(primary=LLMTimeoutError("primary"), backup=LLMTimeoutError("backup"))
+
+    with pytest.raises(LLMTimeoutError, match="backup"):
+        complete(ModelRouter(ROUTES))
+
+
+def test_open_circuit_does_not_fall_back(llm):
+    fake = llm(primary=CircuitOpenError("open"))
+
+    with pytest.raises(CircuitOpenError):
+        complete(ModelRouter(ROUTES))
+    assert fake.calls == [("primary", 300)]
+
+
+def test_failing_primary_is_demoted_until_it_recovers(llm):
+    router = ModelRouter(ROUTES)
+    llm(primary=LLMTimeoutError("down"))
+    complete(router)
+    assert [route["model"] for route in router.candidates("summary")] == ["backup", "primary"]
+
+    fake = llm()
+    assert complete(router) == "backup"
+    assert fake.calls == [("backup", 200)]
+
+    for _ in range(3):
+        router._model_health("primary").record(0.1, ok=True)
+    assert [route["model"] for route in router.candidates("summary")] == ["primary", "backup"]
+
+
+def test_slow_primary_is_demoted(llm):
+    router = ModelRouter(ROUTES)
+    for _ in range(5):
+        router._model_health("primary").record(2.0, ok=True)
+        router._model_health("backup").record(0.2, ok=True)
+
+    assert [route["model"] for route in router.candidates("summary")] == ["backup", "primary"]
+
+
+def test_stops_trying_models_once_the_request_deadline_passes(llm):
+    fake = llm(primary=LLMTimeoutError("slow"))
+    router = ModelRouter(ROUTES)
+
+    async def scenario():
+        llm_client_module._request_deadline.set(0.0)
+        return await router.complete("summary", MESSAGES)
+
+    with pytest.raises(LLMTimeoutError):
+        asyncio.run(scenario())
+    assert fake.calls == []
@@ -0,0 +1,68 @@
+import pytest
+from utils.prompt_registry import PromptRegistry, PromptTemplate, canonical_hash, prompt_registry
+
+
+def make_registry(versions=None, experiments=None):
+    registry = PromptRegistry(versions or {}, experiments or {})
+    for version in ("v1", "v2"):
+        registry.register(PromptTemplate("skills", version, "system", f"rules {version}", "inputs {career}"))
+    return registry
+
+
+def test_latest_registered_version_is_the_default():
+    assert make_registry().get("skills").key == "skills@v2"
+
+
+def test_configured_version_wins_over_latest():
+    assert make_registry(versions={"skills": "v1"}).get("skills").key == "skills@v1"
+
+
+def test_explicit_version_lookup():
+    assert make_registry().get("skills", "v1").version == "v1"
+    with pytest.raises(KeyError):
+        make_registry().get("skills", "v9")
+
+
+def test_experiment_split_is_stable_per_user():
+    experiment = make_registry(experiments={"skills": {"v1": 0.5}})
+    versions = {user: experiment.select("skills", f"user:{user}").version for user in range(200)}
+
+    assert set(versions.values()) == {"v1", "v2"}
+    assert 60 < list(versions.values()).count("v1") < 140
+    assert all(experiment.select("skills", f"user:{user}").version == version for user, version in versions.items())
+
+
+def test_experiment_on_an_unknown_version_serves_the_active_one():
+    experiment = make_registry(experiments={"skills": {"v9": 1.0}})
+    assert experiment.select("skills", "user:1").version == "v2"
+    assert experiment.select("skills").version == "v2"
+
+
+def test_list_shows_active_version_and_experiment():
+    listed = make_registry(versions={"skills": "v1"}, experiments={"skills": {"v2": 0.1}}).list()
+    assert listed == {"skills": {"active": "v1", "versions": ["v1", "v2"], "experiment": {"v2": 0.1}}}
+
+
+def test_static_first_puts_instructions_before_inputs():
+    cached = PromptTemplate("skills", "v2", "system", "rules", "history: {career}")
+    legacy = PromptTemplate("skills", "v1", "system", "rules", "history: {career}", static_first=False)
+
+    assert cached.render({"career": "Engineer"})[1]["content"] == "rules\n\nhistory: Engineer"
+    assert legacy.render({"career": "Engineer"})[1]["content"] == "history: Engineer\n\nrules"
+
+
+def test_input_hash_is_canonical_and_versioned():
+    v1, v2 = make_registry().get("skills", "v1"), make_registry().get("skills", "v2")
+
+    assert v2.input_hash({"career": " Engineer  at Acme", "extra": ""}) == v2.input_hash({"career": "engineer at acme"})
+    assert v1.input_hash({"career": "Engineer"}) != v2.input_hash({"career": "Engineer"})
+    assert canonical_hash({"a": 1, "b": [None]}) != canonical_hash({"a": 1})
+
+
+def test_shipped_prompts_render_with_the_inputs_callers_pass():
+    messages = prompt_registry.get("work_experience", "v2").render({
+        "count": 4, "job_title": "Engineer", "company": "Acme", "location": "Berlin",
+        "role": "Platform", "start_date": "2019", "end_date": "2023",
+    })
+    assert "Job Title: Engineer" in messages[1]["content"]
+    assert prompt_registry.get("summary").render({"skills": "Python", "career": "Engineer at Acme"})
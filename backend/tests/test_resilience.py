@@ -0,0 +1,232 @@
+import asyncio
+
+import pytest
+
+from utils.llm_client import LLMClient, LLMTimeoutError
+from utils.resilience import CircuitBreaker, CircuitOpenError, hedged
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_breaker_opens_after_threshold_and_short_circuits():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=10.0, clock=clock)
+
+    for _ in range(2):
+        breaker.before_call()
+        breaker.record_failure()
+    assert breaker.state == "closed"
+
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert breaker.stats["opened"] == 1
+
+    clock.now += 9.0
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    assert breaker.stats["short_circuited"] == 1
+
+
+def test_breaker_success_resets_consecutive_failures():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10.0, clock=FakeClock())
+
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == "closed"
+
+
+def test_breaker_half_open_lets_one_probe_through():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10.0, clock=clock)
+    breaker.record_failure()
+
+    clock.now += 10.0
+    breaker.before_call()
+    assert breaker.state == "half_open"
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    breaker.record_success()
+    assert breaker.state == "closed"
+    breaker.before_call()
+
+
+def test_breaker_failed_probe_reopens_for_a_full_timeout():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10.0, clock=clock)
+    breaker.record_failure()
+
+    clock.now += 10.0
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert breaker.stats["opened"] == 2
+
+    clock.now += 5.0
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    clock.now += 5.0
+    breaker.before_call()
+    assert breaker.state == "half_open"
+
+
+def test_breaker_abandoned_probe_frees_the_slot():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10.0, clock=clock)
+    breaker.record_failure()
+    clock.now += 10.0
+
+    breaker.before_call()
+    breaker.abandon()
+    breaker.before_call()
+    assert breaker.state == "half_open"
+
+
+class FakeCalls:
+    """make_call() for hedged(); each call waits on its own event"""
+
+    def __init__(self, results):
+        self.results = list(results)
+        self.release = []
+        self.cancelled = []
+
+    def __call__(self):
+        index = len(self.release)
+        self.release.append(asyncio.Event())
+        return self._run(index)
+
+    async def _run(self, index):
+        try:
+            await self.release[index].wait()
+        except asyncio.CancelledError:
+            self.cancelled.append(index)
+            raise
+        result = self.results[index]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+def test_hedge_not_started_when_first_call_is_fast():
+    async def scenario():
+        calls = FakeCalls(["first"])
+        hedges = []
+        task = asyncio.ensure_future(hedged(calls, 0.05, lambda: hedges.append(1)))
+        await asyncio.sleep(0)
+        calls.release[0].set()
+        return await task, calls, hedges
+
+    result, calls, hedges = asyncio.run(scenario())
+    assert result == "first"
+    assert len(calls.release) == 1
+    assert hedges == []
+
+
+def test_hedge_fires_after_delay_and_cancels_the_loser():
+    async def scenario():
+        calls = FakeCalls(["first", "second"])
+        hedges = []
+        task = asyncio.ensure_future(hedged(calls, 0.01, lambda: hedges.append(1)))
+        await asyncio.sleep(0)
+        assert len(calls.release) == 1
+
+        while len(calls.release) < 2:
+            await asyncio.sleep(0.005)
+        assert hedges == [1]
+        calls.release[1].set()
+        result = await task
+        await asyncio.sleep(0)
+        return result, calls
+
+    result, calls = asyncio.run(scenario())
+    assert result == "second"
+    assert calls.cancelled == [0]
+
+
+def test_hedge_without_delay_never_starts_a_second_call():
+    async def scenario():
+        calls = FakeCalls(["only"])
+        task = asyncio.ensure_future(hedged(calls, None))
+        await asyncio.sleep(0.02)
+        calls.release[0].set()
+        return await task, calls
+
+    result, calls = asyncio.run(scenario())
+    assert result == "only"
+    assert len(calls.release) == 1
+
+
+def test_hedge_waits_for_the_other_call_after_a_failure():
+    async def scenario():
+        calls = FakeCalls([RuntimeError("first failed"), "second"])
+        task = asyncio.ensure_future(hedged(calls, 0.01))
+        while len(calls.release) < 2:
+            await asyncio.sleep(0.005)
+        calls.release[0].set()
+        await asyncio.sleep(0)
+        calls.release[1].set()
+        return await task
+
+    assert asyncio.run(scenario()) == "second"
+
+
+def test_hedge_raises_when_both_calls_fail():
+    async def scenario():
+        calls = FakeCalls([RuntimeError("first"), RuntimeError("second")])
+        task = asyncio.ensure_future(hedged(calls, 0.01))
+        while len(calls.release) < 2:
+            await asyncio.sleep(0.005)
+        calls.release[0].set()
+        calls.release[1].set()
+        return await task
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(scenario())
+
+
+def _warm_client(latencies):
+    llm = LLMClient(hedge=True)
+    for latency in latencies:
+        llm.latency.record(latency)
+    return llm
+
+
+def test_client_hedges_at_p95_when_the_budget_allows():
+    llm = _warm_client([1.0] * 19 + [3.0])
+    llm.stats["calls"] = 100
+
+    assert llm._hedge_after(10.0) == 3.0
+
+
+def test_client_skips_hedge_when_budget_is_too_small():
+    llm = _warm_client([1.0] * 19 + [3.0])
+    llm.stats["calls"] = 100
+
+    # p95 (3s) + p50 (1s) does not fit in 3.5s
+    assert llm._hedge_after(3.5) is None
+
+
+def test_client_skips_hedge_until_latencies_are_known_or_ratio_is_spent():
+    llm = _warm_client([1.0] * 5)
+    llm.stats["calls"] = 100
+    assert llm._hedge_after(10.0) is None
+
+    llm = _warm_client([1.0] * 20)
+    llm.stats["calls"] = 100
+    llm.stats["hedges"] = 10
+    assert llm._hedge_after(10.0) is None
+
+
+def test_client_refuses_call_without_budget():
+    llm = LLMClient()
+
+    with pytest.raises(LLMTimeoutError):
+        llm._remaining(0.01, None)
@@ -0,0 +1,81 @@
+import asyncio
+from datetime import datetime, timedelta
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.dialects import mysql
+from controller.resume import ResumeController
+
+
+class Row:
+    def __init__(self, **values):
+        self._mapping = values
+
+
+class FakeSession:
+    """Returns canned rows and keeps the statements it was given"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.statements = []
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+        return self
+
+    def all(self):
+        return self.rows
+
+
+def rows(count, start=datetime(2026, 10, 1, 12, 0, 0)):
+    return [
+        Row(id=100 - i, name=f"Resume {i}", job_title=None, template_id=1, theme_color="blue",
+            created_at=start - timedelta(minutes=i), updated_at=start)
+        for i in range(count)
+    ]
+
+
+def sql(statement):
+    return str(statement.compile(dialect=mysql.dialect(), compile_kwargs={"literal_binds": True}))
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2026, 10, 1, 12, 30, 5)
+    cursor = ResumeController._encode_cursor(created_at, 42)
+    assert "=" not in cursor
+    assert ResumeController._decode_cursor(cursor) == (created_at, 42)
+
+
+@pytest.mark.parametrize("cursor", ["", "!!!", "bm90LWEtY3Vyc29y", "MjAyNi0xMC0wMXxub3QtYW4taWQ"])
+def test_bad_cursor_is_a_400(cursor):
+    with pytest.raises(HTTPException) as error:
+        ResumeController._decode_cursor(cursor)
+    assert error.value.status_code == 400
+
+
+def test_full_page_links_to_the_next_one():
+    session = FakeSession(rows(4))
+    page = asyncio.run(ResumeController.list_user_resumes(7, session, limit=3))
+
+    assert [item.id for item in page.items] == [100, 99, 98]
+    assert ResumeController._decode_cursor(page.next_cursor) == (page.items[-1].created_at, 98)
+    query = sql(session.statements[0])
+    assert "ORDER BY resumes.created_at DESC, resumes.id DESC" in query
+    assert "LIMIT 4" in query
+    assert "resumes.summary" not in query and "resumes.experience" not in query
+
+
+def test_last_page_has_no_cursor():
+    page = asyncio.run(ResumeController.list_user_resumes(7, FakeSession(rows(2)), limit=3))
+    assert len(page.items) == 2
+    assert page.next_cursor is None
+
+
+def test_cursor_becomes_a_keyset_predicate():
+    session = FakeSession([])
+    cursor = ResumeController._encode_cursor(datetime(2026, 10, 1, 12, 0, 0), 98)
+    asyncio.run(ResumeController.list_user_resumes(7, session, limit=3, cursor=cursor))
+
+    query = sql(session.statements[0])
+    assert "resumes.user_id = 7" in query
+    assert "resumes.created_at < '2026-10-01 12:00:00'" in query
+    assert "resumes.created_at = '2026-10-01 12:00:00' AND resumes.id < 98" in query
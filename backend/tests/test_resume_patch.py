@@ -0,0 +1,90 @@
+import asyncio
+from datetime import datetime
+from types import SimpleNamespace
+import pytest
+from fastapi import HTTPException
+from controller.resume import ResumeController
+from utils.json_patch import JSON_PATCH_MEDIA_TYPE, MERGE_PATCH_MEDIA_TYPE
+
+UPDATED_AT = datetime(2026, 10, 1, 12, 0, 0)
+
+
+class FakeSession:
+    """Answers the version SELECT with `current` and the UPDATE with `rowcount`"""
+
+    def __init__(self, current=None, version=3, rowcount=1):
+        self.row = SimpleNamespace(version=version, updated_at=UPDATED_AT, _mapping=current or {})
+        self.rowcount = rowcount
+        self.statements = []
+        self.committed = False
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+        if statement.is_select:
+            return SimpleNamespace(one_or_none=lambda: self.row)
+        return SimpleNamespace(rowcount=self.rowcount)
+
+    async def commit(self):
+        self.committed = True
+
+    async def rollback(self):
+        pass
+
+
+def patch(body, if_match='"3"', media_type=JSON_PATCH_MEDIA_TYPE, session=None):
+    session = session or FakeSession({"job_title": "Engineer", "theme_color": "blue", "name": "Ada"})
+    return asyncio.run(ResumeController.patch_resume(1, media_type, body, if_match, 7, session))
+
+
+def status_of(**kwargs):
+    with pytest.raises(HTTPException) as error:
+        patch(**kwargs)
+    return error.value.status_code
+
+
+def test_writes_only_changed_fields_and_bumps_the_version():
+    session = FakeSession({"job_title": "Engineer", "summary": "Same"})
+    result = patch({"job_title": "Lead", "summary": "Same"}, media_type=MERGE_PATCH_MEDIA_TYPE, session=session)
+
+    assert result.version == 4
+    assert result.changed == ["job_title"]
+    assert session.committed
+    update = session.statements[-1]
+    assert set(update.compile().params) >= {"job_title", "version", "updated_at"}
+    assert "summary" not in update.compile().params
+
+
+def test_a_no_op_patch_writes_nothing():
+    session = FakeSession({"job_title": "Engineer"})
+    result = patch([{"op": "replace", "path": "/job_title", "value": "Engineer"}], session=session)
+    assert result.changed == [] and result.version == 3
+    assert len(session.statements) == 1
+
+
+@pytest.mark.parametrize("kwargs, status", [
+    ({"body": {}, "media_type": "application/json"}, 415),
+    ({"body": [], "if_match": None}, 428),
+    ({"body": [], "if_match": "abc"}, 400),
+    ({"body": [{"op": "replace", "path": "/user_id", "value": 2}]}, 400),
+    ({"body": [{"op": "replace", "path": "/job_title"}]}, 422),
+    ({"body": [{"op": "test", "path": "/job_title", "value": "Lead"}]}, 422),
+    ({"body": [{"op": "replace", "path": "/job_title", "value": "Lead"}], "if_match": '"2"'}, 412),
+])
+def test_rejected_patches(kwargs, status):
+    assert status_of(**kwargs) == status
+
+
+@pytest.mark.parametrize("field", ["name", "theme_color"])
+def test_required_fields_cannot_be_removed(field):
+    assert status_of(body={field: None}, media_type=MERGE_PATCH_MEDIA_TYPE) == 422
+
+
+def test_a_concurrent_write_is_a_412():
+    session = FakeSession({"job_title": "Engineer"}, rowcount=0)
+    assert status_of(body={"job_title": "Lead"}, media_type=MERGE_PATCH_MEDIA_TYPE, session=session) == 412
+    assert not session.committed
+
+
+def test_wildcard_if_match_skips_the_version_check():
+    result = patch([{"op": "replace", "path": "/job_title", "value": "Lead"}], if_match="*")
+    assert result.version == 4
@@ -0,0 +1,96 @@
+import asyncio
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine, event, insert, select
+from sqlalchemy.orm import Session
+from controller.resume import ResumeController
+from db.scheme import Base, Resume, User
+from models.cv_models import ResumeCreate, ResumeUpdate
+
+
+class SyncSession:
+    """The AsyncSession calls the controller makes, run on a sync SQLite session"""
+
+    def __init__(self, session):
+        self.session = session
+
+    async def execute(self, statement):
+        return self.session.execute(statement)
+
+    async def commit(self):
+        self.session.commit()
+
+    async def rollback(self):
+        self.session.rollback()
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.execute(insert(User).values(id=7, email="ada@example.com", full_name="Ada"))
+        session.execute(insert(User).values(id=8, email="bob@example.com", full_name="Bob"))
+        session.commit()
+
+        statements = []
+        event.listen(engine, "before_cursor_execute", lambda conn, cursor, statement, *args: statements.append(statement))
+        session.statements = statements
+        yield session
+    engine.dispose()
+
+
+def run(call):
+    return asyncio.run(call)
+
+
+def create(db, user_id=7):
+    payload = ResumeCreate(name="Ada", job_title="Engineer", skills={"technical": ["Python"]}, template_id=1)
+    return run(ResumeController.create_resume(payload, user_id, SyncSession(db)))
+
+
+def test_create_is_one_insert(db):
+    created = create(db)
+
+    assert [statement.split()[0] for statement in db.statements] == ["INSERT"]
+    assert created.id and created.user_id == 7 and created.version == 1
+    assert db.execute(select(Resume.name)).scalar_one() == "Ada"
+
+
+def test_update_writes_once_and_reads_back_only_unwritten_columns(db):
+    created = create(db)
+    db.statements.clear()
+
+    updated = run(ResumeController.update_resume(
+        created.id, ResumeUpdate(job_title="Lead", skills={"technical": ["Go"]}), 7, SyncSession(db)
+    ))
+
+    assert [statement.split()[0] for statement in db.statements] == ["UPDATE", "SELECT"]
+    read_columns = db.statements[1].split(" FROM ")[0]
+    assert "job_title" not in read_columns and "skills" not in read_columns
+    assert updated.job_title == "Lead" and updated.skills == {"technical": ["Go"]}
+    assert updated.name == "Ada" and updated.version == 2
+
+
+def test_update_of_someone_elses_resume_is_one_statement_and_404(db):
+    created = create(db)
+    db.statements.clear()
+
+    with pytest.raises(HTTPException) as error:
+        run(ResumeController.update_resume(created.id, ResumeUpdate(job_title="Lead"), 8, SyncSession(db)))
+
+    assert error.value.status_code == 404
+    assert [statement.split()[0] for statement in db.statements] == ["UPDATE"]
+    assert db.execute(select(Resume.job_title)).scalar_one() == "Engineer"
+
+
+def test_delete_is_one_statement(db):
+    created = create(db)
+    db.statements.clear()
+
+    with pytest.raises(HTTPException):
+        run(ResumeController.delete_resume(created.id, 8, SyncSession(db)))
+    run(ResumeController.delete_resume(created.id, 7, SyncSession(db)))
+
+    assert [statement.split()[0] for statement in db.statements] == ["DELETE", "DELETE"]
+    assert db.execute(select(Resume.id)).first() is None
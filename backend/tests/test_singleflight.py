@@ -0,0 +1,80 @@
+import asyncio
+import pytest
+from config import redis as redis_config
+from utils.singleflight import SingleFlight, SingleFlightError
+
+
+def counting(calls, value="done", delay=0.05, error=None):
+    async def fn():
+        calls.append(1)
+        await asyncio.sleep(delay)
+        if error:
+            raise error
+        return value
+    return fn
+
+
+def test_two_workers_run_fn_once(redis):
+    calls = []
+    workers = [SingleFlight(poll_interval=0.01), SingleFlight(poll_interval=0.01)]
+
+    async def run():
+        return await asyncio.gather(*(worker.do("k", counting(calls)) for worker in workers))
+
+    assert asyncio.run(run()) == ["done", "done"]
+    assert len(calls) == 1
+    assert workers[0].stats["leaders"] + workers[1].stats["leaders"] == 1
+
+
+def test_follower_that_gets_the_lock_after_release_reuses_the_result(redis):
+    calls = []
+    leader, follower = SingleFlight(poll_interval=0.2), SingleFlight(poll_interval=0.2)
+
+    async def run():
+        # The follower polls slower than the leader runs, so its next iteration
+        # sees the lock free and the result published
+        first = asyncio.create_task(leader.do("k", counting(calls, delay=0.05)))
+        await asyncio.sleep(0.01)
+        return await asyncio.gather(first, follower.do("k", counting(calls)))
+
+    assert asyncio.run(run()) == ["done", "done"]
+    assert len(calls) == 1
+    assert follower.stats["remote_followers"] == 1
+
+
+def test_leader_errors_reach_waiting_followers(redis):
+    calls = []
+    leader, follower = SingleFlight(poll_interval=0.01), SingleFlight(poll_interval=0.01)
+
+    async def run():
+        first = asyncio.create_task(leader.do("k", counting(calls, error=RuntimeError("provider down"))))
+        await asyncio.sleep(0.01)
+        return await asyncio.gather(first, follower.do("k", counting(calls)), return_exceptions=True)
+
+    leader_error, follower_error = asyncio.run(run())
+    assert isinstance(leader_error, RuntimeError)
+    assert isinstance(follower_error, SingleFlightError)
+    assert len(calls) == 1
+
+
+def test_a_later_call_retries_after_a_published_error(redis):
+    calls = []
+    worker = SingleFlight(poll_interval=0.01)
+    with pytest.raises(RuntimeError):
+        asyncio.run(worker.do("k", counting(calls, error=RuntimeError("provider down"))))
+    assert asyncio.run(worker.do("k", counting(calls))) == "done"
+    assert len(calls) == 2
+
+
+def test_local_callers_share_one_call(monkeypatch):
+    monkeypatch.setattr(redis_config, "redis_client", None)
+    calls = []
+    worker = SingleFlight()
+
+    async def run():
+        fn = counting(calls)
+        return await asyncio.gather(*(worker.do("k", fn) for _ in range(5)))
+
+    assert asyncio.run(run()) == ["done"] * 5
+    assert len(calls) == 1
+    assert worker.stats["local_followers"] == 4
@@ -0,0 +1,127 @@
+import asyncio
+import pytest
+from controller import cv_generator
+from controller.cv_generator import CVGenerator
+from utils import speculative as speculative_module
+from utils.llm_client import request_time_left, set_request_deadline
+from utils.llm_metrics import current_tags
+from utils.llm_scheduler import FairScheduler
+from utils.speculative import SpeculativeCache, roles_signature
+
+ENGINEER = ("Engineer", "Acme", "2019 - 2023")
+LEAD = ("Lead", "Globex", "2023 - Present")
+
+
+def run(call):
+    return asyncio.run(call)
+
+
+async def settle(cache):
+    while cache._pending:
+        await asyncio.gather(*cache._pending, return_exceptions=True)
+
+
+async def _append(items, value):
+    items.append(value)
+
+
+def test_signature_ignores_order_case_and_duration():
+    assert roles_signature([ENGINEER, LEAD]) == roles_signature([("lead ", "GLOBEX", ""), ENGINEER])
+    assert roles_signature([ENGINEER]) != roles_signature([ENGINEER, LEAD])
+
+
+def test_results_are_found_for_the_same_jobs_only(redis):
+    cache = SpeculativeCache()
+
+    async def scenario():
+        await cache.put("user:1", "skills", [ENGINEER, LEAD], {"skills": ["Python"]})
+        return (
+            await cache.get("user:1", "skills", [LEAD, ENGINEER]),
+            await cache.get("user:1", "skills", [ENGINEER]),
+            await cache.get("user:2", "skills", [ENGINEER, LEAD]),
+        )
+
+    assert run(scenario()) == ({"skills": ["Python"]}, None, None)
+    assert cache.stats["skills_hits"] == 1 and cache.stats["skills_misses"] == 2
+
+
+def test_roles_accumulate_without_duplicates(monkeypatch):
+    monkeypatch.setattr(speculative_module.redis_config, "redis_client", None)
+    cache = SpeculativeCache(max_roles=2)
+
+    async def scenario():
+        await cache.add_role("user:1", ENGINEER)
+        await cache.add_role("user:1", ("engineer", "acme", "2019 - 2024"))
+        await cache.add_role("user:1", LEAD)
+        return await cache.add_role("user:1", ("Intern", "Initech", "2018"))
+
+    assert [title for title, _, _ in run(scenario())] == ["Lead", "Intern"]
+
+
+def test_runs_are_debounced_per_user(redis):
+    cache = SpeculativeCache(delay=0.01)
+    ran = []
+
+    async def scenario():
+        for label in ("first", "second", "third"):
+            cache.schedule("user:1", lambda label=label: _append(ran, label))
+        await settle(cache)
+
+    run(scenario())
+    assert ran == ["third"]
+    assert cache.stats["debounced"] == 2 and cache.stats["runs"] == 1
+
+
+def test_runs_stop_at_the_daily_cap(redis):
+    cache = SpeculativeCache(delay=0, max_runs_per_day=2)
+    ran = []
+
+    async def scenario():
+        for _ in range(3):
+            cache.schedule("user:1", lambda: _append(ran, "run"))
+            await settle(cache)
+
+    run(scenario())
+    assert len(ran) == 2 and cache.stats["capped"] == 1
+
+
+def test_runs_only_with_spare_llm_capacity(redis, monkeypatch):
+    monkeypatch.setattr(speculative_module, "llm_scheduler", FairScheduler(max_concurrency=0))
+    cache = SpeculativeCache(delay=0)
+    ran = []
+
+    async def scenario():
+        cache.schedule("user:1", lambda: _append(ran, "run"))
+        await settle(cache)
+
+    run(scenario())
+    assert ran == [] and cache.stats["busy"] == 1
+
+
+def test_speculation_drops_the_triggering_requests_deadline(redis, monkeypatch):
+    cache = SpeculativeCache(delay=0)
+    monkeypatch.setattr(cv_generator, "speculative_cache", cache)
+    seen = {}
+
+    async def generate_skills(request, owner=""):
+        seen["time_left"] = request_time_left()
+        seen["tags"] = current_tags()
+        return {"success": True, "skills": ["Python", "SQL"]}
+
+    async def generate_summary(request, owner=""):
+        return {"success": True, "suggestions": ["Engineer who ships"]}
+
+    monkeypatch.setattr(CVGenerator, "generate_skills", staticmethod(generate_skills))
+    monkeypatch.setattr(CVGenerator, "generate_summary", staticmethod(generate_summary))
+
+    async def scenario():
+        # The request that triggers speculation is about to run out of time
+        set_request_deadline(0.01)
+        await CVGenerator.speculate("user:1", role=ENGINEER)
+        await settle(cache)
+        return await cache.get("user:1", "summary", [ENGINEER])
+
+    summary = run(scenario())
+    assert seen["time_left"] is None
+    assert seen["tags"] == {"endpoint": "speculative", "user": "user:1"}
+    assert summary == {"skills": ["Python", "SQL"], "suggestions": ["Engineer who ships"]}
@@ -0,0 +1,56 @@
+import pytest
+from models.cv_models import SkillsOutput, WorkExperienceOutput
+from utils.json_stream import JSONArrayStreamParser
+from utils.structured_output import StructuredOutputError, parse_items, parse_result, response_format
+
+POINTS = ["Built the billing platform", "Cut deploy time by 40%"]
+
+
+def test_parses_the_schema_object():
+    assert parse_result('{"points": ["Built the billing platform", "Cut deploy time by 40%"]}', WorkExperienceOutput) == (POINTS, "json")
+
+
+def test_parses_a_bare_array_and_object_items():
+    assert parse_items('["Built the billing platform", {"point": "Cut deploy time by 40%"}]', WorkExperienceOutput) == POINTS
+
+
+def test_repairs_fences_preambles_and_trailing_commas():
+    content = 'Here you go:\n```json\n{"points": ["Built the billing platform", "Cut deploy time by 40%",]}\n```'
+    assert parse_result(content, WorkExperienceOutput) == (POINTS, "repair")
+
+
+def test_drops_the_unfinished_item_of_truncated_output():
+    assert parse_result('{"points": ["Built the billing platform", "Cut deploy ti', WorkExperienceOutput) == (
+        ["Built the billing platform"], "truncated"
+    )
+
+
+def test_reads_plain_lists_line_by_line():
+    content = "Skills:\n- Python\n* SQL\n2) Kubernetes"
+    assert parse_result(content, SkillsOutput) == (["Skills:", "Python", "SQL", "Kubernetes"], "lines")
+
+
+def test_empty_output_is_an_error():
+    with pytest.raises(StructuredOutputError):
+        parse_items('{"points": []}', WorkExperienceOutput)
+
+
+def test_response_format_is_strict_and_lists_only_the_output_field():
+    schema = response_format(WorkExperienceOutput)["json_schema"]
+    assert schema["strict"] is True
+    assert schema["schema"]["required"] == ["points"]
+    assert schema["schema"]["additionalProperties"] is False
+
+
+def test_stream_parser_yields_items_as_they_close():
+    parser = JSONArrayStreamParser()
+    chunks = ['{"points": ["Built the bil', 'ling platform", "Cut \\"deploy\\"', ' time"', ', {"x": "nested"}]}']
+    assert [parser.feed(chunk) for chunk in chunks] == [[], ["Built the billing platform"], ['Cut "deploy" time'], []]
+    assert parser.done
+
+
+def test_stream_parser_reports_the_pending_item():
+    parser = JSONArrayStreamParser()
+    parser.feed('["First item", "Sec')
+    assert parser.started and not parser.done
+    assert parser.pending == "Sec"
@@ -0,0 +1,36 @@
+from utils.template_fallback import GENERIC_FAMILY, ROLE_FAMILIES, TemplateFallback
+
+
+def test_work_experience_is_deterministic_and_unique():
+    fallback = TemplateFallback()
+    points = fallback.work_experience("Senior Software Engineer", "Backend")
+    assert points == TemplateFallback().work_experience("Senior Software Engineer", "Backend")
+    assert len(points) == 20
+    assert len(set(points)) == len(points)
+    assert all("{" not in point for point in points)
+
+
+def test_role_family_comes_from_title_keywords():
+    family = TemplateFallback.family("Software Engineer")
+    assert family in ROLE_FAMILIES.values()
+    assert TemplateFallback.family("Zookeeper") is GENERIC_FAMILY
+
+
+def test_skills_respects_count():
+    skills = TemplateFallback().skills("- Data Analyst at Acme", count=10)
+    assert len(skills) == 10
+    assert len(set(skills)) == 10
+
+
+def test_summary_names_the_person_and_their_skills():
+    [summary] = TemplateFallback().summary("Ada", ["Python", "SQL"], "- Engineer at A\n- Engineer at B", "Engineer")
+    assert summary.startswith("Ada is a results-driven Engineer with experience across 2 roles")
+    assert "Python and SQL" in summary
+
+
+def test_counts_fallbacks_per_task():
+    fallback = TemplateFallback()
+    fallback.skills("")
+    fallback.skills("")
+    fallback.summary("Ada", None, "")
+    assert fallback.get_stats() == {"skills": 2, "summary": 1}
@@ -0,0 +1,412 @@
+import asyncio
+import bisect
+import fcntl
+import hashlib
+import json
+import math
+import mmap
+import os
+import re
+import struct
+import time
+import zlib
+from array import array
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Set, Tuple
+from dotenv import load_dotenv
+
+load_dotenv()
+
+BULLET_INDEX_DIR = os.getenv("BULLET_INDEX_DIR", "data/bullet_index")
+# Seconds between checks for a rebuilt index file, and between rebuilds
+BULLET_INDEX_RELOAD_SECONDS = float(os.getenv("BULLET_INDEX_RELOAD_SECONDS", "5"))
+BULLET_INDEX_REBUILD_SECONDS = float(os.getenv("BULLET_INDEX_REBUILD_SECONDS", "300"))
+BULLET_INDEX_MAX_PER_GROUP = int(os.getenv("BULLET_INDEX_MAX_PER_GROUP", "100"))
+# off: LLM only; fast: answer from the index when it has enough close matches;
+# blend: fast, plus a smaller LLM request topped up with partial matches
+BULLET_INDEX_MODE = os.getenv("BULLET_INDEX_MODE", "blend")
+BULLET_INDEX_MIN_SIMILARITY = float(os.getenv("BULLET_INDEX_MIN_SIMILARITY", "0.5"))
+BULLET_INDEX_FAST_SIMILARITY = float(os.getenv("BULLET_INDEX_FAST_SIMILARITY", "0.85"))
+BULLET_INDEX_FAST_MIN = int(os.getenv("BULLET_INDEX_FAST_MIN", "12"))
+# Score a bullet needs to be served without the LLM: three generations, or
+# acceptance by two different users. Lower-scored bullets only blend.
+BULLET_INDEX_FAST_MIN_SCORE = float(os.getenv("BULLET_INDEX_FAST_MIN_SCORE", "3"))
+BULLET_INDEX_MIN_LLM_POINTS = int(os.getenv("BULLET_INDEX_MIN_LLM_POINTS", "8"))
+
+# Weight a bullet earns each time it is generated, and once per user who accepts it;
+# no single acceptance reaches BULLET_INDEX_FAST_MIN_SCORE on its own
+SOURCE_WEIGHTS = {"generated": 1.0, "accepted": 1.5}
+
+_MAGIC = b"BULIDX02"
+# magic, consumed log bytes, groups, features, postings, bullets, accept pairs, then 12 section offsets
+_HEADER = struct.Struct("<8sQIIIII12Q")
+_SECTIONS = (
+    ("feature_hash", "I"),
+    ("feature_idf", "f"),
+    ("feature_start", "I"),
+    ("posting_group", "I"),
+    ("posting_weight", "f"),
+    ("accept_pair", "Q"),
+    ("group_start", "I"),
+    ("key_start", "I"),
+    ("key_blob", "B"),
+    ("bullet_score", "f"),
+    ("text_start", "Q"),
+    ("text_blob", "B"),
+)
+
+
+def normalize_key(job_title: str, role: str = "") -> str:
+    text = f"{job_title} {role}".lower()
+    return " ".join(re.sub(r"[^a-z0-9+#]+", " ", text).split())
+
+
+def _features(key: str) -> Counter:
+    """Word unigrams plus character trigrams, hashed to stable 32-bit ids"""
+    grams = Counter()
+    for word in key.split():
+        grams[f"w:{word}"] += 1
+        padded = f" {word} "
+        for i in range(len(padded) - 2):
+            grams[f"c:{padded[i:i + 3]}"] += 1
+    return Counter({zlib.crc32(gram.encode()): count for gram, count in grams.items()})
+
+
+def _accept_pair(key: str, text: str, user: str) -> int:
+    """64-bit id of one user accepting one bullet, so repeats add no weight"""
+    return int.from_bytes(hashlib.blake2b(f"{key}\0{text}\0{user}".encode(), digest_size=8).digest(), "little")
+
+
+def _tf(count: int) -> float:
+    return 1.0 + math.log(count)
+
+
+class _Snapshot:
+    """One mapped build of the index file; never mutated after it is opened"""
+
+    def __init__(self, mapped: mmap.mmap, header: tuple, stamp: tuple):
+        self.map = mapped
+        self.stamp = stamp
+        self.log_offset = header[1]
+        self.counts = header[2:7]
+        groups, features, postings, bullets, pairs = self.counts
+        lengths = {
+            "feature_hash": features, "feature_idf": features, "feature_start": features + 1,
+            "posting_group": postings, "posting_weight": postings, "accept_pair": pairs,
+            "group_start": groups + 1, "key_start": groups + 1,
+            "bullet_score": bullets, "text_start": bullets + 1,
+        }
+        buffer = memoryview(mapped)
+        offsets = dict(zip((name for name, _ in _SECTIONS), header[7:]))
+        self.views: Dict[str, memoryview] = {}
+        for name, code in _SECTIONS:
+            if code == "B":
+                continue
+            size = lengths[name] * struct.calcsize(code)
+            self.views[name] = buffer[offsets[name]:offsets[name] + size].cast(code)
+        self.views["key_blob"] = buffer[offsets["key_blob"]:offsets["bullet_score"]]
+        self.views["text_blob"] = buffer[offsets["text_blob"]:]
+
+    @classmethod
+    def open(cls, path: str) -> Optional["_Snapshot"]:
+        try:
+            with open(path, "rb") as source:
+                stat = os.fstat(source.fileno())
+                mapped = mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ)
+        except (FileNotFoundError, ValueError):
+            return None
+        header = _HEADER.unpack_from(mapped, 0)
+        if header[0] != _MAGIC:
+            mapped.close()
+            return None
+        return cls(mapped, header, (stat.st_ino, stat.st_mtime_ns, stat.st_size))
+
+    def key(self, group: int) -> str:
+        starts = self.views["key_start"]
+        return bytes(self.views["key_blob"][starts[group]:starts[group + 1]]).decode()
+
+    def text(self, bullet: int) -> str:
+        starts = self.views["text_start"]
+        return bytes(self.views["text_blob"][starts[bullet]:starts[bullet + 1]]).decode()
+
+    def group_bullets(self, group: int) -> range:
+        starts = self.views["group_start"]
+        return range(starts[group], starts[group + 1])
+
+    def groups(self) -> Dict[str, Dict[str, float]]:
+        scores = self.views["bullet_score"]
+        return {
+            self.key(group): {self.text(b): float(scores[b]) for b in self.group_bullets(group)}
+            for group in range(self.counts[0])
+        }
+
+    def accept_pairs(self) -> Set[int]:
+        return set(self.views["accept_pair"])
+
+
+class BulletIndex:
+    """Retrieval index of previously generated and accepted bullets.
+
+    Bullets are appended to a JSONL log grouped under a normalized
+    "job title + role" key. A rebuild folds the new part of the log into a
+    single binary file holding TF-IDF vectors of the keys (word and
+    character-trigram features, as an inverted index) and the bullets of
+    each group ranked by how often they were produced or accepted. The file
+    is replaced atomically and memory-mapped read-only, so every uvicorn
+    worker shares the same pages and picks up a new build on its next
+    lookup. Rebuilds are incremental (only unread log lines are parsed) and
+    serialized across processes with a file lock.
+    """
+
+    def __init__(self, directory: str = BULLET_INDEX_DIR, max_per_group: int = BULLET_INDEX_MAX_PER_GROUP):
+        self.log_path = os.path.join(directory, "bullets.jsonl")
+        self.index_path = os.path.join(directory, "bullets.idx")
+        self.lock_path = os.path.join(directory, "bullets.lock")
+        self.max_per_group = max_per_group
+        # Swapped as a whole so a lookup never mixes two builds
+        self._snapshot: Optional[_Snapshot] = None
+        self._checked_at = 0.0
+        self._rebuilt_at = 0.0
+        self._rebuilding = False
+        self.stats = {"lookups": 0, "hits": 0, "recorded": 0, "rebuilds": 0, "reloads": 0}
+
+    # Writing
+
+    def _append(self, lines: List[str]):
+        os.makedirs(os.path.dirname(self.log_path) or ".", exist_ok=True)
+        # One write per batch; O_APPEND keeps concurrent writers from interleaving
+        with open(self.log_path, "a", encoding="utf-8") as log:
+            log.write("".join(lines))
+
+    async def record(
+        self, job_title: str, role: str, company: str, points: List[str], source: str = "generated", user: str = ""
+    ):
+        """Log bullets for a role; ones naming the company are kept out of the shared index.
+
+        Accepted bullets carry the accepting user, and each user counts once per bullet.
+        """
+        key = normalize_key(job_title, role)
+        company_name = company.strip().lower()
+        lines = [
+            json.dumps({"key": key, "text": point.strip(), "source": source, "user": user, "ts": int(time.time())}) + "\n"
+            for point in points
+            if point.strip() and not (company_name and company_name in point.lower())
+        ]
+        if not key or not lines:
+            return 0
+        try:
+            await asyncio.to_thread(self._append, lines)
+        except OSError:
+            return 0
+        self.stats["recorded"] += len(lines)
+        self.maybe_rebuild()
+        return len(lines)
+
+    def maybe_rebuild(self):
+        """Fold new log lines into the index in a thread, at most every BULLET_INDEX_REBUILD_SECONDS"""
+        if self._rebuilding or time.monotonic() - self._rebuilt_at < BULLET_INDEX_REBUILD_SECONDS:
+            return
+        self._rebuilding = True
+        self._rebuilt_at = time.monotonic()
+
+        async def run():
+            try:
+                await asyncio.to_thread(self.rebuild, False)
+            except OSError:
+                pass
+            finally:
+                self._rebuilding = False
+
+        asyncio.get_running_loop().create_task(run())
+
+    def rebuild(self, wait: bool = True) -> bool:
+        """Merge unread log lines into a new index file; False if another process holds the lock"""
+        os.makedirs(os.path.dirname(self.index_path) or ".", exist_ok=True)
+        with open(self.lock_path, "w") as lock:
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX if wait else fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return False
+
+            # Read the current build from disk; the live snapshot belongs to the event loop
+            current = _Snapshot.open(self.index_path)
+            groups = defaultdict(dict, current.groups() if current else {})
+            pairs = current.accept_pairs() if current else set()
+            offset = current.log_offset if current else 0
+            if not os.path.exists(self.log_path):
+                return True
+            if os.path.getsize(self.log_path) < offset:
+                # The log was truncated or rotated, start over from it
+                groups, pairs, offset = defaultdict(dict), set(), 0
+
+            with open(self.log_path, "rb") as log:
+                log.seek(offset)
+                for raw in log:
+                    if not raw.endswith(b"\n"):
+                        break  # a write still in progress
+                    offset += len(raw)
+                    try:
+                        entry = json.loads(raw)
+                        if entry.get("source") == "accepted":
+                            pair = _accept_pair(entry["key"], entry["text"], str(entry.get("user") or ""))
+                            if pair in pairs:
+                                continue
+                            pairs.add(pair)
+                        bullets = groups[entry["key"]]
+                        bullets[entry["text"]] = bullets.get(entry["text"], 0.0) + SOURCE_WEIGHTS.get(entry.get("source"), 1.0)
+                    except (ValueError, KeyError, TypeError):
+                        continue
+
+            self._write(groups, pairs, offset)
+            self.stats["rebuilds"] += 1
+        return True
+
+    def _write(self, groups: Dict[str, Dict[str, float]], pairs: Set[int], log_offset: int):
+        keys = sorted(key for key, bullets in groups.items() if bullets)
+        vectors = [_features(key) for key in keys]
+
+        document_frequency = Counter()
+        for vector in vectors:
+            document_frequency.update(vector.keys())
+        total = len(keys)
+        idf = {f: math.log((1 + total) / (1 + df)) + 1.0 for f, df in document_frequency.items()}
+
+        postings = defaultdict(list)
+        for group, vector in enumerate(vectors):
+            weights = {f: _tf(count) * idf[f] for f, count in vector.items()}
+            norm = math.sqrt(sum(w * w for w in weights.values())) or 1.0
+            for f, w in weights.items():
+                postings[f].append((group, w / norm))
+
+        data = {name: array(code) for name, code in _SECTIONS}
+        for f in sorted(postings):
+            data["feature_hash"].append(f)
+            data["feature_idf"].append(idf[f])
+            data["feature_start"].append(len(data["posting_group"]))
+            for group, weight in postings[f]:
+                data["posting_group"].append(group)
+                data["posting_weight"].append(weight)
+        data["feature_start"].append(len(data["posting_group"]))
+        data["accept_pair"] = array("Q", sorted(pairs))
+
+        key_blob, text_blob = bytearray(), bytearray()
+        for key in keys:
+            data["group_start"].append(len(data["bullet_score"]))
+            data["key_start"].append(len(key_blob))
+            key_blob += key.encode()
+            ranked = sorted(groups[key].items(), key=lambda item: -item[1])[:self.max_per_group]
+            for text, score in ranked:
+                data["bullet_score"].append(score)
+                data["text_start"].append(len(text_blob))
+                text_blob += text.encode()
+        data["group_start"].append(len(data["bullet_score"]))
+        data["key_start"].append(len(key_blob))
+        data["text_start"].append(len(text_blob))
+        data["key_blob"] = array("B", key_blob)
+        data["text_blob"] = array("B", text_blob)
+
+        offsets, position = [], _HEADER.size
+        for name, _ in _SECTIONS:
+            position += -position % 8
+            offsets.append(position)
+            position += len(data[name]) * data[name].itemsize
+
+        tmp_path = f"{self.index_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as out:
+            out.write(_HEADER.pack(
+                _MAGIC, log_offset, len(keys), len(postings),
+                len(data["posting_group"]), len(data["bullet_score"]), len(pairs), *offsets,
+            ))
+            for (name, _), offset in zip(_SECTIONS, offsets):
+                out.write(b"\0" * (offset - out.tell()))
+                data[name].tofile(out)
+            out.flush()
+            os.fsync(out.fileno())
+        # Readers keep their old mapping until they notice the new inode
+        os.replace(tmp_path, self.index_path)
+
+    # Reading
+
+    def _reload(self):
+        now = time.monotonic()
+        if now - self._checked_at < BULLET_INDEX_RELOAD_SECONDS:
+            return
+        self._checked_at = now
+        try:
+            stat = os.stat(self.index_path)
+        except FileNotFoundError:
+            return
+        current = self._snapshot
+        if current and current.stamp == (stat.st_ino, stat.st_mtime_ns, stat.st_size):
+            return
+        snapshot = _Snapshot.open(self.index_path)
+        if snapshot:
+            # The old mapping is released once no lookup references it
+            self._snapshot = snapshot
+            self.stats["reloads"] += 1
+
+    def lookup(
+        self,
+        job_title: str,
+        role: str = "",
+        limit: int = 20,
+        min_similarity: float = BULLET_INDEX_MIN_SIMILARITY,
+    ) -> List[Tuple[str, float, float]]:
+        """Best bullets of the groups most similar to this title and role, as (text, similarity, score)"""
+        self._reload()
+        self.stats["lookups"] += 1
+        snapshot = self._snapshot
+        if snapshot is None or not snapshot.counts[0]:
+            return []
+
+        views = snapshot.views
+        hashes = views["feature_hash"]
+        query = {}
+        for f, count in _features(normalize_key(job_title, role)).items():
+            position = bisect.bisect_left(hashes, f)
+            if position < len(hashes) and hashes[position] == f:
+                query[position] = _tf(count) * views["feature_idf"][position]
+        norm = math.sqrt(sum(w * w for w in query.values())) or 1.0
+
+        scores = defaultdict(float)
+        starts, groups, weights = views["feature_start"], views["posting_group"], views["posting_weight"]
+        bullet_scores = views["bullet_score"]
+        for position, weight in query.items():
+            for p in range(starts[position], starts[position + 1]):
+                scores[groups[p]] += weight / norm * weights[p]
+
+        results, seen = [], set()
+        for group, similarity in sorted(scores.items(), key=lambda item: -item[1]):
+            if similarity < min_similarity or len(results) >= limit:
+                break
+            for bullet in snapshot.group_bullets(group):
+                text = snapshot.text(bullet)
+                if text.lower() not in seen:
+                    seen.add(text.lower())
+                    results.append((text, round(similarity, 4), float(bullet_scores[bullet])))
+                    if len(results) >= limit:
+                        break
+
+        if results:
+            self.stats["hits"] += 1
+        return results
+
+    def get_stats(self) -> Dict:
+        snapshot = self._snapshot
+        return {
+            **self.stats,
+            "groups": snapshot.counts[0] if snapshot else 0,
+            "bullets": snapshot.counts[3] if snapshot else 0,
+            "index_bytes": len(snapshot.map) if snapshot else 0,
+        }
+
+
+bullet_index = BulletIndex()
+
+
+if __name__ == "__main__":
+    # python -m utils.bullet_index  -> fold the log into the index now
+    index = BulletIndex()
+    index.rebuild()
+    index._reload()
+    print(index.get_stats())
@@ -1,100 +1,174 @@
-# from typing import Dict, List, Optional
-# import json
-# import time
-# import asyncio
-# from config.redis import redis_client
-
-# class ContextManager:
-#     def __init__(self, max_context_per_doc: int = 6):
-#         self.max_context_per_doc = max_context_per_doc
-#         self._message_cache = {}  # Simple in-memory cache for faster access
-    
-#     def _get_key(self, document_id: int) -> str:
-#         return f"context:{document_id}"
-    
-#     async def add_message(self, document_id: int, role: str, content: str):
-#         message = {
-#             "role": role,
-#             "content": content,
-#             "timestamp": time.time()
-#         }
-        
-#         key = self._get_key(document_id)
-        
-#         # Update local cache
-#         if key not in self._message_cache:
-#             self._message_cache[key] = []
-        
-#         self._message_cache[key].append(message)
-        
-#         # Keep only the latest messages
-#         if len(self._message_cache[key]) > self.max_context_per_doc:
-#             self._message_cache[key] = self._message_cache[key][-self.max_context_per_doc:]
-        
-#         # Save to Redis if available (non-blocking)
-#         if redis_client:
-#             try:
-#                 await asyncio.wait_for(
-#                     redis_client.set(key, json.dumps(self._message_cache[key]), ex=300),
-#                     timeout=1.0  # 1 second timeout
-#                 )
-#             except (asyncio.TimeoutError, Exception):
-#                 # If Redis fails, continue with cache only
-#                 pass
-    
-#     async def _get_messages_from_redis(self, key: str) -> List[Dict]:
-#         if not redis_client:
-#             return self._message_cache.get(key, [])
-        
-#         try:
-#             data = await asyncio.wait_for(redis_client.get(key), timeout=1.0)
-#             if data:
-#                 messages = json.loads(data)
-#                 # Update cache
-#                 self._message_cache[key] = messages
-#                 return messages
-#         except (asyncio.TimeoutError, Exception):
-#             # Fallback to cache if Redis fails
-#             pass
-        
-#         return self._message_cache.get(key, [])
-    
-#     async def get_context(self, document_id: int) -> List[Dict]:
-#         key = self._get_key(document_id)
-        
-#         # Try cache first for speed
-#         if key in self._message_cache and self._message_cache[key]:
-#             return self._message_cache[key]
-        
-#         # Fallback to Redis
-#         return await self._get_messages_from_redis(key)
-    
-#     async def get_openai_messages(self, document_id: int) -> List[Dict]:
-#         context = await self.get_context(document_id)
-#         return [{"role": msg["role"], "content": msg["content"]} for msg in context]
-    
-#     async def clear_context(self, document_id: int):
-#         key = self._get_key(document_id)
-        
-#         # Clear from cache
-#         if key in self._message_cache:
-#             del self._message_cache[key]
-        
-#         # Clear from Redis if available
-#         if redis_client:
-#             try:
-#                 await asyncio.wait_for(redis_client.delete(key), timeout=1.0)
-#             except (asyncio.TimeoutError, Exception):
-#                 pass
-    
-#     async def get_context_summary(self, document_id: int) -> str:
-#         context = await self.get_context(document_id)
-#         if not context:
-#             return "No context available"
-        
-#         summary = f"Context for document {document_id} ({len(context)} messages):\n"
-#         for i, msg in enumerate(context):
-#             summary += f"{i+1}. {msg['role']}: {msg['content'][:100]}...\n"
-#         return summary
-
-# context_manager = ContextManager()
+import asyncio
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, List
+from dotenv import load_dotenv
+from config import redis as redis_config
+
+load_dotenv()
+
+CONTEXT_MAX_MESSAGES = int(os.getenv("CONTEXT_MAX_MESSAGES", "12"))
+CONTEXT_MAX_MESSAGE_CHARS = int(os.getenv("CONTEXT_MAX_MESSAGE_CHARS", "400"))
+CONTEXT_MAX_DOCUMENTS = int(os.getenv("CONTEXT_MAX_DOCUMENTS", "5000"))
+CONTEXT_MAX_BYTES = int(os.getenv("CONTEXT_MAX_BYTES", str(8 * 1024 * 1024)))
+CONTEXT_LOCAL_TTL = int(os.getenv("CONTEXT_LOCAL_TTL", "60"))
+CONTEXT_TTL = int(os.getenv("CONTEXT_TTL", "1800"))
+
+
+class ContextManager:
+    """Compact per-document generation context in two tiers.
+
+    Messages are short facts ("Software Engineer at Google (2019 - 2023)",
+    "Skills: ...") that later prompts reuse instead of re-sending whole CV
+    sections. The in-process tier is an LRU bounded by document count and
+    total content size; the Redis tier keeps a trimmed list per document
+    with a TTL and is written in the background so responses never wait on
+    it. Documents are namespaced by owner so one user cannot read another
+    user's context by guessing a document id.
+    """
+
+    def __init__(
+        self,
+        max_context_per_doc: int = CONTEXT_MAX_MESSAGES,
+        max_message_chars: int = CONTEXT_MAX_MESSAGE_CHARS,
+        max_documents: int = CONTEXT_MAX_DOCUMENTS,
+        max_bytes: int = CONTEXT_MAX_BYTES,
+        local_ttl: int = CONTEXT_LOCAL_TTL,
+        redis_ttl: int = CONTEXT_TTL,
+    ):
+        self.max_context_per_doc = max_context_per_doc
+        self.max_message_chars = max_message_chars
+        self.max_documents = max_documents
+        self.max_bytes = max_bytes
+        self.local_ttl = local_ttl
+        self.redis_ttl = redis_ttl
+        # key -> (fetched_at, messages, size in characters)
+        self._message_cache: "OrderedDict[str, tuple]" = OrderedDict()
+        self._cached_bytes = 0
+        self._pending = set()
+        self.stats = {"local_hits": 0, "redis_hits": 0, "misses": 0, "evictions": 0, "writes": 0}
+
+    def _get_key(self, document_id: int, owner: str) -> str:
+        return f"context:{owner}:{document_id}"
+
+    def _local_get(self, key: str):
+        entry = self._message_cache.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() - entry[0] > self.local_ttl:
+            self._local_drop(key)
+            return None
+        self._message_cache.move_to_end(key)
+        return entry[1]
+
+    def _local_drop(self, key: str):
+        entry = self._message_cache.pop(key, None)
+        if entry is not None:
+            self._cached_bytes -= entry[2]
+
+    def _local_set(self, key: str, messages: List[Dict]):
+        self._local_drop(key)
+        size = sum(len(msg["content"]) for msg in messages)
+        self._message_cache[key] = (time.monotonic(), messages, size)
+        self._cached_bytes += size
+        while self._message_cache and (
+            len(self._message_cache) > self.max_documents or self._cached_bytes > self.max_bytes
+        ):
+            oldest = next(iter(self._message_cache))
+            self._local_drop(oldest)
+            self.stats["evictions"] += 1
+
+    def _schedule(self, coro):
+        task = asyncio.create_task(coro)
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def _redis_append(self, key: str, message: Dict):
+        redis_client = redis_config.redis_client
+        if not redis_client:
+            return
+        try:
+            pipe = redis_client.pipeline()
+            pipe.rpush(key, json.dumps(message))
+            pipe.ltrim(key, -self.max_context_per_doc, -1)
+            pipe.expire(key, self.redis_ttl)
+            await asyncio.wait_for(pipe.execute(), timeout=1.0)
+        except (asyncio.TimeoutError, Exception):
+            # If Redis fails, continue with the local tier only
+            pass
+
+    async def _get_messages_from_redis(self, key: str) -> List[Dict]:
+        redis_client = redis_config.redis_client
+        if not redis_client:
+            return []
+        try:
+            data = await asyncio.wait_for(redis_client.lrange(key, 0, -1), timeout=1.0)
+            return [json.loads(item) for item in data]
+        except (asyncio.TimeoutError, Exception):
+            return []
+
+    async def get_context(self, document_id: int, owner: str = "") -> List[Dict]:
+        key = self._get_key(document_id, owner)
+
+        # Try cache first for speed
+        messages = self._local_get(key)
+        if messages is not None:
+            self.stats["local_hits"] += 1
+            return messages
+
+        messages = await self._get_messages_from_redis(key)
+        if not messages:
+            # Not cached: a document another worker starts writing must not read as empty for local_ttl
+            self.stats["misses"] += 1
+            return []
+        self.stats["redis_hits"] += 1
+        self._local_set(key, messages)
+        return messages
+
+    async def add_message(self, document_id: int, role: str, content: str, owner: str = ""):
+        """Append a fact to the document's context; repeated facts are ignored"""
+        content = " ".join(content.split())[:self.max_message_chars]
+        if not content:
+            return
+
+        key = self._get_key(document_id, owner)
+        messages = await self.get_context(document_id, owner)
+        # Another write may have landed while Redis was read
+        current = self._local_get(key)
+        if current is not None:
+            messages = current
+        if any(msg["content"] == content for msg in messages):
+            return
+
+        message = {"role": role, "content": content, "timestamp": time.time()}
+        self._local_set(key, (messages + [message])[-self.max_context_per_doc:])
+        self.stats["writes"] += 1
+        self._schedule(self._redis_append(key, message))
+
+    async def get_openai_messages(self, document_id: int, owner: str = "") -> List[Dict]:
+        context = await self.get_context(document_id, owner)
+        return [{"role": msg["role"], "content": msg["content"]} for msg in context]
+
+    async def clear_context(self, document_id: int, owner: str = ""):
+        key = self._get_key(document_id, owner)
+        self._local_drop(key)
+
+        redis_client = redis_config.redis_client
+        if redis_client:
+            try:
+                await asyncio.wait_for(redis_client.delete(key), timeout=1.0)
+            except (asyncio.TimeoutError, Exception):
+                pass
+
+    async def get_context_summary(self, document_id: int, owner: str = "") -> str:
+        """The document's facts as compact prompt text, one per line"""
+        context = await self.get_context(document_id, owner)
+        return "\n".join(f"- {msg['content']}" for msg in context)
+
+    def get_stats(self) -> Dict:
+        return {**self.stats, "documents": len(self._message_cache), "cached_bytes": self._cached_bytes}
+
+
+context_manager = ContextManager()
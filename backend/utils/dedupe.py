@@ -0,0 +1,87 @@
+import os
+import re
+from typing import FrozenSet, Iterable, List, Optional
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Jaccard similarity of shingle sets above which two items count as the same
+DEDUPE_SIMILARITY = float(os.getenv("DEDUPE_SIMILARITY", "0.6"))
+
+# Words that carry no meaning on their own; "Led the team" and "Led a team" are one bullet
+_STOPWORDS = frozenset(
+    "a an and as at by for from in into of on or our over the their to with within".split()
+)
+_WORD = re.compile(r"[a-z0-9+#]+")
+_DIGITS = re.compile(r"\d+")
+
+
+def shingles(text: str) -> FrozenSet[str]:
+    """Content words plus adjacent word pairs of an item, lower-cased.
+
+    Digit runs become "#" so "cut costs by 20%" and "cut costs by 25%"
+    still collide; the bigrams keep "project management" and "management
+    project" from looking identical.
+    """
+    words = [
+        _DIGITS.sub("#", word)
+        for word in _WORD.findall(text.lower())
+        if word not in _STOPWORDS
+    ]
+    return frozenset(words + [f"{a} {b}" for a, b in zip(words, words[1:])])
+
+
+def similarity(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    if not a or not b:
+        return 0.0
+    shared = len(a & b)
+    return shared / (len(a) + len(b) - shared)
+
+
+class NearDuplicateFilter:
+    """Keeps items that are not near-duplicates of one already kept.
+
+    Generated lists are short (at most a few dozen items), so an exact
+    pairwise Jaccard over small shingle sets is cheaper than building
+    MinHash signatures and has no false negatives. Usable incrementally,
+    one item at a time, for streamed output.
+    """
+
+    def __init__(self, threshold: float = DEDUPE_SIMILARITY, seen: Iterable[str] = ()):
+        self.threshold = threshold
+        self._kept: List[FrozenSet[str]] = []
+        self.dropped = 0
+        for item in seen:
+            self._kept.append(shingles(item))
+
+    def add(self, item: str) -> bool:
+        """True if the item is new and was kept"""
+        candidate = shingles(item)
+        for kept in self._kept:
+            if candidate == kept or similarity(candidate, kept) >= self.threshold:
+                self.dropped += 1
+                return False
+        self._kept.append(candidate)
+        return True
+
+
+def dedupe(items: List[str], threshold: float = DEDUPE_SIMILARITY, seen: Iterable[str] = ()) -> List[str]:
+    """Items in order, without near-duplicates of earlier items or of `seen`"""
+    keep = NearDuplicateFilter(threshold, seen)
+    return [item for item in items if keep.add(item)]
+
+
+def drop_truncated(items: List[str], min_words: int, cut_off: bool = False) -> List[str]:
+    """Remove fragments shorter than `min_words`, and the last item when the output was cut off.
+
+    JSON parsing already drops an unclosed trailing string; `cut_off` covers
+    line-by-line output, where the last line of a completion that hit
+    max_tokens is whatever the model managed to write.
+    """
+    if cut_off and items:
+        items = items[:-1]
+    return [item for item in items if len(item.split()) >= min_words]
+
+
+def missing_count(items: List[str], target: Optional[int]) -> int:
+    return max(0, target - len(items)) if target else 0
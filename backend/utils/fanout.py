@@ -0,0 +1,17 @@
+import asyncio
+from typing import Any, Awaitable, Iterable, List
+
+
+async def bounded_gather(aws: Iterable[Awaitable[Any]], limit: int) -> List[Any]:
+    """asyncio.gather with at most `limit` awaitables running at once.
+
+    Results keep the input order; exceptions are returned in place, as with
+    return_exceptions=True, so one failure does not cancel its siblings.
+    """
+    semaphore = asyncio.Semaphore(max(1, limit))
+
+    async def run(aw: Awaitable[Any]) -> Any:
+        async with semaphore:
+            return await aw
+
+    return await asyncio.gather(*(run(aw) for aw in aws), return_exceptions=True)
@@ -0,0 +1,142 @@
+import asyncio
+import hashlib
+import json
+import os
+import random
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+from dotenv import load_dotenv
+from config import redis as redis_config
+
+load_dotenv()
+
+GEN_CACHE_MAX_ENTRIES = int(os.getenv("GEN_CACHE_MAX_ENTRIES", "1024"))
+GEN_CACHE_LOCAL_TTL = int(os.getenv("GEN_CACHE_LOCAL_TTL", "300"))
+GEN_CACHE_TTL = int(os.getenv("GEN_CACHE_TTL", "86400"))
+GEN_CACHE_VARIANTS = int(os.getenv("GEN_CACHE_VARIANTS", "3"))
+GEN_CACHE_EXPLORE = float(os.getenv("GEN_CACHE_EXPLORE", "0.2"))
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, str):
+        return re.sub(r"\s+", " ", value).strip().lower()
+    if isinstance(value, dict):
+        return {k: _normalize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    return value
+
+
+class GenerationCache:
+    """Two-tier cache of generated results keyed on normalized prompt inputs.
+
+    Each key holds up to `max_variants` distinct generations. Reads return a
+    random variant, and while the pool is not full a fraction of reads
+    (`explore_rate`) is reported as a miss so a fresh variant gets added.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = GEN_CACHE_MAX_ENTRIES,
+        local_ttl: int = GEN_CACHE_LOCAL_TTL,
+        redis_ttl: int = GEN_CACHE_TTL,
+        max_variants: int = GEN_CACHE_VARIANTS,
+        explore_rate: float = GEN_CACHE_EXPLORE,
+    ):
+        self.max_entries = max_entries
+        self.local_ttl = local_ttl
+        self.redis_ttl = redis_ttl
+        self.max_variants = max_variants
+        self.explore_rate = explore_rate
+        self._local: "OrderedDict[str, tuple]" = OrderedDict()
+        self.stats = {"local_hits": 0, "redis_hits": 0, "misses": 0, "explores": 0, "stores": 0}
+
+    @staticmethod
+    def make_key(kind: str, inputs: Dict[str, Any], model: str, temperature: float) -> str:
+        payload = json.dumps(
+            {"inputs": _normalize(inputs), "model": model, "temperature": temperature},
+            sort_keys=True,
+            default=str,
+        )
+        return f"gen:{kind}:{hashlib.sha256(payload.encode()).hexdigest()}"
+
+    def _local_get(self, key: str) -> Optional[List[Any]]:
+        entry = self._local.get(key)
+        if entry is None:
+            return None
+        expires_at, variants = entry
+        if expires_at < time.monotonic():
+            del self._local[key]
+            return None
+        self._local.move_to_end(key)
+        return variants
+
+    def _local_set(self, key: str, variants: List[Any]):
+        self._local[key] = (time.monotonic() + self.local_ttl, variants)
+        self._local.move_to_end(key)
+        while len(self._local) > self.max_entries:
+            self._local.popitem(last=False)
+
+    async def _redis_get(self, key: str) -> Optional[List[Any]]:
+        redis_client = redis_config.redis_client
+        if not redis_client:
+            return None
+        try:
+            data = await asyncio.wait_for(redis_client.lrange(key, 0, -1), timeout=1.0)
+            return [json.loads(item) for item in data] if data else None
+        except (asyncio.TimeoutError, Exception):
+            return None
+
+    async def get(self, key: str) -> Optional[Any]:
+        variants = self._local_get(key)
+        tier = "local_hits"
+        if variants is None:
+            variants = await self._redis_get(key)
+            tier = "redis_hits"
+            if variants:
+                self._local_set(key, variants)
+
+        if not variants:
+            self.stats["misses"] += 1
+            return None
+
+        if len(variants) < self.max_variants and random.random() < self.explore_rate:
+            self.stats["explores"] += 1
+            return None
+
+        self.stats[tier] += 1
+        return random.choice(variants)
+
+    async def add(self, key: str, value: Any):
+        variants = list(self._local_get(key) or [])
+        if value in variants:
+            return
+        variants = (variants + [value])[-self.max_variants:]
+        self._local_set(key, variants)
+        self.stats["stores"] += 1
+
+        redis_client = redis_config.redis_client
+        if not redis_client:
+            return
+        try:
+            pipe = redis_client.pipeline()
+            pipe.rpush(key, json.dumps(value))
+            pipe.ltrim(key, -self.max_variants, -1)
+            pipe.expire(key, self.redis_ttl)
+            await asyncio.wait_for(pipe.execute(), timeout=1.0)
+        except (asyncio.TimeoutError, Exception):
+            pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        hits = self.stats["local_hits"] + self.stats["redis_hits"]
+        lookups = hits + self.stats["misses"] + self.stats["explores"]
+        return {
+            **self.stats,
+            "local_entries": len(self._local),
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+generation_cache = GenerationCache()
@@ -0,0 +1,148 @@
+import json
+import os
+import time
+import uuid
+from typing import Any, Dict, Optional
+from dotenv import load_dotenv
+from config import redis as redis_config
+
+load_dotenv()
+
+JOB_STREAM = os.getenv("JOB_STREAM", "cvgen:jobs")
+JOB_GROUP = os.getenv("JOB_GROUP", "cvgen-workers")
+JOB_TTL = int(os.getenv("JOB_TTL", "3600"))
+JOB_STREAM_MAXLEN = int(os.getenv("JOB_STREAM_MAXLEN", "10000"))
+
+
+class JobQueueUnavailable(Exception):
+    """Redis is not reachable, jobs can neither be queued nor read"""
+
+
+class JobQueue:
+    """Generation jobs on a Redis Stream consumed by a worker group.
+
+    A job is a stream entry plus a hash `cvgen:job:<id>` holding its status
+    (queued -> running -> done | failed), result and error. Workers publish
+    on `cvgen:job-done:<id>` when a job finishes so waiters can wake up.
+    """
+
+    def __init__(self, stream: str = JOB_STREAM, group: str = JOB_GROUP, ttl: int = JOB_TTL):
+        self.stream = stream
+        self.group = group
+        self.ttl = ttl
+
+    @staticmethod
+    def _job_key(job_id: str) -> str:
+        return f"cvgen:job:{job_id}"
+
+    @staticmethod
+    def _done_channel(job_id: str) -> str:
+        return f"cvgen:job-done:{job_id}"
+
+    @staticmethod
+    def _client():
+        if not redis_config.redis_client:
+            raise JobQueueUnavailable("Job queue requires Redis")
+        return redis_config.redis_client
+
+    async def submit(self, kind: str, payload: Dict[str, Any], user_key: str = "") -> str:
+        redis_client = self._client()
+        job_id = uuid.uuid4().hex
+        job_key = self._job_key(job_id)
+
+        pipe = redis_client.pipeline()
+        pipe.hset(job_key, mapping={
+            "kind": kind,
+            "status": "queued",
+            "user": user_key,
+            "created_at": time.time(),
+        })
+        pipe.expire(job_key, self.ttl)
+        pipe.xadd(
+            self.stream,
+            {"job_id": job_id, "kind": kind, "user": user_key, "payload": json.dumps(payload)},
+            maxlen=JOB_STREAM_MAXLEN,
+            approximate=True,
+        )
+        await pipe.execute()
+        return job_id
+
+    async def get(self, job_id: str, owner: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """The job's state; None when it does not exist or was submitted by someone other than `owner`"""
+        data = await self._client().hgetall(self._job_key(job_id))
+        if not data or (owner is not None and data.get("user") != owner):
+            return None
+        return {
+            "job_id": job_id,
+            "kind": data.get("kind"),
+            "status": data.get("status"),
+            "result": json.loads(data["result"]) if data.get("result") else None,
+            "error": data.get("error"),
+        }
+
+    async def wait(self, job_id: str, timeout: float, owner: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Return the job once it is finished, or its current state after `timeout`"""
+        redis_client = self._client()
+        pubsub = redis_client.pubsub()
+        await pubsub.subscribe(self._done_channel(job_id))
+        try:
+            # Subscribe first, then read, so a finish in between is not missed
+            job = await self.get(job_id, owner)
+            deadline = time.monotonic() + timeout
+            while job and job["status"] not in ("done", "failed"):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=remaining)
+                if message:
+                    job = await self.get(job_id, owner)
+            return job
+        finally:
+            await pubsub.unsubscribe()
+            await pubsub.aclose()
+
+    # Worker side
+
+    async def ensure_group(self):
+        try:
+            await self._client().xgroup_create(self.stream, self.group, id="0", mkstream=True)
+        except Exception as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    async def read(self, consumer: str, count: int, block_ms: int):
+        """Claim new entries for this consumer; returns [(entry_id, fields)]"""
+        response = await self._client().xreadgroup(
+            self.group, consumer, {self.stream: ">"}, count=count, block=block_ms
+        )
+        return [entry for _, entries in response or [] for entry in entries]
+
+    async def reclaim(self, consumer: str, min_idle_ms: int, count: int):
+        """Take over entries a crashed worker left pending for too long"""
+        response = await self._client().xautoclaim(
+            self.stream, self.group, consumer, min_idle_ms, start_id="0-0", count=count
+        )
+        return [entry for entry in response[1] if entry and entry[1]]
+
+    async def mark_running(self, job_id: str, consumer: str):
+        await self._client().hset(self._job_key(job_id), mapping={"status": "running", "worker": consumer})
+
+    async def finish(self, entry_id: str, job_id: str, outcome: Dict[str, Any]):
+        redis_client = self._client()
+        job_key = self._job_key(job_id)
+        if outcome.get("success"):
+            fields = {"status": "done", "result": json.dumps(outcome["result"])}
+        else:
+            fields = {"status": "failed", "error": outcome.get("error", "Generation failed")}
+        fields["finished_at"] = time.time()
+
+        pipe = redis_client.pipeline()
+        pipe.hset(job_key, mapping=fields)
+        pipe.expire(job_key, self.ttl)
+        pipe.xack(self.stream, self.group, entry_id)
+        pipe.xdel(self.stream, entry_id)
+        pipe.publish(self._done_channel(job_id), fields["status"])
+        await pipe.execute()
+
+
+job_queue = JobQueue()
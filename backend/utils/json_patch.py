@@ -0,0 +1,153 @@
+import copy
+from typing import Any, Dict, List, Tuple
+
+JSON_PATCH_MEDIA_TYPE = "application/json-patch+json"
+MERGE_PATCH_MEDIA_TYPE = "application/merge-patch+json"
+
+
+class JSONPatchError(ValueError):
+    """A patch that is malformed or does not apply to the document"""
+
+
+def merge_patch(target: Any, patch: Any) -> Any:
+    """RFC 7386: objects merge key by key, null deletes a key, anything else replaces"""
+    if not isinstance(patch, dict):
+        return copy.deepcopy(patch)
+    result = dict(target) if isinstance(target, dict) else {}
+    for key, value in patch.items():
+        if value is None:
+            result.pop(key, None)
+        else:
+            result[key] = merge_patch(result.get(key), value)
+    return result
+
+
+def parse_pointer(pointer: str) -> List[str]:
+    """RFC 6901 pointer -> reference tokens ("/a~1b/0" -> ["a/b", "0"])"""
+    if not isinstance(pointer, str) or (pointer and not pointer.startswith("/")):
+        raise JSONPatchError(f"Invalid JSON pointer: {pointer!r}")
+    return [token.replace("~1", "/").replace("~0", "~") for token in pointer.split("/")[1:]]
+
+
+def _index(container: list, token: str, allow_end: bool = False) -> int:
+    if token == "-" and allow_end:
+        return len(container)
+    if not token.isdigit() or (token != "0" and token.startswith("0")):
+        raise JSONPatchError(f"Invalid array index: {token!r}")
+    index = int(token)
+    if index > len(container) or (index == len(container) and not allow_end):
+        raise JSONPatchError(f"Array index out of range: {index}")
+    return index
+
+
+def _parent(document: Any, tokens: List[str]) -> Tuple[Any, str]:
+    node = document
+    for token in tokens[:-1]:
+        if isinstance(node, dict):
+            if token not in node:
+                raise JSONPatchError(f"Path not found: /{'/'.join(tokens)}")
+            node = node[token]
+        elif isinstance(node, list):
+            node = node[_index(node, token)]
+        else:
+            raise JSONPatchError(f"Path not found: /{'/'.join(tokens)}")
+    return node, tokens[-1]
+
+
+def _get(document: Any, tokens: List[str]) -> Any:
+    if not tokens:
+        return document
+    parent, token = _parent(document, tokens)
+    if isinstance(parent, dict):
+        if token not in parent:
+            raise JSONPatchError(f"Path not found: /{'/'.join(tokens)}")
+        return parent[token]
+    if isinstance(parent, list):
+        return parent[_index(parent, token)]
+    raise JSONPatchError(f"Path not found: /{'/'.join(tokens)}")
+
+
+def _add(document: Any, tokens: List[str], value: Any) -> Any:
+    if not tokens:
+        return value
+    parent, token = _parent(document, tokens)
+    if isinstance(parent, dict):
+        parent[token] = value
+    elif isinstance(parent, list):
+        parent.insert(_index(parent, token, allow_end=True), value)
+    else:
+        raise JSONPatchError(f"Cannot add at /{'/'.join(tokens)}")
+    return document
+
+
+def _remove(document: Any, tokens: List[str]) -> Any:
+    if not tokens:
+        raise JSONPatchError("Cannot remove the whole document")
+    parent, token = _parent(document, tokens)
+    if isinstance(parent, dict):
+        if token not in parent:
+            raise JSONPatchError(f"Path not found: /{'/'.join(tokens)}")
+        del parent[token]
+    elif isinstance(parent, list):
+        del parent[_index(parent, token)]
+    else:
+        raise JSONPatchError(f"Path not found: /{'/'.join(tokens)}")
+    return document
+
+
+def json_patch(document: Any, operations: List[Dict[str, Any]]) -> Any:
+    """RFC 6902: apply add/remove/replace/move/copy/test in order to a copy of `document`"""
+    if not isinstance(operations, list):
+        raise JSONPatchError("A JSON Patch must be an array of operations")
+    document = copy.deepcopy(document)
+    for operation in operations:
+        if not isinstance(operation, dict) or "op" not in operation or "path" not in operation:
+            raise JSONPatchError(f"Invalid operation: {operation!r}")
+        op, tokens = operation["op"], parse_pointer(operation["path"])
+        if op in ("add", "replace", "test") and "value" not in operation:
+            raise JSONPatchError(f"'{op}' needs a value")
+        if op in ("move", "copy") and "from" not in operation:
+            raise JSONPatchError(f"'{op}' needs a from")
+
+        if op == "add":
+            document = _add(document, tokens, copy.deepcopy(operation["value"]))
+        elif op == "remove":
+            document = _remove(document, tokens)
+        elif op == "replace":
+            document = _add(_remove(document, tokens), tokens, copy.deepcopy(operation["value"]))
+        elif op == "move":
+            source = parse_pointer(operation["from"])
+            if tokens[:len(source)] == source and tokens != source:
+                raise JSONPatchError("Cannot move a value into itself")
+            value = _get(document, source)
+            document = _add(_remove(document, source), tokens, value)
+        elif op == "copy":
+            document = _add(document, tokens, copy.deepcopy(_get(document, parse_pointer(operation["from"]))))
+        elif op == "test":
+            if _get(document, tokens) != operation["value"]:
+                raise JSONPatchError(f"Test failed at {operation['path']}")
+        else:
+            raise JSONPatchError(f"Unknown operation: {op!r}")
+    return document
+
+
+def touched_fields(patch: Any, media_type: str) -> List[str]:
+    """Top-level members a patch can read or change; only these need loading and writing"""
+    if media_type == MERGE_PATCH_MEDIA_TYPE:
+        if not isinstance(patch, dict):
+            raise JSONPatchError("A merge patch for a resume must be an object")
+        return list(patch)
+    if not isinstance(patch, list):
+        raise JSONPatchError("A JSON Patch must be an array of operations")
+    fields = []
+    for operation in patch:
+        if not isinstance(operation, dict):
+            raise JSONPatchError(f"Invalid operation: {operation!r}")
+        for key in ("path", "from"):
+            if key in operation:
+                tokens = parse_pointer(operation[key])
+                if not tokens:
+                    raise JSONPatchError("Patch the resume's fields, not the whole document")
+                if tokens[0] not in fields:
+                    fields.append(tokens[0])
+    return fields
@@ -0,0 +1,97 @@
+import json
+import re
+from typing import List
+
+_STRUCTURAL = re.compile(r'[\[\]{}"]')
+_PLAIN_RUN = re.compile(r'[^"\\]+')
+
+
+class JSONArrayStreamParser:
+    """Incremental parser for a JSON array of strings arriving in chunks.
+
+    The first array that opens is the target, whether it is the whole
+    output or the value of a field (`{"points": [...]}`). Each string
+    literal directly inside it is returned from feed() as soon as its
+    closing quote arrives, so callers can forward items before the
+    completion has finished. Text outside the array (markdown fences,
+    preambles) and strings nested in objects or inner arrays are skipped.
+    """
+
+    def __init__(self):
+        self._stack: List[str] = []
+        self._target = 0
+        self._in_string = False
+        self._collecting = False
+        self._escape = False
+        self._buffer: List[str] = []
+        self.done = False
+
+    @property
+    def started(self) -> bool:
+        """An array has been opened"""
+        return self._target > 0
+
+    def feed(self, chunk: str) -> List[str]:
+        items = []
+        position = 0
+        end = len(chunk)
+        # Jump between structural characters with regexes instead of looping per character
+        while position < end and not self.done:
+            if self._in_string:
+                if self._escape:
+                    self._buffer.append(chunk[position])
+                    self._escape = False
+                    position += 1
+                    continue
+                run = _PLAIN_RUN.match(chunk, position)
+                if run:
+                    self._buffer.append(run.group())
+                    position = run.end()
+                    continue
+                char = chunk[position]
+                self._buffer.append(char)
+                position += 1
+                if char == "\\":
+                    self._escape = True
+                else:
+                    self._in_string = False
+                    if self._collecting:
+                        items.append(self._decode("".join(self._buffer)))
+                    self._buffer = []
+                continue
+
+            match = _STRUCTURAL.search(chunk, position)
+            if not match:
+                break
+            char = match.group()
+            position = match.end()
+
+            if char == "[" or char == "{":
+                self._stack.append(char)
+                if char == "[" and not self._target:
+                    self._target = len(self._stack)
+            elif char == "]" or char == "}":
+                if self._stack:
+                    self._stack.pop()
+                    if self._target and len(self._stack) < self._target:
+                        self.done = True
+            elif self._stack:
+                self._in_string = True
+                self._collecting = bool(self._target) and len(self._stack) == self._target
+                self._buffer = ['"']
+
+        return [item for item in items if item]
+
+    @property
+    def pending(self) -> str:
+        """Partial item that has not been closed yet"""
+        return "".join(self._buffer[1:]) if self._in_string and self._collecting else ""
+
+    @staticmethod
+    def _decode(literal: str) -> str:
+        if "\\" not in literal:
+            return literal[1:-1].strip()
+        try:
+            return json.loads(literal).strip()
+        except json.JSONDecodeError:
+            return literal[1:-1].strip()
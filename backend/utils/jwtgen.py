@@ -38,9 +38,7 @@ def verify_token(token: str) -> Optional[dict]:
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         return payload
-    except jwt.ExpiredSignatureError:
-        return None
-    except jwt.JWTError:
+    except jwt.InvalidTokenError:
         return None
 
 def decode_access_token(token: str) -> Optional[dict]:
@@ -0,0 +1,281 @@
+import asyncio
+import time
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Dict, List, Optional
+import openai
+from config.openai import (
+    client,
+    http_client,
+    DEFAULT_MODEL,
+    LLM_TIMEOUT,
+    LLM_MAX_CONCURRENCY,
+    LLM_BREAKER_FAILURES,
+    LLM_BREAKER_RESET,
+    LLM_HEDGE,
+    LLM_HEDGE_MAX_RATIO,
+    LLM_TIMEOUT_MULTIPLIER,
+    LLM_MIN_TIMEOUT,
+)
+from utils.resilience import CircuitBreaker, CircuitOpenError, LatencyTracker, hedged
+from utils.llm_metrics import llm_metrics
+
+# Errors that say the provider is unhealthy, as opposed to a bad request
+PROVIDER_ERRORS = (
+    openai.APIConnectionError,
+    openai.InternalServerError,
+    openai.RateLimitError,
+)
+
+
+class LLMTimeoutError(Exception):
+    """Raised when a completion does not finish before its deadline"""
+
+
+# Less time than this left is treated as none; no completion finishes that fast
+MIN_CALL_BUDGET = 0.05
+
+# Absolute time.monotonic() by which LLM work for the request being served must end
+_request_deadline: ContextVar[Optional[float]] = ContextVar("llm_request_deadline", default=None)
+
+
+def set_request_deadline(seconds: float) -> Optional[float]:
+    """Bound every LLM call made while serving the current request; 0 means no bound"""
+    deadline = time.monotonic() + seconds if seconds > 0 else None
+    _request_deadline.set(deadline)
+    return deadline
+
+
+def request_time_left() -> Optional[float]:
+    deadline = _request_deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+class LLMClient:
+    def __init__(
+        self,
+        max_concurrency: int = LLM_MAX_CONCURRENCY,
+        default_timeout: float = LLM_TIMEOUT,
+        hedge: bool = LLM_HEDGE,
+    ):
+        self.max_concurrency = max_concurrency
+        self.default_timeout = default_timeout
+        self.hedge = hedge
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._in_flight = 0
+        self.breaker = CircuitBreaker(LLM_BREAKER_FAILURES, LLM_BREAKER_RESET)
+        self.latency = LatencyTracker()
+        self.stats = {"calls": 0, "hedges": 0, "timeouts": 0, "errors": 0}
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def _timeout(self, timeout: Optional[float]) -> float:
+        if timeout is not None:
+            return timeout
+        return self.latency.adaptive_timeout(LLM_TIMEOUT_MULTIPLIER, LLM_MIN_TIMEOUT, self.default_timeout)
+
+    def _remaining(self, timeout: Optional[float], deadline: Optional[float]) -> float:
+        budget = self._timeout(timeout)
+        request_deadline = _request_deadline.get()
+        if request_deadline is not None:
+            deadline = request_deadline if deadline is None else min(deadline, request_deadline)
+        if deadline is not None:
+            budget = min(budget, deadline - time.monotonic())
+        if budget <= MIN_CALL_BUDGET:
+            raise LLMTimeoutError("Deadline exceeded before the completion was sent")
+        return budget
+
+    def _hedge_after(self, budget: float) -> Optional[float]:
+        if not self.hedge or not self.latency.ready:
+            return None
+        if self.stats["hedges"] >= LLM_HEDGE_MAX_RATIO * max(1, self.stats["calls"]):
+            return None
+        hedge_after = self.latency.percentile(0.95)
+        # A hedge started at p95 that cannot finish a typical call before the budget runs out is wasted
+        if hedge_after + self.latency.percentile(0.50) > budget:
+            return None
+        return hedge_after
+
+    def _on_hedge(self):
+        self.stats["hedges"] += 1
+
+    async def complete(
+        self,
+        messages: List[Dict[str, str]],
+        model: str = DEFAULT_MODEL,
+        temperature: float = 0.6,
+        max_tokens: int = 400,
+        timeout: Optional[float] = None,
+        deadline: Optional[float] = None,
+        response_format: Optional[Dict[str, Any]] = None,
+    ):
+        """Run a chat completion without blocking the event loop.
+
+        `timeout` bounds this call and defaults to a value learned from
+        recent latencies; `deadline` is an absolute time.monotonic() value
+        shared by everything serving the same request. Time spent waiting
+        for a concurrency slot counts against both. Fails fast with
+        CircuitOpenError while the provider is known to be failing, and
+        optionally hedges calls that run past the recent p95. Every call is
+        recorded in llm_metrics with its tokens, latency and SDK retries.
+        """
+        start = time.monotonic()
+        budget = self._remaining(timeout, deadline)
+        self.breaker.before_call()
+        self.stats["calls"] += 1
+        extra = {"response_format": response_format} if response_format else {}
+
+        def make_call():
+            return client.chat.completions.with_raw_response.create(
+                model=model,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                timeout=max(budget - (time.monotonic() - start), 0.1),
+                **extra,
+            )
+
+        call_start = None
+        try:
+            async with asyncio.timeout(budget):
+                async with self._semaphore:
+                    self._in_flight += 1
+                    call_start = time.monotonic()
+                    try:
+                        raw = await hedged(make_call, self._hedge_after(budget), self._on_hedge)
+                    finally:
+                        self._in_flight -= 1
+        except TimeoutError:
+            self.stats["timeouts"] += 1
+            llm_metrics.record_call(model, time.monotonic() - start, outcome="timeout")
+            if call_start is None:
+                # Ran out of time queueing for a slot, the provider is not to blame
+                self.breaker.abandon()
+            else:
+                self.breaker.record_failure()
+            raise LLMTimeoutError(f"LLM call exceeded its {budget:.1f}s deadline")
+        except PROVIDER_ERRORS:
+            self.stats["errors"] += 1
+            llm_metrics.record_call(model, time.monotonic() - start, outcome="error")
+            self.breaker.record_failure()
+            raise
+        except openai.APIStatusError:
+            # The provider answered, the request itself was rejected
+            llm_metrics.record_call(model, time.monotonic() - start, outcome="rejected")
+            self.breaker.record_success()
+            raise
+        except BaseException:
+            self.breaker.abandon()
+            raise
+
+        latency = time.monotonic() - call_start
+        response = raw.parse()
+        self.latency.record(latency)
+        self.breaker.record_success()
+        llm_metrics.record_call(model, latency, response.usage, getattr(raw, "retries_taken", 0))
+        return response
+
+    async def stream(
+        self,
+        messages: List[Dict[str, str]],
+        model: str = DEFAULT_MODEL,
+        temperature: float = 0.6,
+        max_tokens: int = 400,
+        timeout: Optional[float] = None,
+        deadline: Optional[float] = None,
+        response_format: Optional[Dict[str, Any]] = None,
+    ) -> AsyncIterator[str]:
+        """Yield content deltas of a streamed chat completion.
+
+        The concurrency slot is held until the stream is exhausted or closed,
+        and the deadline is enforced between chunks.
+        """
+        start = time.monotonic()
+        budget = self._remaining(timeout, deadline)
+        stream_deadline = start + budget
+        self.breaker.before_call()
+        extra = {"response_format": response_format} if response_format else {}
+
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), budget)
+        except BaseException as e:
+            self.breaker.abandon()
+            if isinstance(e, TimeoutError):
+                raise LLMTimeoutError(f"No LLM slot became free within {budget:.1f}s")
+            raise
+
+        self._in_flight += 1
+        call_start = time.monotonic()
+        usage = None
+        retries = 0
+        try:
+            raw = await asyncio.wait_for(
+                client.chat.completions.with_raw_response.create(
+                    model=model,
+                    messages=messages,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    stream=True,
+                    stream_options={"include_usage": True},
+                    **extra,
+                ),
+                max(stream_deadline - time.monotonic(), 0.1),
+            )
+            retries = getattr(raw, "retries_taken", 0)
+            response = raw.parse()
+            chunks = response.__aiter__()
+            try:
+                while True:
+                    remaining = stream_deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise LLMTimeoutError(f"LLM stream exceeded its {budget:.1f}s deadline")
+                    try:
+                        chunk = await asyncio.wait_for(chunks.__anext__(), remaining)
+                    except StopAsyncIteration:
+                        break
+                    # The final chunk carries usage and no choices
+                    if chunk.usage:
+                        usage = chunk.usage
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+            finally:
+                await response.close()
+            self.breaker.record_success()
+            llm_metrics.record_call(model, time.monotonic() - call_start, usage, retries, stream=True)
+        except (TimeoutError, LLMTimeoutError):
+            self.stats["timeouts"] += 1
+            llm_metrics.record_call(model, time.monotonic() - call_start, usage, retries, "timeout", stream=True)
+            self.breaker.record_failure()
+            raise LLMTimeoutError(f"LLM stream exceeded its {budget:.1f}s deadline")
+        except PROVIDER_ERRORS:
+            self.stats["errors"] += 1
+            llm_metrics.record_call(model, time.monotonic() - call_start, usage, retries, "error", stream=True)
+            self.breaker.record_failure()
+            raise
+        except openai.APIStatusError:
+            llm_metrics.record_call(model, time.monotonic() - call_start, usage, retries, "rejected", stream=True)
+            self.breaker.record_success()
+            raise
+        except BaseException:
+            self.breaker.abandon()
+            raise
+        finally:
+            self._in_flight -= 1
+            self._semaphore.release()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "in_flight": self._in_flight,
+            "breaker_state": self.breaker.state,
+            **self.breaker.stats,
+            "latency": self.latency.get_stats(),
+            "adaptive_timeout_s": round(self._timeout(None), 2),
+        }
+
+    async def aclose(self):
+        await http_client.aclose()
+
+
+llm_client = LLMClient()
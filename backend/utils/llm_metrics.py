@@ -0,0 +1,247 @@
+import asyncio
+import logging
+import os
+from collections import Counter, defaultdict
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+from dotenv import load_dotenv
+from config import redis as redis_config
+from utils.metrics import Histogram
+
+load_dotenv()
+
+# Days of per-user usage kept in Redis
+LLM_USAGE_RETENTION_DAYS = int(os.getenv("LLM_USAGE_RETENTION_DAYS", "7"))
+# Prompt + completion tokens a user may spend per UTC day, 0 disables the check
+LLM_DAILY_TOKEN_QUOTA = int(os.getenv("LLM_DAILY_TOKEN_QUOTA", "0"))
+
+LATENCY_BUCKETS_MS = (50, 100, 250, 500, 1000, 2500, 5000, 10000, 20000, 30000, 60000)
+TOKEN_BUCKETS = (16, 32, 64, 128, 256, 512, 1024, 2048, 4096, 8192)
+
+logger = logging.getLogger("cvbuilder.llm.metrics")
+
+_call_tags: ContextVar[Optional[Dict[str, str]]] = ContextVar("llm_call_tags", default=None)
+
+
+def tag_llm_calls(endpoint: str, user: str):
+    """Attribute LLM calls made from the current request (or job) to endpoint and user"""
+    _call_tags.set({"endpoint": endpoint, "user": user})
+
+
+_prompt_key: ContextVar[Optional[str]] = ContextVar("llm_prompt_key", default=None)
+
+
+def tag_prompt(key: str):
+    """Attribute the following LLM calls to a prompt version such as skills@v2"""
+    _prompt_key.set(key)
+
+
+def current_tags() -> Dict[str, str]:
+    return _call_tags.get() or {"endpoint": "untagged", "user": "unknown"}
+
+
+def usage_day() -> str:
+    """UTC date that daily usage is counted under"""
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d")
+
+
+class LLMMetrics:
+    """Per-call token and latency accounting for LLM calls.
+
+    Every call is recorded against the endpoint and user tagged on the
+    current context (see tag_llm_calls) and the model used. Counters and
+    histograms live in-process per (endpoint, model); token usage is also
+    added to Redis hashes `llm:usage:<day>:<user>` so daily per-user quotas
+    hold across workers. Redis writes are fire-and-forget and never slow
+    down or fail a generation.
+    """
+
+    def __init__(self, daily_quota: int = LLM_DAILY_TOKEN_QUOTA, retention_days: int = LLM_USAGE_RETENTION_DAYS):
+        self.daily_quota = daily_quota
+        self.retention_seconds = retention_days * 86400
+        self._series: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._parse_paths: Dict[str, Counter] = defaultdict(Counter)
+        self._postprocess: Dict[str, Counter] = defaultdict(Counter)
+        self._prompts: Dict[str, Dict[str, Any]] = {}
+        self._pending = set()
+
+    @staticmethod
+    def _usage_key(day: str, user: str) -> str:
+        return f"llm:usage:{day}:{user}"
+
+    @staticmethod
+    def _users_key(day: str) -> str:
+        return f"llm:usage:{day}:users"
+
+    def _series_for(self, endpoint: str, model: str) -> Dict[str, Any]:
+        key = (endpoint, model)
+        if key not in self._series:
+            self._series[key] = {
+                "calls": 0,
+                "streams": 0,
+                "errors": 0,
+                "timeouts": 0,
+                "retries": 0,
+                "prompt_tokens": 0,
+                "completion_tokens": 0,
+                "cached_tokens": 0,
+                "latency_ms": Histogram(LATENCY_BUCKETS_MS),
+                "completion_tokens_hist": Histogram(TOKEN_BUCKETS),
+            }
+        return self._series[key]
+
+    def _prompt_series(self, key: str) -> Dict[str, Any]:
+        if key not in self._prompts:
+            self._prompts[key] = {
+                "calls": 0,
+                "cache_hits": 0,
+                "prompt_tokens": 0,
+                "cached_tokens": 0,
+                "latency_ms_cached": Histogram(LATENCY_BUCKETS_MS),
+                "latency_ms_uncached": Histogram(LATENCY_BUCKETS_MS),
+            }
+        return self._prompts[key]
+
+    def record_call(
+        self,
+        model: str,
+        latency: float,
+        usage: Any = None,
+        retries: int = 0,
+        outcome: str = "ok",
+        stream: bool = False,
+    ):
+        """Record one LLM call; `usage` is the provider's usage object, if any"""
+        tags = current_tags()
+        series = self._series_for(tags["endpoint"], model)
+        series["calls"] += 1
+        series["streams"] += int(stream)
+        series["retries"] += retries
+        if outcome == "timeout":
+            series["timeouts"] += 1
+        elif outcome != "ok":
+            series["errors"] += 1
+        series["latency_ms"].observe(latency * 1000)
+
+        prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+        completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+        details = getattr(usage, "prompt_tokens_details", None)
+        cached_tokens = getattr(details, "cached_tokens", 0) or 0
+        if usage is not None:
+            series["prompt_tokens"] += prompt_tokens
+            series["completion_tokens"] += completion_tokens
+            series["cached_tokens"] += cached_tokens
+            series["completion_tokens_hist"].observe(completion_tokens)
+
+        prompt_key = _prompt_key.get()
+        if prompt_key and outcome == "ok":
+            prompt = self._prompt_series(prompt_key)
+            prompt["calls"] += 1
+            prompt["cache_hits"] += int(cached_tokens > 0)
+            prompt["prompt_tokens"] += prompt_tokens
+            prompt["cached_tokens"] += cached_tokens
+            prompt["latency_ms_cached" if cached_tokens else "latency_ms_uncached"].observe(latency * 1000)
+
+        logger.debug(
+            "llm_call endpoint=%s user=%s model=%s outcome=%s latency_ms=%.0f retries=%d "
+            "prompt_tokens=%d completion_tokens=%d stream=%s",
+            tags["endpoint"], tags["user"], model, outcome, latency * 1000, retries,
+            prompt_tokens, completion_tokens, stream,
+        )
+
+        if (prompt_tokens or completion_tokens) and redis_config.redis_client:
+            self._schedule(self._add_usage(tags["user"], model, prompt_tokens, completion_tokens))
+
+    def record_parse(self, path: str):
+        """Record which branch turned the model output into a list"""
+        self._parse_paths[current_tags()["endpoint"]][path] += 1
+
+    def record_postprocess(self, event: str, count: int = 1):
+        """Count items dropped as duplicates or fragments, and top-up calls"""
+        if count:
+            self._postprocess[current_tags()["endpoint"]][event] += count
+
+    def _schedule(self, coro):
+        task = asyncio.create_task(coro)
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def _add_usage(self, user: str, model: str, prompt_tokens: int, completion_tokens: int):
+        redis_client = redis_config.redis_client
+        if not redis_client:
+            return
+        day = usage_day()
+        usage_key = self._usage_key(day, user)
+        users_key = self._users_key(day)
+        try:
+            pipe = redis_client.pipeline()
+            pipe.hincrby(usage_key, "calls", 1)
+            pipe.hincrby(usage_key, "prompt_tokens", prompt_tokens)
+            pipe.hincrby(usage_key, "completion_tokens", completion_tokens)
+            pipe.hincrby(usage_key, f"tokens:{model}", prompt_tokens + completion_tokens)
+            pipe.expire(usage_key, self.retention_seconds)
+            pipe.zincrby(users_key, prompt_tokens + completion_tokens, user)
+            pipe.expire(users_key, self.retention_seconds)
+            await asyncio.wait_for(pipe.execute(), timeout=1.0)
+        except (asyncio.TimeoutError, Exception):
+            pass
+
+    async def get_user_usage(self, user: str, day: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        redis_client = redis_config.redis_client
+        if not redis_client:
+            return None
+        data = await asyncio.wait_for(redis_client.hgetall(self._usage_key(day or usage_day(), user)), timeout=1.0)
+        usage = {field: int(value) for field, value in data.items()}
+        usage["total_tokens"] = usage.get("prompt_tokens", 0) + usage.get("completion_tokens", 0)
+        return usage
+
+    async def get_top_users(self, day: Optional[str] = None, limit: int = 20) -> Optional[List[Dict[str, Any]]]:
+        redis_client = redis_config.redis_client
+        if not redis_client:
+            return None
+        top = await asyncio.wait_for(
+            redis_client.zrevrange(self._users_key(day or usage_day()), 0, limit - 1, withscores=True),
+            timeout=1.0,
+        )
+        return [{"user": user, "total_tokens": int(score)} for user, score in top]
+
+    async def over_quota(self, user: str) -> bool:
+        """True once the user spent the daily token quota; unknown usage never blocks"""
+        if not self.daily_quota:
+            return False
+        try:
+            usage = await self.get_user_usage(user)
+        except (asyncio.TimeoutError, Exception):
+            return False
+        return bool(usage) and usage["total_tokens"] >= self.daily_quota
+
+    def get_stats(self) -> Dict[str, Any]:
+        series = []
+        for (endpoint, model), values in sorted(self._series.items()):
+            series.append({
+                "endpoint": endpoint,
+                "model": model,
+                **{k: v for k, v in values.items() if not isinstance(v, Histogram)},
+                "latency_ms": values["latency_ms"].snapshot(),
+                "completion_tokens_hist": values["completion_tokens_hist"].snapshot(),
+            })
+        prompts = {
+            key: {
+                **{k: v for k, v in values.items() if not isinstance(v, Histogram)},
+                "cached_ratio": round(values["cached_tokens"] / values["prompt_tokens"], 3) if values["prompt_tokens"] else 0.0,
+                "latency_ms_cached": values["latency_ms_cached"].snapshot(),
+                "latency_ms_uncached": values["latency_ms_uncached"].snapshot(),
+            }
+            for key, values in sorted(self._prompts.items())
+        }
+        return {
+            "series": series,
+            "prompts": prompts,
+            "parse_paths": {endpoint: dict(paths) for endpoint, paths in self._parse_paths.items()},
+            "postprocess": {endpoint: dict(events) for endpoint, events in self._postprocess.items()},
+            "daily_token_quota": self.daily_quota,
+        }
+
+
+llm_metrics = LLMMetrics()
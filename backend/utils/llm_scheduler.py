@@ -0,0 +1,150 @@
+import asyncio
+import math
+import os
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import Deque, Dict
+from dotenv import load_dotenv
+
+load_dotenv()
+
+LLM_SCHEDULER_CONCURRENCY = int(os.getenv("LLM_SCHEDULER_CONCURRENCY", "8"))
+LLM_QUEUE_DEPTH = int(os.getenv("LLM_QUEUE_DEPTH", "64"))
+LLM_QUEUE_PER_USER = int(os.getenv("LLM_QUEUE_PER_USER", "4"))
+
+
+class QueueFullError(Exception):
+    def __init__(self, retry_after: int, message: str = "LLM queue is full"):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class FairScheduler:
+    """Admission control in front of CVGenerator.
+
+    At most `max_concurrency` generations run at once. Waiting requests are
+    queued per user and granted round-robin across users, so one heavy user
+    cannot starve the rest. Once the global or per-user queue is full,
+    acquire() fails fast with QueueFullError carrying a Retry-After hint.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = LLM_SCHEDULER_CONCURRENCY,
+        max_queue_depth: int = LLM_QUEUE_DEPTH,
+        max_queue_per_user: int = LLM_QUEUE_PER_USER,
+    ):
+        self.max_concurrency = max_concurrency
+        self.max_queue_depth = max_queue_depth
+        self.max_queue_per_user = max_queue_per_user
+        self._queues: "OrderedDict[str, Deque[asyncio.Future]]" = OrderedDict()
+        self._depth = 0
+        self._active = 0
+        self._service_time = 5.0
+        self._waits: Deque[float] = deque(maxlen=1000)
+        self.stats = {"granted": 0, "queued": 0, "rejected": 0}
+
+    @property
+    def depth(self) -> int:
+        return self._depth
+
+    @property
+    def has_capacity(self) -> bool:
+        """A slot is free and nobody is waiting for one"""
+        return self._active < self.max_concurrency and not self._depth
+
+    def _retry_after(self) -> int:
+        # Time for the queue ahead to drain at the current service rate
+        batches = (self._depth + 1) / max(1, self.max_concurrency)
+        return max(1, math.ceil(batches * self._service_time))
+
+    async def acquire(self, user_key: str):
+        if self._active < self.max_concurrency and not self._depth:
+            self._active += 1
+            self.stats["granted"] += 1
+            self._waits.append(0.0)
+            return
+
+        queue = self._queues.get(user_key)
+        if self._depth >= self.max_queue_depth or (queue and len(queue) >= self.max_queue_per_user):
+            self.stats["rejected"] += 1
+            raise QueueFullError(self._retry_after())
+
+        if queue is None:
+            queue = self._queues[user_key] = deque()
+        future = asyncio.get_running_loop().create_future()
+        queue.append(future)
+        self._depth += 1
+        self.stats["queued"] += 1
+
+        start = time.monotonic()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Granted just before the cancel landed, hand the slot on
+                self.release()
+            else:
+                self._discard(user_key, future)
+            raise
+        self._waits.append(time.monotonic() - start)
+
+    def _discard(self, user_key: str, future: asyncio.Future):
+        queue = self._queues.get(user_key)
+        if queue and future in queue:
+            queue.remove(future)
+            self._depth -= 1
+            if not queue:
+                del self._queues[user_key]
+
+    def release(self, service_time: float = None):
+        if service_time is not None:
+            self._service_time = 0.8 * self._service_time + 0.2 * service_time
+        self._active -= 1
+        self._dispatch()
+
+    def _dispatch(self):
+        while self._active < self.max_concurrency and self._queues:
+            user_key, queue = self._queues.popitem(last=False)
+            future = queue.popleft()
+            self._depth -= 1
+            if queue:
+                # Back of the line, next grant goes to another user
+                self._queues[user_key] = queue
+            if future.done():
+                continue
+            self._active += 1
+            self.stats["granted"] += 1
+            future.set_result(None)
+
+    @asynccontextmanager
+    async def slot(self, user_key: str):
+        await self.acquire(user_key)
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.release(time.monotonic() - start)
+
+    def get_stats(self) -> Dict[str, float]:
+        waits = sorted(self._waits)
+
+        def pct(p: float) -> float:
+            if not waits:
+                return 0.0
+            return round(waits[min(len(waits) - 1, int(p * len(waits)))] * 1000, 2)
+
+        return {
+            **self.stats,
+            "active": self._active,
+            "queue_depth": self._depth,
+            "queued_users": len(self._queues),
+            "wait_p50_ms": pct(0.50),
+            "wait_p95_ms": pct(0.95),
+            "wait_p99_ms": pct(0.99),
+            "service_time_s": round(self._service_time, 3),
+        }
+
+
+llm_scheduler = FairScheduler()
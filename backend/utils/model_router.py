@@ -0,0 +1,128 @@
+import logging
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional
+from config.models import MODEL_ROUTES, MODEL_MAX_ERROR_RATE
+from utils.llm_client import llm_client, request_time_left, LLMTimeoutError, MIN_CALL_BUDGET, PROVIDER_ERRORS
+from utils.resilience import CircuitOpenError, LatencyTracker
+
+logger = logging.getLogger("cvbuilder.llm.router")
+
+# Failures worth retrying on the next candidate model
+FALLBACK_ERRORS = (LLMTimeoutError,) + PROVIDER_ERRORS
+
+
+class ModelHealth:
+    def __init__(self, window: int = 50):
+        self.latency = LatencyTracker(window=window, min_samples=5)
+        self._outcomes: Deque[bool] = deque(maxlen=window)
+
+    def record(self, seconds: Optional[float], ok: bool):
+        self._outcomes.append(ok)
+        if ok and seconds is not None:
+            self.latency.record(seconds)
+
+    @property
+    def error_rate(self) -> float:
+        if not self._outcomes:
+            return 0.0
+        return 1 - sum(self._outcomes) / len(self._outcomes)
+
+    def is_slow(self, slow_ms: float) -> bool:
+        return self.latency.ready and self.latency.percentile(0.95) * 1000 > slow_ms
+
+
+class ModelRouter:
+    """Pick a model and max_tokens per generation task from MODEL_ROUTES.
+
+    Candidates keep their configured order unless recent traffic shows them
+    failing (error rate >= MODEL_MAX_ERROR_RATE) or slow (p95 above the
+    route's slow_ms), in which case healthy candidates go first. A call that
+    times out or hits a provider error falls through to the next candidate.
+    """
+
+    def __init__(self, routes: Dict[str, List[Dict[str, Any]]] = MODEL_ROUTES):
+        self.routes = routes
+        self._health: Dict[str, ModelHealth] = {}
+
+    def _model_health(self, model: str) -> ModelHealth:
+        if model not in self._health:
+            self._health[model] = ModelHealth()
+        return self._health[model]
+
+    def primary(self, task: str) -> Dict[str, Any]:
+        return self.routes[task][0]
+
+    def candidates(self, task: str) -> List[Dict[str, Any]]:
+        healthy, degraded = [], []
+        for route in self.routes[task]:
+            health = self._model_health(route["model"])
+            if health.error_rate >= MODEL_MAX_ERROR_RATE or health.is_slow(route.get("slow_ms", float("inf"))):
+                degraded.append(route)
+            else:
+                healthy.append(route)
+        return healthy + degraded
+
+    def _log_decision(self, task: str, route: Dict[str, Any], attempt: int, reason: str):
+        health = self._model_health(route["model"])
+        logger.info(
+            "route task=%s model=%s max_tokens=%s attempt=%d reason=%s error_rate=%.2f p95_ms=%s",
+            task, route["model"], route["max_tokens"], attempt, reason,
+            health.error_rate, health.latency.get_stats()["p95_ms"],
+        )
+
+    async def complete(self, task: str, messages: List[Dict[str, str]], temperature: float = 0.6, **kwargs):
+        ordered = self.candidates(task)
+        reason = "preferred" if ordered[0] is self.routes[task][0] else "primary_degraded"
+        error: Optional[Exception] = None
+
+        for attempt, route in enumerate(ordered, start=1):
+            time_left = request_time_left()
+            if time_left is not None and time_left <= MIN_CALL_BUDGET:
+                # Out of request time; untried models are not to blame
+                raise error or LLMTimeoutError("Request deadline passed before a model was tried")
+            self._log_decision(task, route, attempt, reason)
+            health = self._model_health(route["model"])
+            start = time.monotonic()
+            try:
+                response = await llm_client.complete(
+                    messages=messages,
+                    model=route["model"],
+                    temperature=temperature,
+                    max_tokens=route["max_tokens"],
+                    **kwargs,
+                )
+            except CircuitOpenError:
+                raise
+            except FALLBACK_ERRORS as e:
+                health.record(None, ok=False)
+                logger.warning("route task=%s model=%s failed: %s", task, route["model"], e)
+                error = e
+                reason = f"fallback_after_{type(e).__name__}"
+                continue
+
+            health.record(time.monotonic() - start, ok=True)
+            return response
+
+        raise error
+
+    def stream(self, task: str, messages: List[Dict[str, str]], temperature: float = 0.6, **kwargs) -> AsyncIterator[str]:
+        """Stream from the best candidate; tokens already sent cannot fall back"""
+        route = self.candidates(task)[0]
+        self._log_decision(task, route, 1, "stream")
+        return llm_client.stream(
+            messages=messages,
+            model=route["model"],
+            temperature=temperature,
+            max_tokens=route["max_tokens"],
+            **kwargs,
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            model: {"error_rate": round(health.error_rate, 3), **health.latency.get_stats()}
+            for model, health in self._health.items()
+        }
+
+
+model_router = ModelRouter()
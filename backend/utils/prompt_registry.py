@@ -0,0 +1,203 @@
+import hashlib
+import json
+import os
+import re
+import zlib
+from typing import Any, Dict, List, Optional
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Active version per task, e.g. PROMPT_VERSIONS='{"skills": "v1"}'
+PROMPT_VERSIONS = json.loads(os.getenv("PROMPT_VERSIONS") or "{}")
+# Share of users moved to another version per task, e.g. PROMPT_EXPERIMENTS='{"summary": {"v1": 0.1}}'
+PROMPT_EXPERIMENTS = json.loads(os.getenv("PROMPT_EXPERIMENTS") or "{}")
+
+
+def _canonical(value: Any) -> Any:
+    if isinstance(value, str):
+        return re.sub(r"\s+", " ", value).strip().lower()
+    if isinstance(value, dict):
+        return {k: _canonical(v) for k, v in value.items() if v not in (None, "", [])}
+    if isinstance(value, (list, tuple)):
+        return [_canonical(v) for v in value]
+    return value
+
+
+def canonical_hash(inputs: Dict[str, Any]) -> str:
+    """Hash of inputs that ignores case, whitespace, key order and empty fields"""
+    payload = json.dumps(_canonical(inputs), sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class PromptTemplate:
+    """A versioned prompt: fixed system and instruction text plus a block of inputs.
+
+    With `static_first` the instructions come before the inputs, so every
+    request for the task starts with the same tokens and the provider can
+    reuse its cached prefix. `key` ("skills@v2") labels cache entries and
+    metrics, so results of different versions never mix.
+    """
+
+    def __init__(self, task: str, version: str, system: str, instructions: str, inputs: str, static_first: bool = True):
+        self.task = task
+        self.version = version
+        self.system = system
+        self.instructions = instructions
+        self.inputs = inputs
+        self.static_first = static_first
+
+    @property
+    def key(self) -> str:
+        return f"{self.task}@{self.version}"
+
+    def input_hash(self, values: Dict[str, Any]) -> str:
+        return canonical_hash({"prompt": self.key, "inputs": values})
+
+    def render(self, values: Dict[str, Any]) -> List[Dict[str, str]]:
+        inputs = self.inputs.format(**values)
+        parts = (self.instructions, inputs) if self.static_first else (inputs, self.instructions)
+        return [
+            {"role": "system", "content": self.system},
+            {"role": "user", "content": "\n\n".join(parts)},
+        ]
+
+
+class PromptRegistry:
+    def __init__(self, versions: Dict[str, str] = PROMPT_VERSIONS, experiments: Dict[str, Dict[str, float]] = PROMPT_EXPERIMENTS):
+        self._templates: Dict[str, Dict[str, PromptTemplate]] = {}
+        self._latest: Dict[str, str] = {}
+        self.versions = versions
+        self.experiments = experiments
+
+    def register(self, template: PromptTemplate) -> PromptTemplate:
+        self._templates.setdefault(template.task, {})[template.version] = template
+        self._latest[template.task] = template.version
+        return template
+
+    def get(self, task: str, version: Optional[str] = None) -> PromptTemplate:
+        templates = self._templates[task]
+        return templates[version or self.versions.get(task) or self._latest[task]]
+
+    def select(self, task: str, subject: str = "") -> PromptTemplate:
+        """The version serving `subject` (a user key); stable per user while an experiment runs"""
+        split = self.experiments.get(task)
+        if split and subject:
+            bucket = zlib.crc32(f"{task}:{subject}".encode()) % 10000 / 10000
+            for version, share in split.items():
+                if bucket < share and version in self._templates[task]:
+                    return self._templates[task][version]
+                bucket -= share
+        return self.get(task)
+
+    def list(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            task: {"active": self.get(task).version, "versions": sorted(templates), "experiment": self.experiments.get(task, {})}
+            for task, templates in self._templates.items()
+        }
+
+
+prompt_registry = PromptRegistry()
+
+# v1: the original layout, inputs first. Kept for A/B comparison.
+# v2: the same instructions ahead of the inputs, for provider prefix caching.
+
+_WORK_EXPERIENCE_SYSTEM = "You are a professional CV expert. Generate specific work experience bullet points."
+_WORK_EXPERIENCE_RULES = """Requirements:
+- 10-20 words each
+- According to the job title and experience level
+- Specific achievements with metrics
+- Role-specific responsibilities
+- Industry context consideration
+- Use action verbs"""
+
+prompt_registry.register(PromptTemplate(
+    task="work_experience",
+    version="v1",
+    system=_WORK_EXPERIENCE_SYSTEM,
+    inputs="""Generate {count} specific work experience bullet points for:
+
+Job Title: {job_title}
+Company: {company}
+Location: {location}
+Role/Department: {role}
+Duration: {start_date} to {end_date}
+
+Make bullet points specifically relevant to "{job_title}" at "{company}".""",
+    instructions=_WORK_EXPERIENCE_RULES + "\n\nReturn as JSON array of strings.",
+    static_first=False,
+))
+prompt_registry.register(PromptTemplate(
+    task="work_experience",
+    version="v2",
+    system=_WORK_EXPERIENCE_SYSTEM,
+    instructions="""Generate work experience bullet points for the job described at the end.
+Make every bullet point specifically relevant to that job title and company.
+
+""" + _WORK_EXPERIENCE_RULES + "\n\nReturn as JSON array of strings.",
+    inputs="""Number of bullet points: {count}
+Job Title: {job_title}
+Company: {company}
+Location: {location}
+Role/Department: {role}
+Duration: {start_date} to {end_date}""",
+))
+
+_SKILLS_SYSTEM = "You are a professional CV expert. Based on the work experience context, generate highly relevant and specific skills."
+_SKILLS_RULES = """Analyze the job titles, companies, and responsibilities and generate skills that are:
+- DIRECTLY relevant to those specific roles and industries
+- Both technical and soft skills matching the experience level
+- Specific to this career path, not generic
+- Appropriate for the industry and seniority level
+Return as JSON array of strings."""
+
+prompt_registry.register(PromptTemplate(
+    task="skills",
+    version="v1",
+    system=_SKILLS_SYSTEM,
+    inputs="""Generate 15-20 highly relevant professional skills for this work history:
+
+{career}""",
+    instructions=_SKILLS_RULES,
+    static_first=False,
+))
+prompt_registry.register(PromptTemplate(
+    task="skills",
+    version="v2",
+    system=_SKILLS_SYSTEM,
+    instructions="Generate 15-20 highly relevant professional skills for the work history at the end.\n\n" + _SKILLS_RULES,
+    inputs="""Work history:
+{career}""",
+))
+
+_SUMMARY_SYSTEM = "You are a professional CV expert. Generate professional summaries."
+_SUMMARY_RULES = """Requirements:
+- Exactly 50-80 words
+- Professional tone
+- Highlight key strengths and achievements
+- Focus on value proposition
+- Write in third person
+
+Return as a JSON array of strings (each string = one full summary)."""
+
+prompt_registry.register(PromptTemplate(
+    task="summary",
+    version="v1",
+    system=_SUMMARY_SYSTEM,
+    inputs="""Create 1 professional summary (50-80 words) for this person based on their CV data:
+
+Key Skills: {skills}
+Work Experience:
+{career}""",
+    instructions=_SUMMARY_RULES,
+    static_first=False,
+))
+prompt_registry.register(PromptTemplate(
+    task="summary",
+    version="v2",
+    system=_SUMMARY_SYSTEM,
+    instructions="Create 1 professional summary (50-80 words) for the person whose CV data is at the end.\n\n" + _SUMMARY_RULES,
+    inputs="""Key Skills: {skills}
+Work Experience:
+{career}""",
+))
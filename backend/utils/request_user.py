@@ -0,0 +1,40 @@
+import os
+from fastapi import Request
+from dotenv import load_dotenv
+from utils.jwtgen import decode_access_token
+
+load_dotenv()
+
+# Reverse proxies in front of the app that append to X-Forwarded-For; 0 means
+# the header is client-controlled and ignored. Behind a proxy this must be set
+# (deployment/docker sets 1 for nginx), or every anonymous user shares its address.
+TRUSTED_PROXY_HOPS = int(os.getenv("TRUSTED_PROXY_HOPS", "0"))
+
+
+def client_ip(request: Request) -> str:
+    """Address of the client as seen by the outermost trusted proxy, else the socket peer"""
+    forwarded = request.headers.get("X-Forwarded-For")
+    if TRUSTED_PROXY_HOPS and forwarded:
+        hops = [hop.strip() for hop in forwarded.split(",") if hop.strip()]
+        if hops:
+            # Entries left of the ones our proxies appended are whatever the client sent
+            return hops[-min(TRUSTED_PROXY_HOPS, len(hops))]
+    return request.client.host if request.client else "unknown"
+
+
+def get_request_user_key(request: Request) -> str:
+    """Stable identity for per-user accounting: JWT subject, else client IP"""
+    user_id = getattr(request.state, "user_id", None)
+    if user_id:
+        return f"user:{user_id}"
+
+    auth_header = request.headers.get("Authorization", "")
+    if auth_header.startswith("Bearer "):
+        try:
+            payload = decode_access_token(auth_header.split(" ", 1)[1])
+        except Exception:
+            payload = None
+        if payload and payload.get("sub"):
+            return f"user:{payload['sub']}"
+
+    return f"ip:{client_ip(request)}"
@@ -0,0 +1,131 @@
+import asyncio
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a dependency that is currently failing"""
+
+
+class CircuitBreaker:
+    """Closed -> open after `failure_threshold` consecutive failures.
+
+    While open every call fails fast. After `reset_timeout` seconds one probe
+    is let through (half-open); its success closes the circuit, its failure
+    opens it again.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self.state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self.stats = {"opened": 0, "short_circuited": 0}
+
+    def before_call(self):
+        if self.state == "closed":
+            return
+        if self.state == "open" and self._clock() - self._opened_at >= self.reset_timeout:
+            self.state = "half_open"
+            self._probe_in_flight = False
+        if self.state == "half_open" and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return
+        self.stats["short_circuited"] += 1
+        retry_in = max(0.0, self.reset_timeout - (self._clock() - self._opened_at))
+        raise CircuitOpenError(f"LLM provider circuit is open, retry in {retry_in:.0f}s")
+
+    def record_success(self):
+        self._failures = 0
+        self._probe_in_flight = False
+        self.state = "closed"
+
+    def abandon(self):
+        """The call ended without a verdict (e.g. cancelled); free the probe"""
+        self._probe_in_flight = False
+
+    def record_failure(self):
+        self._failures += 1
+        self._probe_in_flight = False
+        if self.state == "half_open" or self._failures >= self.failure_threshold:
+            if self.state != "open":
+                self.stats["opened"] += 1
+            self.state = "open"
+            self._opened_at = self._clock()
+
+
+class LatencyTracker:
+    """Rolling window of call latencies with percentile lookups"""
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self.min_samples = min_samples
+        self._samples: Deque[float] = deque(maxlen=window)
+
+    def record(self, seconds: float):
+        self._samples.append(seconds)
+
+    @property
+    def ready(self) -> bool:
+        return len(self._samples) >= self.min_samples
+
+    def percentile(self, pct: float) -> Optional[float]:
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(pct * len(ordered)))]
+
+    def adaptive_timeout(self, multiplier: float, floor: float, ceiling: float) -> float:
+        """Timeout derived from recent p99, clamped to [floor, ceiling]"""
+        if not self.ready:
+            return ceiling
+        return min(ceiling, max(floor, self.percentile(0.99) * multiplier))
+
+    def get_stats(self) -> Dict[str, Any]:
+        def ms(value):
+            return round(value * 1000, 1) if value is not None else None
+
+        return {
+            "samples": len(self._samples),
+            "p50_ms": ms(self.percentile(0.50)),
+            "p95_ms": ms(self.percentile(0.95)),
+            "p99_ms": ms(self.percentile(0.99)),
+        }
+
+
+async def hedged(
+    make_call: Callable[[], Awaitable[Any]],
+    hedge_after: Optional[float],
+    on_hedge: Optional[Callable[[], None]] = None,
+) -> Any:
+    """Await make_call(); if it is still running after `hedge_after` seconds,
+    start a second identical call and return whichever succeeds first."""
+    first = asyncio.ensure_future(make_call())
+    tasks = {first}
+    try:
+        if hedge_after is not None:
+            done, _ = await asyncio.wait(tasks, timeout=hedge_after)
+            if not done:
+                if on_hedge:
+                    on_hedge()
+                tasks.add(asyncio.ensure_future(make_call()))
+
+        error = None
+        while tasks:
+            done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                error = task.exception()
+        raise error
+    finally:
+        for task in tasks:
+            task.cancel()
@@ -0,0 +1,172 @@
+import asyncio
+import json
+import os
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict
+from dotenv import load_dotenv
+from config import redis as redis_config
+from utils.llm_client import LLMTimeoutError, MIN_CALL_BUDGET, request_time_left
+
+load_dotenv()
+
+SINGLEFLIGHT_LOCK_TTL = float(os.getenv("SINGLEFLIGHT_LOCK_TTL", "45"))
+SINGLEFLIGHT_RESULT_TTL = int(os.getenv("SINGLEFLIGHT_RESULT_TTL", "15"))
+
+# Delete the lock only if we still own it
+_RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+class SingleFlightError(Exception):
+    """The leader of a coalesced call failed; carries its error message"""
+
+
+class SingleFlight:
+    """Coalesce identical concurrent calls into one execution.
+
+    Within a worker, callers sharing a key await the same future. Across
+    workers and containers, a Redis lock elects one leader which publishes
+    its result (or error) under a result key that followers poll for. A
+    published result also answers calls that arrive within result_ttl, so
+    a caller that only gets the lock after the leader finished reuses the
+    result instead of running fn() again.
+    Without Redis only the in-process tier applies. Remote followers stop
+    polling when the request's LLM deadline runs out, like any LLM call.
+    """
+
+    def __init__(
+        self,
+        lock_ttl: float = SINGLEFLIGHT_LOCK_TTL,
+        result_ttl: int = SINGLEFLIGHT_RESULT_TTL,
+        poll_interval: float = 0.1,
+    ):
+        self.lock_ttl = lock_ttl
+        self.result_ttl = result_ttl
+        self.poll_interval = poll_interval
+        self._calls: Dict[str, asyncio.Future] = {}
+        self.stats = {"leaders": 0, "local_followers": 0, "remote_followers": 0}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Run fn() once per key at a time; the result must be JSON-serializable"""
+        existing = self._calls.get(key)
+        if existing is not None:
+            self.stats["local_followers"] += 1
+            try:
+                return await asyncio.shield(existing)
+            except asyncio.CancelledError:
+                # The leader's client went away, not ours: take over
+                if existing.cancelled() and not asyncio.current_task().cancelling():
+                    return await self.do(key, fn)
+                raise
+
+        future = asyncio.get_running_loop().create_future()
+        # Nobody may be waiting on it, don't warn about unretrieved errors
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._calls[key] = future
+        try:
+            result = await self._do_distributed(key, fn)
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            self._calls.pop(key, None)
+
+    async def _do_distributed(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        redis_client = redis_config.redis_client
+        if not redis_client:
+            self.stats["leaders"] += 1
+            return await fn()
+
+        lock_key = f"sf:lock:{key}"
+        result_key = f"sf:result:{key}"
+        token = uuid.uuid4().hex
+        deadline = time.monotonic() + self.lock_ttl
+
+        waited = False
+        while True:
+            # A result published while we polled (or just before we arrived) ends the wait;
+            # checking it before the lock keeps a finished leader from being replaced
+            published = await self._read_result(redis_client, result_key)
+            if published is not None and (published.get("ok") or waited):
+                return self._follow(published)
+
+            try:
+                acquired = await asyncio.wait_for(
+                    redis_client.set(lock_key, token, nx=True, px=int(self.lock_ttl * 1000)),
+                    timeout=1.0,
+                )
+            except (asyncio.TimeoutError, Exception):
+                self.stats["leaders"] += 1
+                return await fn()
+
+            if acquired:
+                return await self._lead(redis_client, lock_key, result_key, token, fn)
+            waited = True
+
+            if time.monotonic() >= deadline:
+                # Leader vanished without publishing, stop waiting on it
+                self.stats["leaders"] += 1
+                return await fn()
+
+            time_left = request_time_left()
+            if time_left is not None and time_left <= MIN_CALL_BUDGET:
+                raise LLMTimeoutError("Deadline exceeded while waiting for a coalesced generation")
+            await asyncio.sleep(self.poll_interval if time_left is None else min(self.poll_interval, time_left))
+
+    def _follow(self, published: Dict[str, Any]) -> Any:
+        self.stats["remote_followers"] += 1
+        if published.get("ok"):
+            return published["value"]
+        raise SingleFlightError(published.get("error", "Coalesced generation failed"))
+
+    async def _lead(self, redis_client, lock_key: str, result_key: str, token: str, fn) -> Any:
+        try:
+            # The previous leader may have published and released between our read and the lock
+            published = await self._read_result(redis_client, result_key)
+            if published is not None and published.get("ok"):
+                return self._follow(published)
+
+            self.stats["leaders"] += 1
+            # Publishing overwrites any older result, so it is never deleted first
+            result = await fn()
+            await self._publish(redis_client, result_key, {"ok": True, "value": result})
+            return result
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            await self._publish(redis_client, result_key, {"ok": False, "error": str(e)})
+            raise
+        finally:
+            try:
+                await asyncio.wait_for(redis_client.eval(_RELEASE_SCRIPT, 1, lock_key, token), timeout=1.0)
+            except (asyncio.TimeoutError, Exception):
+                pass
+
+    async def _publish(self, redis_client, result_key: str, payload: Dict[str, Any]):
+        try:
+            await asyncio.wait_for(
+                redis_client.set(result_key, json.dumps(payload), ex=self.result_ttl),
+                timeout=1.0,
+            )
+        except (asyncio.TimeoutError, Exception):
+            pass
+
+    async def _read_result(self, redis_client, result_key: str):
+        try:
+            data = await asyncio.wait_for(redis_client.get(result_key), timeout=1.0)
+            return json.loads(data) if data else None
+        except (asyncio.TimeoutError, Exception):
+            return None
+
+
+single_flight = SingleFlight()
@@ -0,0 +1,197 @@
+import asyncio
+import hashlib
+import json
+import os
+import re
+import time
+from collections import Counter, OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from dotenv import load_dotenv
+from config import redis as redis_config
+from utils.llm_metrics import usage_day
+from utils.llm_scheduler import llm_scheduler
+
+load_dotenv()
+
+SPECULATIVE_ENABLED = os.getenv("SPECULATIVE_ENABLED", "true").lower() == "true"
+# How long a pre-generated result waits for the screen that needs it
+SPECULATIVE_TTL = int(os.getenv("SPECULATIVE_TTL", "900"))
+# Quiet period after the last experience change before generating; entering
+# several jobs in a row then costs one speculative run, not one per job
+SPECULATIVE_DELAY = float(os.getenv("SPECULATIVE_DELAY", "3"))
+SPECULATIVE_MAX_RUNS_PER_DAY = int(os.getenv("SPECULATIVE_MAX_RUNS_PER_DAY", "10"))
+SPECULATIVE_MAX_ROLES = int(os.getenv("SPECULATIVE_MAX_ROLES", "10"))
+SPECULATIVE_LOCAL_ENTRIES = int(os.getenv("SPECULATIVE_LOCAL_ENTRIES", "2048"))
+
+Role = Tuple[str, str, str]  # title, company, duration
+
+
+def _norm(text: str) -> str:
+    return re.sub(r"\s+", " ", text or "").strip().lower()
+
+
+def roles_signature(roles: List[Role]) -> str:
+    """Order-insensitive identity of a work history: its (title, company) pairs"""
+    pairs = sorted({(_norm(title), _norm(company)) for title, company, _ in roles})
+    return hashlib.sha256(json.dumps(pairs).encode()).hexdigest()[:32]
+
+
+class SpeculativeCache:
+    """Skills and summaries generated before the user asks for them.
+
+    Experience submitted through /cv-gen/work-experience accumulates into a
+    per-user list of roles; a save through /resume-op/save replaces it.
+    After a quiet period a background run generates skills and a summary
+    for that history and stores them per user for SPECULATIVE_TTL seconds,
+    keyed by the roles' signature, so /skills and /summary answer instantly
+    when they are asked about the same jobs. Runs are capped per user per
+    day and only start while the LLM scheduler has spare capacity.
+    """
+
+    def __init__(
+        self,
+        ttl: int = SPECULATIVE_TTL,
+        delay: float = SPECULATIVE_DELAY,
+        max_runs_per_day: int = SPECULATIVE_MAX_RUNS_PER_DAY,
+        max_roles: int = SPECULATIVE_MAX_ROLES,
+        max_local_entries: int = SPECULATIVE_LOCAL_ENTRIES,
+    ):
+        self.ttl = ttl
+        self.delay = delay
+        self.max_runs_per_day = max_runs_per_day
+        self.max_roles = max_roles
+        self.max_local_entries = max_local_entries
+        # key -> (expires_at, value); used when Redis is unavailable
+        self._local: "OrderedDict[str, tuple]" = OrderedDict()
+        self._local_runs: Counter = Counter()
+        self._waiting: Dict[str, asyncio.Task] = {}
+        self._pending = set()
+        self.stats = Counter()
+
+    @staticmethod
+    def _result_key(owner: str, task: str, signature: str) -> str:
+        return f"spec:{owner}:{task}:{signature}"
+
+    @staticmethod
+    def _roles_key(owner: str) -> str:
+        return f"spec:{owner}:roles"
+
+    def _local_get(self, key: str) -> Optional[Any]:
+        entry = self._local.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            self._local.pop(key, None)
+            return None
+        return entry[1]
+
+    def _local_set(self, key: str, value: Any):
+        self._local[key] = (time.monotonic() + self.ttl, value)
+        self._local.move_to_end(key)
+        while len(self._local) > self.max_local_entries:
+            self._local.popitem(last=False)
+
+    async def _get(self, key: str) -> Optional[Any]:
+        redis_client = redis_config.redis_client
+        if redis_client:
+            try:
+                data = await asyncio.wait_for(redis_client.get(key), timeout=1.0)
+                return json.loads(data) if data else None
+            except (asyncio.TimeoutError, Exception):
+                pass
+        return self._local_get(key)
+
+    async def _set(self, key: str, value: Any):
+        redis_client = redis_config.redis_client
+        if redis_client:
+            try:
+                await asyncio.wait_for(redis_client.set(key, json.dumps(value), ex=self.ttl), timeout=1.0)
+                return
+            except (asyncio.TimeoutError, Exception):
+                pass
+        self._local_set(key, value)
+
+    # Roles
+
+    async def add_role(self, owner: str, role: Role) -> List[Role]:
+        """Add a role to the user's history and return the whole history"""
+        roles = [tuple(r) for r in await self._get(self._roles_key(owner)) or []]
+        signature = roles_signature([role])
+        roles = [r for r in roles if roles_signature([r]) != signature] + [role]
+        roles = roles[-self.max_roles:]
+        await self._set(self._roles_key(owner), roles)
+        return roles
+
+    async def set_roles(self, owner: str, roles: List[Role]) -> List[Role]:
+        roles = roles[:self.max_roles]
+        await self._set(self._roles_key(owner), roles)
+        return roles
+
+    # Results
+
+    async def get(self, owner: str, task: str, roles: List[Role]) -> Optional[Dict[str, Any]]:
+        if not SPECULATIVE_ENABLED or not owner or not roles:
+            return None
+        value = await self._get(self._result_key(owner, task, roles_signature(roles)))
+        self.stats[f"{task}_hits" if value else f"{task}_misses"] += 1
+        return value
+
+    async def put(self, owner: str, task: str, roles: List[Role], value: Dict[str, Any]):
+        await self._set(self._result_key(owner, task, roles_signature(roles)), value)
+        self.stats[f"{task}_stored"] += 1
+
+    # Runs
+
+    async def _allow_run(self, owner: str) -> bool:
+        """Count a run against the user's daily cap; False once the cap is reached"""
+        key = f"spec:runs:{usage_day()}:{owner}"
+        redis_client = redis_config.redis_client
+        runs = None
+        if redis_client:
+            try:
+                pipe = redis_client.pipeline()
+                pipe.incr(key)
+                pipe.expire(key, 86400)
+                runs, _ = await asyncio.wait_for(pipe.execute(), timeout=1.0)
+            except (asyncio.TimeoutError, Exception):
+                runs = None
+        if runs is None:
+            self._local_runs[key] += 1
+            runs = self._local_runs[key]
+        return runs <= self.max_runs_per_day
+
+    def schedule(self, owner: str, run: Callable[[], Awaitable[None]]):
+        """Run `run` after the quiet period, replacing a run for this user that has not started"""
+        if not SPECULATIVE_ENABLED or not owner:
+            return
+        waiting = self._waiting.pop(owner, None)
+        if waiting:
+            waiting.cancel()
+            self.stats["debounced"] += 1
+
+        async def delayed():
+            await asyncio.sleep(self.delay)
+            if self._waiting.get(owner) is task:
+                del self._waiting[owner]
+            # Speculation only uses spare capacity, it never queues ahead of real requests
+            if not llm_scheduler.has_capacity:
+                self.stats["busy"] += 1
+                return
+            if not await self._allow_run(owner):
+                self.stats["capped"] += 1
+                return
+            self.stats["runs"] += 1
+            try:
+                async with llm_scheduler.slot(owner):
+                    await run()
+            except Exception:
+                self.stats["failed"] += 1
+
+        task = asyncio.create_task(delayed())
+        self._waiting[owner] = task
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    def get_stats(self) -> Dict[str, int]:
+        return {**self.stats, "waiting": len(self._waiting), "local_entries": len(self._local)}
+
+
+speculative_cache = SpeculativeCache()
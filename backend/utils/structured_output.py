@@ -0,0 +1,113 @@
+import json
+import re
+from typing import Any, Dict, List, Optional, Tuple, Type
+from pydantic import BaseModel, ValidationError
+from config.openai import LLM_STRUCTURED_OUTPUT
+from utils.json_stream import JSONArrayStreamParser
+from utils.llm_metrics import llm_metrics
+
+# "- item", "* item", "• item", "1. item", "2) item"
+_LIST_MARKER = re.compile(r"^(?:[-*•]|\d+[.)])\s+")
+
+
+class StructuredOutputError(ValueError):
+    """The model output held no usable items"""
+
+
+def _list_field(response_model: Type[BaseModel]) -> str:
+    """Name of the single list-of-strings field of a response model"""
+    return next(iter(response_model.model_fields))
+
+
+def response_format(response_model: Type[BaseModel]) -> Optional[Dict[str, Any]]:
+    """Strict json_schema response_format for a response model, None when disabled"""
+    if not LLM_STRUCTURED_OUTPUT:
+        return None
+    schema = response_model.model_json_schema()
+    schema["additionalProperties"] = False
+    schema["required"] = list(schema["properties"])
+    return {
+        "type": "json_schema",
+        "json_schema": {"name": response_model.__name__, "strict": True, "schema": schema},
+    }
+
+
+def _coerce(value: Any) -> Optional[str]:
+    if isinstance(value, str):
+        return value.strip()
+    if isinstance(value, dict):
+        # [{"point": "..."}] instead of ["..."]
+        texts = [v for v in value.values() if isinstance(v, str)]
+        return texts[0].strip() if len(texts) == 1 else None
+    return None
+
+
+def _from_json(data: Any, field: str) -> Optional[List[Any]]:
+    if isinstance(data, dict):
+        data = data.get(field)
+    if isinstance(data, str):
+        return [data]
+    return data if isinstance(data, list) else None
+
+
+def _repair(content: str) -> Tuple[List[str], str]:
+    """One linear scan: string items of the first array, tolerant of fences,
+    preambles, trailing commas and truncation (the unfinished item is dropped)"""
+    parser = JSONArrayStreamParser()
+    items = parser.feed(content)
+    if not parser.started:
+        return [], "none"
+    return items, "repair" if parser.done else "truncated"
+
+
+def _from_lines(content: str) -> List[str]:
+    items = []
+    for line in content.splitlines():
+        line = line.strip()
+        if not line or line.startswith(("#", "```")) or line in ("[", "]", "{", "}"):
+            continue
+        line = _LIST_MARKER.sub("", line).strip().strip(",").strip().strip("\"'").strip()
+        if line:
+            items.append(line)
+    return items
+
+
+def parse_items(content: str, response_model: Type[BaseModel]) -> List[str]:
+    """Turn a completion into the validated list field of `response_model`"""
+    return parse_result(content, response_model)[0]
+
+
+def parse_result(content: str, response_model: Type[BaseModel]) -> Tuple[List[str], str]:
+    """Validated items of a completion and the parse path that produced them.
+
+    Tries, in order: json.loads of the whole output (the normal case with
+    structured outputs), a single-pass repair of the first JSON array, and
+    one item per line for output that is not JSON at all. The branch taken
+    is recorded in llm_metrics.
+    """
+    field = _list_field(response_model)
+    content = content.strip()
+    items = None
+    path = "json"
+
+    try:
+        raw = _from_json(json.loads(content), field)
+        if raw is not None:
+            items = [item for item in map(_coerce, raw) if item]
+    except json.JSONDecodeError:
+        pass
+
+    if items is None:
+        items, path = _repair(content)
+    # Only output with no JSON array at all is read line by line
+    if path == "none":
+        items, path = _from_lines(content), "lines"
+
+    llm_metrics.record_parse(path if items else "empty")
+    if not items:
+        raise StructuredOutputError("The model returned no usable items, please try again")
+
+    try:
+        return getattr(response_model(**{field: items}), field), path
+    except ValidationError as e:
+        raise StructuredOutputError(f"Model output failed validation: {e}")
@@ -0,0 +1,208 @@
+import random
+import re
+import zlib
+from collections import Counter
+from typing import Dict, List, Optional
+
+# Role families: title keywords, what the work is about, and matching skills
+ROLE_FAMILIES = {
+    "engineering": {
+        "keywords": ["engineer", "developer", "programmer", "software", "backend", "frontend", "full stack",
+                     "devops", "sre", "architect", "mobile", "ios", "android", "platform", "cloud"],
+        "objects": ["core services", "release pipeline", "API layer", "test automation suite",
+                    "cloud infrastructure", "monitoring and alerting", "legacy codebase", "deployment process",
+                    "internal tooling", "data access layer", "authentication flow", "customer-facing features"],
+        "skills": ["System Design", "Code Review", "CI/CD", "Cloud Infrastructure", "API Design",
+                   "Automated Testing", "Debugging", "Version Control", "Performance Optimization",
+                   "Technical Documentation", "Microservices", "Agile Development"],
+    },
+    "data": {
+        "keywords": ["data", "analyst", "analytics", "scientist", "machine learning", "ml", "ai", "bi",
+                     "statistic", "research"],
+        "objects": ["reporting dashboards", "data pipelines", "forecasting models", "experiment analysis",
+                    "data quality checks", "KPI definitions", "customer segmentation", "ETL jobs",
+                    "predictive models", "self-serve analytics", "data warehouse", "A/B testing framework"],
+        "skills": ["SQL", "Python", "Data Visualization", "Statistical Analysis", "Data Modeling",
+                   "A/B Testing", "Machine Learning", "ETL", "Dashboarding", "Forecasting",
+                   "Data Storytelling", "Stakeholder Communication"],
+    },
+    "product": {
+        "keywords": ["product", "owner", "program manager", "project manager", "scrum", "delivery"],
+        "objects": ["product roadmap", "feature launches", "user research program", "sprint planning",
+                    "stakeholder reviews", "requirements process", "release calendar", "discovery workshops",
+                    "success metrics", "cross-team dependencies", "backlog", "go-to-market plans"],
+        "skills": ["Roadmapping", "Stakeholder Management", "User Research", "Prioritization",
+                   "Agile Methodologies", "Requirements Gathering", "Product Analytics", "Risk Management",
+                   "Cross-functional Leadership", "Go-to-Market Strategy", "Jira", "Communication"],
+    },
+    "design": {
+        "keywords": ["design", "ux", "ui", "creative", "graphic", "illustrat", "art director"],
+        "objects": ["design system", "user flows", "interactive prototypes", "usability studies",
+                    "brand guidelines", "onboarding experience", "visual identity", "accessibility audit",
+                    "mobile interface", "marketing assets", "wireframes", "design handoff process"],
+        "skills": ["User Experience Design", "Prototyping", "Figma", "Design Systems", "Usability Testing",
+                   "Visual Design", "Interaction Design", "Accessibility", "Wireframing", "Typography",
+                   "User Research", "Design Thinking"],
+    },
+    "marketing": {
+        "keywords": ["marketing", "seo", "content", "brand", "growth", "social media", "communications", "pr"],
+        "objects": ["email campaigns", "content calendar", "paid acquisition channels", "SEO strategy",
+                    "brand campaigns", "social media presence", "marketing automation", "lead nurturing flows",
+                    "landing pages", "product launches", "partner co-marketing", "campaign reporting"],
+        "skills": ["Digital Marketing", "SEO", "Content Strategy", "Campaign Management", "Google Analytics",
+                   "Marketing Automation", "Copywriting", "Social Media Marketing", "Brand Management",
+                   "Paid Acquisition", "Market Research", "CRM"],
+    },
+    "sales": {
+        "keywords": ["sales", "account", "business development", "bdr", "sdr", "customer success",
+                     "partnership", "relationship manager"],
+        "objects": ["sales pipeline", "key accounts", "territory plan", "renewal process", "outbound prospecting",
+                    "client onboarding", "CRM hygiene", "partner channel", "proposal process",
+                    "quarterly business reviews", "upsell motions", "contract negotiations"],
+        "skills": ["Consultative Selling", "Pipeline Management", "Negotiation", "CRM", "Account Management",
+                   "Prospecting", "Relationship Building", "Sales Forecasting", "Presentation Skills",
+                   "Customer Retention", "Contract Negotiation", "Salesforce"],
+    },
+    "finance": {
+        "keywords": ["finance", "financial", "accountant", "accounting", "audit", "controller", "treasury",
+                     "tax", "investment", "banking"],
+        "objects": ["month-end close", "budgeting process", "financial reporting", "audit readiness",
+                    "cash flow forecasts", "expense controls", "variance analysis", "tax filings",
+                    "investment models", "procurement approvals", "revenue recognition", "cost reporting"],
+        "skills": ["Financial Modeling", "Budgeting", "Forecasting", "Financial Reporting", "Excel",
+                   "Variance Analysis", "GAAP", "Audit", "Risk Assessment", "ERP Systems",
+                   "Cash Flow Management", "Attention to Detail"],
+    },
+    "operations": {
+        "keywords": ["operations", "logistics", "supply chain", "warehouse", "procurement", "manufacturing",
+                     "facilities", "coordinator", "administrat"],
+        "objects": ["fulfilment process", "vendor relationships", "inventory planning", "standard operating procedures",
+                    "shipping costs", "capacity planning", "quality checks", "scheduling process",
+                    "procurement workflow", "safety compliance", "operational reporting", "service levels"],
+        "skills": ["Process Improvement", "Supply Chain Management", "Vendor Management", "Inventory Control",
+                   "Lean Operations", "Scheduling", "Quality Assurance", "Logistics", "Budget Management",
+                   "Problem Solving", "Reporting", "Team Coordination"],
+    },
+    "people": {
+        "keywords": ["hr", "human resources", "recruit", "talent", "people", "payroll", "learning"],
+        "objects": ["hiring pipeline", "onboarding program", "performance review cycle", "employee engagement survey",
+                    "compensation bands", "training curriculum", "HR policies", "interview process",
+                    "benefits administration", "retention initiatives", "employer brand", "HRIS records"],
+        "skills": ["Talent Acquisition", "Employee Relations", "Onboarding", "Performance Management",
+                   "HR Policy", "Interviewing", "Compensation and Benefits", "Training and Development",
+                   "HRIS", "Conflict Resolution", "Employment Law", "Coaching"],
+    },
+    "support": {
+        "keywords": ["support", "service", "help desk", "technician", "customer care", "call center"],
+        "objects": ["ticket queue", "knowledge base", "escalation process", "customer satisfaction scores",
+                    "support workflows", "first-response times", "troubleshooting guides", "service level agreements",
+                    "customer feedback loop", "support tooling", "training materials", "incident handling"],
+        "skills": ["Customer Service", "Troubleshooting", "Ticketing Systems", "Communication", "Empathy",
+                   "Problem Solving", "Technical Support", "Conflict Resolution", "Time Management",
+                   "Knowledge Base Management", "SLA Management", "Active Listening"],
+    },
+}
+GENERIC_FAMILY = {
+    "objects": ["team processes", "key projects", "stakeholder communication", "reporting cadence",
+                "service quality", "cross-team initiatives", "operational workflows", "documentation",
+                "new-hire onboarding", "budget tracking", "client relationships", "process improvements"],
+    "skills": ["Communication", "Teamwork", "Problem Solving", "Time Management", "Project Management",
+               "Attention to Detail", "Adaptability", "Leadership", "Microsoft Office", "Organization",
+               "Critical Thinking", "Customer Focus"],
+}
+
+# "Led the redesign of {object}, {metric}"
+VERBS = ["Led", "Delivered", "Redesigned", "Streamlined", "Owned", "Launched", "Improved",
+         "Automated", "Standardized", "Scaled", "Modernized", "Coordinated", "Built", "Optimized"]
+METRICS = [
+    "cutting turnaround time by {pct}%", "reducing costs by {pct}%", "improving quality scores by {pct}%",
+    "raising team throughput by {pct}%", "reducing errors by {pct}%", "saving {hours} hours per month",
+    "supporting {count} stakeholders across {teams} teams", "ahead of schedule and within budget",
+    "increasing customer satisfaction by {pct}%", "used by {count}+ people each week",
+]
+SENIOR_PHRASES = ["mentoring {teams} team members", "setting direction for {teams} teams",
+                  "partnering with leadership on priorities"]
+SENIOR_WORDS = ("senior", "lead", "principal", "head", "manager", "director", "chief", "vp", "staff")
+
+
+class TemplateFallback:
+    """Deterministic local generator used when the LLM cannot answer in time.
+
+    Picks a role family from title keywords, then fills verb / object /
+    metric templates from the phrase bank with a random generator seeded by
+    the inputs, so the same request always gets the same answer. Output is
+    generic but valid, and responses that use it are flagged as degraded.
+    """
+
+    def __init__(self):
+        self.stats = Counter()
+
+    @staticmethod
+    def _rng(*parts: str) -> random.Random:
+        return random.Random(zlib.crc32("|".join(parts).lower().encode()))
+
+    @staticmethod
+    def family(text: str) -> Dict[str, List[str]]:
+        text = f" {text.lower()} "
+        best, best_hits = GENERIC_FAMILY, 0
+        for family in ROLE_FAMILIES.values():
+            hits = sum(1 for keyword in family["keywords"] if re.search(rf"\b{re.escape(keyword)}", text))
+            if hits > best_hits:
+                best, best_hits = family, hits
+        return best
+
+    @staticmethod
+    def _fill(template: str, rng: random.Random) -> str:
+        return template.format(pct=rng.choice([10, 15, 20, 25, 30, 35, 40]), hours=rng.choice([10, 20, 40, 60]),
+                               count=rng.choice([50, 100, 200, 500]), teams=rng.choice([3, 4, 5, 6, 8]))
+
+    def work_experience(self, job_title: str, role: str, count: int = 20) -> List[str]:
+        self.stats["work_experience"] += 1
+        family = self.family(f"{job_title} {role}")
+        rng = self._rng(job_title, role)
+        objects = rng.sample(family["objects"], len(family["objects"]))
+        verbs = rng.sample(VERBS, len(VERBS))
+        metrics = rng.sample(METRICS, len(METRICS))
+        senior = any(word in job_title.lower() for word in SENIOR_WORDS)
+
+        points = []
+        for i in range(min(count, len(objects) * 2)):
+            obj = objects[i % len(objects)]
+            verb = verbs[i % len(verbs)]
+            if senior and i % 4 == 3:
+                outcome = SENIOR_PHRASES[i % len(SENIOR_PHRASES)]
+            else:
+                outcome = metrics[i % len(metrics)]
+            lead = f"{verb} the {obj}" if i < len(objects) else f"{verb} improvements to the {obj}"
+            points.append(self._fill(f"{lead}, {outcome}", rng))
+        return points
+
+    def skills(self, career: str, count: int = 15) -> List[str]:
+        self.stats["skills"] += 1
+        family = self.family(career)
+        rng = self._rng(career[:500])
+        skills = rng.sample(family["skills"], len(family["skills"]))
+        extra = [s for s in GENERIC_FAMILY["skills"] if s not in skills]
+        return (skills + rng.sample(extra, len(extra)))[:count]
+
+    def summary(self, name: str, skills: Optional[List[str]], career: str, title: str = "") -> List[str]:
+        self.stats["summary"] += 1
+        family = self.family(f"{title} {career}")
+        strengths = (skills or [])[:3] or family["skills"][:3]
+        role = title or "professional"
+        years = len(re.findall(r"^- ", career, re.MULTILINE))
+        experience = f"experience across {years} roles" if years > 1 else "hands-on experience"
+        objects = self._rng(name, career[:200]).sample(family["objects"], 2)
+        strengths_text = f"{', '.join(strengths[:-1])} and {strengths[-1]}" if len(strengths) > 1 else strengths[0]
+        return [
+            f"{name} is a results-driven {role} with {experience} delivering measurable improvements "
+            f"to {objects[0]} and {objects[1]}. Known for strengths in {strengths_text}, {name} combines "
+            f"careful planning with reliable execution, works closely with stakeholders to agree "
+            f"priorities, and consistently turns complex goals into clear, well-documented outcomes."
+        ]
+
+    def get_stats(self) -> Dict[str, int]:
+        return dict(self.stats)
+
+
+template_fallback = TemplateFallback()
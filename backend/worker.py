@@ -0,0 +1,94 @@
+import asyncio
+import json
+import logging
+import os
+import signal
+import socket
+from dotenv import load_dotenv
+from config.redis import init_redis
+from config.log import setup_logging
+from controller.generation_jobs import GenerationJobs, JOB_MODELS
+from utils.job_queue import job_queue
+from utils.llm_client import llm_client
+from utils.llm_metrics import tag_llm_calls
+
+load_dotenv()
+setup_logging()
+
+logger = logging.getLogger("cvbuilder.worker")
+
+WORKER_CONCURRENCY = int(os.getenv("WORKER_CONCURRENCY", "8"))
+WORKER_BLOCK_MS = int(os.getenv("WORKER_BLOCK_MS", "5000"))
+# Jobs pending longer than this on a dead consumer are taken over
+WORKER_RECLAIM_IDLE_MS = int(os.getenv("WORKER_RECLAIM_IDLE_MS", "120000"))
+
+
+async def process(entry_id: str, fields: dict, consumer: str):
+    job_id = fields.get("job_id")
+    kind = fields.get("kind")
+    user_key = fields.get("user") or ""
+    tag_llm_calls(f"job:{kind}", user_key or "unknown")
+    try:
+        if kind not in JOB_MODELS:
+            raise ValueError(f"Unknown job kind: {kind}")
+        await job_queue.mark_running(job_id, consumer)
+        outcome = await GenerationJobs.run(kind, json.loads(fields.get("payload", "{}")), user_key)
+    except Exception as e:
+        outcome = {"success": False, "error": str(e)}
+
+    try:
+        await job_queue.finish(entry_id, job_id, outcome)
+    except Exception as e:
+        # Left pending, another worker reclaims it after WORKER_RECLAIM_IDLE_MS
+        logger.warning("Failed to record job %s: %s", job_id, e)
+
+
+async def run_worker(stop: asyncio.Event):
+    consumer = f"{socket.gethostname()}-{os.getpid()}"
+    await job_queue.ensure_group()
+    logger.info("Generation worker %s consuming %s", consumer, job_queue.stream)
+
+    tasks = set()
+
+    while not stop.is_set():
+        free = WORKER_CONCURRENCY - len(tasks)
+        if free <= 0:
+            # Only pull as many entries as there are free slots
+            await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            continue
+
+        try:
+            entries = await job_queue.reclaim(consumer, WORKER_RECLAIM_IDLE_MS, free)
+            if not entries:
+                entries = await job_queue.read(consumer, free, WORKER_BLOCK_MS)
+        except Exception as e:
+            logger.warning("Job stream read failed: %s", e)
+            await asyncio.sleep(1)
+            continue
+
+        for entry_id, fields in entries:
+            task = asyncio.create_task(process(entry_id, fields, consumer))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+
+    if tasks:
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def main():
+    if not await init_redis():
+        raise SystemExit("Generation worker requires Redis (REDIS_URL)")
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    try:
+        await run_worker(stop)
+    finally:
+        await llm_client.aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
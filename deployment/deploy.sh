@@ -142,4 +142,7 @@ else
     fi
 fi
 
+log "Updating generation workers"
+docker-compose -f ./docker/docker-compose.worker.yml up -d
+
 log "Deployment successful! Active environment: $NEW_ENV"
@@ -19,6 +19,9 @@ docker-compose -f ./docker/docker-compose.blue.yml down 2>/dev/null || true
 log "Stopping green environment"
 docker-compose -f ./docker/docker-compose.green.yml down 2>/dev/null || true
 
+log "Stopping generation workers"
+docker-compose -f ./docker/docker-compose.worker.yml down 2>/dev/null || true
+
 log "Stopping nginx"
 docker-compose -f ./docker/docker-compose.nginx.yml down 2>/dev/null || true
 